@@ -47,7 +47,7 @@ from .message_handler import (
     DefaultMessageHandler,
     MessageEventListener,
 )
-from .message_parser import MessageParseError, parse_message
+from .message_parser import MessageParseError, parse_message, parse_messages
 from .options import ClaudeOptions
 from .persistent_executor import PersistentProcessManager
 from .query import (
@@ -56,6 +56,7 @@ from .query import (
     query,
     query_text,
 )
+from .transcript import Transcript, parse_transcript
 from .types import (
     AssistantMessage,
     ContentBlock,
@@ -118,4 +119,8 @@ __all__ = [
     "CLIExecutionError",
     "MessageParseError",
     "parse_message",
+    "parse_messages",
+    # Transcripts
+    "Transcript",
+    "parse_transcript",
 ]
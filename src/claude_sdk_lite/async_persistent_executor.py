@@ -17,6 +17,7 @@ import asyncio
 import json
 import logging
 import os
+import secrets
 from collections.abc import AsyncIterator
 from typing import Any
 
@@ -188,21 +189,17 @@ class AsyncPersistentProcessManager:
         """
         # Wait for initialization to complete if in progress
         async with self._init_cond:
-            wait_start = asyncio.get_event_loop().time()
-            while self._initializing:
-                remaining = MAX_INITIALIZATION_WAIT_TIME - (
-                    asyncio.get_event_loop().time() - wait_start
+            # wait_for() rechecks the predicate on each notify; one deadline covers it all
+            try:
+                await asyncio.wait_for(
+                    self._init_cond.wait_for(lambda: not self._initializing),
+                    timeout=MAX_INITIALIZATION_WAIT_TIME,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Initialization still in progress after %.1fs, proceeding with stop",
+                    MAX_INITIALIZATION_WAIT_TIME,
                 )
-                if remaining <= 0:
-                    logger.warning(
-                        "Initialization still in progress after %.1fs, proceeding with stop",
-                        MAX_INITIALIZATION_WAIT_TIME,
-                    )
-                    break
-                try:
-                    await asyncio.wait_for(self._init_cond.wait(), timeout=min(0.1, remaining))
-                except asyncio.TimeoutError:
-                    break
 
         # Use lock for cleanup to prevent race conditions
         async with self._lock:
@@ -327,26 +324,9 @@ class AsyncPersistentProcessManager:
                     yield line
 
                 except asyncio.TimeoutError:
-                    # Timeout - check if process is still alive
-
-                    # Check for worker task errors
-                    if task_error := await self.check_error():
-                        raise RuntimeError(f"Worker task error: {task_error}") from task_error
-
-                    if process.returncode is not None:
-                        # Process died
-                        self._log_debug("Process is dead! exit code: %s", process.returncode)
-
-                        stderr_output = await self._get_stderr_copy()
-                        if stderr_output:
-                            self._log_debug("Stderr output:\n%s", stderr_output)
-
-                        raise ProcessExecutionError(
-                            f"Process terminated unexpectedly (exit code {process.returncode})",
-                            exit_code=process.returncode or -1,
-                            stderr=stderr_output,
-                        )
-                    # Continue waiting if process is still running
+                    # Timeout - raise if a worker failed or the process died,
+                    # otherwise continue waiting
+                    await self._raise_if_unhealthy(process)
                     continue
 
         except GeneratorExit:
@@ -357,11 +337,72 @@ class AsyncPersistentProcessManager:
 
         self._log_debug("read_lines() completed after %d iterations", iteration_count)
 
+    async def read_one(self, timeout: float = DEFAULT_READ_TIMEOUT) -> bytes | None:
+        """Read a single line from stdout.
+
+        Unlike breaking out of read_lines() after the first line, this does not
+        create an async generator and does not drain the lines still queued
+        behind it.
+
+        Args:
+            timeout: Seconds to wait for the line (default: 30.0)
+
+        Returns:
+            Raw line bytes, or None on EOF or if no line arrived within timeout
+
+        Raises:
+            RuntimeError: If process not running
+            ProcessExecutionError: If process terminates unexpectedly
+        """
+        line_queue = self._line_queue
+        process = self._process
+        if line_queue is None or process is None:
+            raise RuntimeError("Process not running. Call start() first.")
+
+        try:
+            line = await asyncio.wait_for(line_queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._raise_if_unhealthy(process)
+            return None
+
+        if line is None:
+            # EOF sentinel - put it back so later readers also see EOF
+            try:
+                line_queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+
+        return line
+
+    async def _raise_if_unhealthy(self, process: asyncio.subprocess.Process) -> None:
+        """Raise if a worker task failed or the process died.
+
+        Args:
+            process: The subprocess being read from
+
+        Raises:
+            RuntimeError: If a worker task captured an exception
+            ProcessExecutionError: If the process has terminated
+        """
+        if task_error := await self.check_error():
+            raise RuntimeError(f"Worker task error: {task_error}") from task_error
+
+        if process.returncode is not None:
+            self._log_debug("Process is dead! exit code: %s", process.returncode)
+
+            stderr_output = await self._get_stderr_copy()
+            if stderr_output:
+                self._log_debug("Stderr output:\n%s", stderr_output)
+
+            raise ProcessExecutionError(
+                f"Process terminated unexpectedly (exit code {process.returncode})",
+                exit_code=process.returncode or -1,
+                stderr=stderr_output,
+            )
+
     async def write_interrupt(self) -> None:
         """Send interrupt signal via stdin."""
         # Generate unique request ID using secrets for cryptographic security
-        import secrets
-
         request_id = f"req_{secrets.token_hex(8)}"
 
         control_request = {
@@ -398,14 +439,34 @@ class AsyncPersistentProcessManager:
         async with self._stderr_lock:
             return "\n".join(self._stderr_buffer) if self._stderr_buffer else ""
 
-    async def _drain_line_queue(self) -> None:
+    async def flush(self) -> int:
+        """Discard stdout lines that have been read but not yet consumed.
+
+        Allows a running process to be reused for independent exchanges
+        without output left over from a previous one leaking into the next.
+        An EOF sentinel, if queued, is preserved.
+
+        At most DRAIN_QUEUE_MAX_ITEMS lines are discarded per call, so a process
+        that keeps writing cannot keep flush() busy. Any lines beyond the cap stay
+        queued; call flush() again until it returns less than the cap to empty
+        the queue.
+
+        Returns:
+            Number of lines discarded
+        """
+        return await self._drain_line_queue()
+
+    async def _drain_line_queue(self) -> int:
         """Drain all remaining items from the line queue.
 
         This is called when a generator is closed prematurely to prevent
         memory leaks and ensure clean state for subsequent calls.
+
+        Returns:
+            Number of items discarded
         """
         if self._line_queue is None:
-            return
+            return 0
 
         drained = 0
         while drained < DRAIN_QUEUE_MAX_ITEMS:
@@ -426,6 +487,8 @@ class AsyncPersistentProcessManager:
         if drained >= DRAIN_QUEUE_MAX_ITEMS:
             self._log_debug("Drained line queue hit max limit (%d items)", DRAIN_QUEUE_MAX_ITEMS)
 
+        return drained
+
     def is_alive(self) -> bool:
         """Check if the process is still running.
 
@@ -21,7 +21,7 @@ from claude_sdk_lite.message_handler import (
     AsyncMessageEventListener,
     MessageEventListener,
 )
-from claude_sdk_lite.message_parser import MessageParseError, parse_message
+from claude_sdk_lite.message_parser import MessageParseError, loads_json, parse_message
 from claude_sdk_lite.options import ClaudeOptions
 from claude_sdk_lite.persistent_executor import PersistentProcessManager
 from claude_sdk_lite.types import Message, ResultMessage
@@ -302,7 +302,7 @@ class ClaudeClient(_BaseClient):
             return
 
         try:
-            data = json.loads(line_str)
+            data = loads_json(line_str)
             self._log_debug("Parsed JSON data: %s", data)
 
             message = parse_message(data)
@@ -577,7 +577,7 @@ class AsyncClaudeClient(_BaseClient):
             return
 
         try:
-            data = json.loads(line_str)
+            data = loads_json(line_str)
             self._log_debug("Parsed JSON data: %s", data)
 
             message = parse_message(data)
@@ -12,14 +12,23 @@ Message parsing is handled in query.py for better separation of concerns.
 """
 
 import asyncio
+import contextlib
 import subprocess
 import sys
+import threading
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator, Iterator
 from typing import Any
 
 from claude_sdk_lite.exceptions import ProcessExecutionError
 
+# How long to keep collecting stderr after a failed process has exited (in seconds);
+# a grandchild that inherited the pipe can hold it open indefinitely
+STDERR_READ_TIMEOUT = 5.0
+
+# Size of each read from the stderr pipe
+STDERR_CHUNK_SIZE = 65536
+
 
 class ProcessExecutor(ABC):
     """Abstract base class for process executors."""
@@ -64,6 +73,8 @@ class SyncProcessExecutor(ProcessExecutor):
             kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
 
         process = None
+        stderr_chunks: list[bytes] = []
+        stderr_reader = None
         try:
             process = subprocess.Popen(
                 cmd,
@@ -75,6 +86,14 @@ class SyncProcessExecutor(ProcessExecutor):
             if not process.stdout:
                 raise RuntimeError("Failed to create subprocess stdout pipe")
 
+            # Drain stderr concurrently: a process that fills the stderr pipe
+            # would otherwise block before closing stdout, deadlocking the read below
+            if process.stderr:
+                stderr_reader = threading.Thread(
+                    target=_read_stream, args=(process.stderr, stderr_chunks), daemon=True
+                )
+                stderr_reader.start()
+
             # Read and yield raw lines
             for line in process.stdout:
                 yield line
@@ -83,9 +102,10 @@ class SyncProcessExecutor(ProcessExecutor):
             returncode = process.wait()
 
             if returncode != 0:
-                stderr_output = ""
-                if process.stderr:
-                    stderr_output = process.stderr.read().decode("utf-8", errors="replace")
+                if stderr_reader:
+                    stderr_reader.join(timeout=STDERR_READ_TIMEOUT)
+                # Report whatever was collected, even if the pipe is still open
+                stderr_output = b"".join(stderr_chunks).decode("utf-8", errors="replace")
 
                 raise ProcessExecutionError(
                     message=f"CLI exited with code {returncode}",
@@ -97,6 +117,18 @@ class SyncProcessExecutor(ProcessExecutor):
             _cleanup_process(process)
 
 
+def _read_stream(stream: Any, chunks: list[bytes]) -> None:
+    """Read a stream to EOF, collecting its contents into chunks as they arrive.
+
+    Args:
+        stream: Binary stream to read (e.g. a subprocess stderr pipe)
+        chunks: List the data is appended to
+    """
+    read = getattr(stream, "read1", stream.read)
+    for chunk in iter(lambda: read(STDERR_CHUNK_SIZE), b""):
+        chunks.append(chunk)
+
+
 def _cleanup_process(process: subprocess.Popen | None) -> None:
     """Clean up a subprocess if it still exists.
 
@@ -140,6 +172,8 @@ class AsyncProcessExecutor:
             kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
 
         process = None
+        stderr_chunks: list[bytes] = []
+        stderr_task = None
         try:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
@@ -151,6 +185,12 @@ class AsyncProcessExecutor:
             if not process.stdout:
                 raise RuntimeError("Failed to create subprocess stdout pipe")
 
+            # Drain stderr concurrently so a full stderr pipe cannot stall stdout
+            if process.stderr:
+                stderr_task = asyncio.ensure_future(
+                    _read_stream_async(process.stderr, stderr_chunks)
+                )
+
             # Read and yield raw lines
             async for line in process.stdout:
                 yield line
@@ -159,9 +199,10 @@ class AsyncProcessExecutor:
             returncode = await process.wait()
 
             if returncode != 0:
-                stderr_output = ""
-                if process.stderr:
-                    stderr_output = (await process.stderr.read()).decode("utf-8", errors="replace")
+                if stderr_task:
+                    await asyncio.wait({stderr_task}, timeout=STDERR_READ_TIMEOUT)
+                # Report whatever was collected, even if the pipe is still open
+                stderr_output = b"".join(stderr_chunks).decode("utf-8", errors="replace")
 
                 raise ProcessExecutionError(
                     message=f"CLI exited with code {returncode}",
@@ -170,9 +211,24 @@ class AsyncProcessExecutor:
                 )
 
         finally:
+            if stderr_task:
+                stderr_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await stderr_task
             await _cleanup_process_async(process)
 
 
+async def _read_stream_async(stream: asyncio.StreamReader, chunks: list[bytes]) -> None:
+    """Read an async stream to EOF, collecting its contents into chunks as they arrive.
+
+    Args:
+        stream: Stream to read (e.g. a subprocess stderr pipe)
+        chunks: List the data is appended to
+    """
+    while chunk := await stream.read(STDERR_CHUNK_SIZE):
+        chunks.append(chunk)
+
+
 async def _cleanup_process_async(process: asyncio.subprocess.Process | None) -> None:
     """Clean up an async subprocess if it still exists.
 
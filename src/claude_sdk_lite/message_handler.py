@@ -189,6 +189,9 @@ class AsyncDefaultMessageHandler(AsyncMessageEventListener, _MessageBufferMixin)
         async with self._lock:
             event = self._query_complete_event
         if event:
+            # Already complete: skip creating a wait_for task
+            if event.is_set():
+                return True
             try:
                 await asyncio.wait_for(event.wait(), timeout=timeout)
                 return True
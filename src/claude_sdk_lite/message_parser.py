@@ -2,27 +2,58 @@
 
 import json
 import logging
-from typing import Any
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from pydantic import Field, TypeAdapter, ValidationError
+from pydantic_core import from_json
 
 from .types import (
     AssistantMessage,
     ContentBlock,
     ControlResponseMessage,
-    InterruptBlock,
     Message,
     ResultMessage,
     StreamEvent,
     SystemMessage,
-    TextBlock,
-    ThinkingBlock,
-    ToolResultBlock,
-    ToolUseBlock,
     UnknownMessage,
     UserMessage,
 )
 
 logger = logging.getLogger(__name__)
 
+# Content blocks are validated natively by pydantic-core, dispatching on the "type"
+# field instead of trying each block model in turn
+_CONTENT_BLOCKS_ADAPTER: TypeAdapter[list[ContentBlock]] = TypeAdapter(
+    list[Annotated[ContentBlock, Field(discriminator="type")]]
+)
+_CONTENT_BLOCK_TYPES = frozenset({"text", "thinking", "tool_use", "tool_result", "interrupt"})
+
+# First characters a JSON value can start with (NaN/Infinity are accepted by the stdlib
+# fallback); text starting with anything else is rejected without running a decoder
+_JSON_VALUE_STARTS = frozenset(
+    [*'{["-0123456789tfnNI', *(bytes([c]) for c in b'{["-0123456789tfnNI')]
+)
+
+
+def loads_json(data: str | bytes) -> Any:
+    """Deserialize a JSON document with pydantic-core's native decoder.
+
+    from_json ships with pydantic and is about twice as fast as the stdlib on CLI
+    stream lines. It decodes NaN, Infinity and integers of any size exactly as
+    json.loads does; documents it rejects but the stdlib accepts (e.g. strings with
+    lone surrogates) fall back to json.loads. orjson is not used here because it
+    decodes integers wider than 64 bits to lossy floats.
+
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON.
+    """
+    try:
+        return from_json(data)
+    except ValueError:
+        pass
+    return json.loads(data)
+
 
 class MessageParseError(Exception):
     """Error raised when message parsing fails.
@@ -38,7 +69,7 @@ class MessageParseError(Exception):
         super().__init__(f"{message}: {data}")
 
 
-def parse_message(data: dict[str, Any] | str) -> Message:
+def parse_message(data: dict[str, Any] | str | bytes) -> Message:
     """
     Parse message from CLI output into typed Message objects.
 
@@ -48,7 +79,7 @@ def parse_message(data: dict[str, Any] | str) -> Message:
     forward compatibility and resilience.
 
     Args:
-        data: Raw message dictionary from CLI output (dict or JSON string)
+        data: Raw message dictionary from CLI output (dict, or JSON str/bytes)
 
     Returns:
         Parsed Message object, or UnknownMessage if parsing fails
@@ -67,11 +98,19 @@ def parse_message(data: dict[str, Any] | str) -> Message:
         ```
     """
     # Parse JSON string if needed
-    if isinstance(data, str):
+    if isinstance(data, (str, bytes)):
         try:
-            data = json.loads(data)
-        except json.JSONDecodeError as e:
+            head = data.lstrip()
+            # The stdlib fallback accepts bytes with a UTF-8 BOM, so look past it
+            if head[:3] == b"\xef\xbb\xbf":
+                head = head[3:].lstrip()
+            if head[:1] not in _JSON_VALUE_STARTS:
+                raise ValueError("input does not start with a JSON value")
+            data = loads_json(data)
+        except ValueError as e:
             logger.warning(f"Failed to parse JSON string, returning UnknownMessage: {e}")
+            if isinstance(data, bytes):
+                data = data.decode("utf-8", errors="replace")
             return UnknownMessage(type="invalid_json", raw_data={"raw_string": data})
 
     if not isinstance(data, dict):
@@ -90,23 +129,12 @@ def parse_message(data: dict[str, Any] | str) -> Message:
 
     # Try to parse known message types
     try:
-        match message_type:
-            case "user":
-                return _parse_user_message(data)
-            case "assistant":
-                return _parse_assistant_message(data)
-            case "system":
-                return _parse_system_message(data)
-            case "result":
-                return _parse_result_message(data)
-            case "stream_event":
-                return _parse_stream_event(data)
-            case "control_response":
-                return _parse_control_response(data)
-            case _:
-                # Return UnknownMessage for unrecognized types for forward compatibility
-                logger.debug(f"Unknown message type: {message_type}, returning UnknownMessage")
-                return UnknownMessage(type=message_type, raw_data=data)
+        parser = _MESSAGE_PARSERS.get(message_type)
+        if parser is None:
+            # Return UnknownMessage for unrecognized types for forward compatibility
+            logger.debug(f"Unknown message type: {message_type}, returning UnknownMessage")
+            return UnknownMessage(type=message_type, raw_data=data)
+        return parser(data)
     except (KeyError, TypeError, ValueError, AttributeError) as e:
         # Catch parsing errors and return UnknownMessage instead of raising
         logger.warning(f"Failed to parse {message_type} message: {e}, returning UnknownMessage")
@@ -119,67 +147,70 @@ def parse_message(data: dict[str, Any] | str) -> Message:
         return UnknownMessage(type=message_type, raw_data=data)
 
 
+def parse_messages(data: str | bytes) -> list[Message]:
+    """
+    Parse a buffer of newline-delimited JSON messages, as emitted by the CLI.
+
+    The buffer is split on newlines in one C-level call and blank lines are skipped,
+    which avoids a Python-level read loop when a whole stream is already in memory.
+    Only newlines separate messages; str.splitlines() would also split on U+2028,
+    U+2029 and U+0085, which JSON allows unescaped inside strings. Like
+    parse_message(), this never raises for malformed lines; each one becomes an
+    UnknownMessage.
+
+    Args:
+        data: NDJSON text or bytes, one message per line
+
+    Returns:
+        Parsed Message objects, in stream order
+
+    Example:
+        ```python
+        messages = parse_messages(stdout_bytes)
+        results = [m for m in messages if isinstance(m, ResultMessage)]
+        ```
+    """
+    parse = parse_message
+    separator = b"\n" if isinstance(data, bytes) else "\n"
+    return [parse(line) for line in data.split(separator) if line.strip()]
+
+
 def _parse_content_blocks(blocks: list[dict[str, Any]]) -> list[ContentBlock]:
     """Parse content blocks from message data.
 
+    The whole list is validated in a single call to the compiled pydantic-core
+    validator, which maps each block's "type" to its model. Only when that fails are
+    blocks of unrecognized types filtered out (they are skipped) and the rest retried.
+
     Args:
         blocks: List of content block dictionaries
 
     Returns:
         List of parsed ContentBlock objects
     """
-    content_blocks: list[ContentBlock] = []
-    for block in blocks:
-        match block["type"]:
-            case "text":
-                content_blocks.append(TextBlock(text=block["text"]))
-            case "thinking":
-                content_blocks.append(
-                    ThinkingBlock(
-                        thinking=block["thinking"],
-                        signature=block["signature"],
-                    )
-                )
-            case "tool_use":
-                content_blocks.append(
-                    ToolUseBlock(
-                        id=block["id"],
-                        name=block["name"],
-                        input=block["input"],
-                    )
-                )
-            case "tool_result":
-                content_blocks.append(
-                    ToolResultBlock(
-                        tool_use_id=block["tool_use_id"],
-                        content=block.get("content"),
-                        is_error=block.get("is_error"),
-                    )
-                )
-            case "interrupt":
-                content_blocks.append(InterruptBlock())
-    return content_blocks
+    try:
+        return _CONTENT_BLOCKS_ADAPTER.validate_python(blocks)
+    except ValidationError:
+        known = [block for block in blocks if block["type"] in _CONTENT_BLOCK_TYPES]
+        if len(known) == len(blocks):
+            raise
+        return _CONTENT_BLOCKS_ADAPTER.validate_python(known)
 
 
 def _parse_user_message(data: dict[str, Any]) -> UserMessage:
     """Parse a user message."""
-    parent_tool_use_id = data.get("parent_tool_use_id")
-    tool_use_result = data.get("tool_use_result")
-    uuid = data.get("uuid")
-
-    # Check if content is a list of blocks
-    if isinstance(data["message"]["content"], list):
-        user_content_blocks = _parse_content_blocks(data["message"]["content"])
-        return UserMessage(
-            content=user_content_blocks,
-            uuid=uuid,
-            parent_tool_use_id=parent_tool_use_id,
-            tool_use_result=tool_use_result,
-        )
+    get = data.get
+    parent_tool_use_id = get("parent_tool_use_id")
+    tool_use_result = get("tool_use_result")
+    uuid = get("uuid")
+
+    content = data["message"]["content"]
+    # Simple string content is the common case; anything else is a list of blocks
+    if type(content) is not str:
+        content = _parse_content_blocks(content)
 
-    # Simple string content
     return UserMessage(
-        content=data["message"]["content"],
+        content=content,
         uuid=uuid,
         parent_tool_use_id=parent_tool_use_id,
         tool_use_result=tool_use_result,
@@ -188,13 +219,15 @@ def _parse_user_message(data: dict[str, Any]) -> UserMessage:
 
 def _parse_assistant_message(data: dict[str, Any]) -> AssistantMessage:
     """Parse an assistant message."""
-    content_blocks = _parse_content_blocks(data["message"]["content"])
+    get = data.get
+    message = data["message"]
+    content_blocks = _parse_content_blocks(message["content"])
 
     return AssistantMessage(
         content=content_blocks,
-        model=data["message"]["model"],
-        parent_tool_use_id=data.get("parent_tool_use_id"),
-        error=data.get("error"),
+        model=message["model"],
+        parent_tool_use_id=get("parent_tool_use_id"),
+        error=get("error"),
     )
 
 
@@ -208,6 +241,7 @@ def _parse_system_message(data: dict[str, Any]) -> SystemMessage:
 
 def _parse_result_message(data: dict[str, Any]) -> ResultMessage:
     """Parse a result message."""
+    get = data.get
     return ResultMessage(
         subtype=data["subtype"],
         duration_ms=data["duration_ms"],
@@ -215,10 +249,10 @@ def _parse_result_message(data: dict[str, Any]) -> ResultMessage:
         is_error=data["is_error"],
         num_turns=data["num_turns"],
         session_id=data["session_id"],
-        total_cost_usd=data.get("total_cost_usd"),
-        usage=data.get("usage"),
-        result=data.get("result"),
-        structured_output=data.get("structured_output"),
+        total_cost_usd=get("total_cost_usd"),
+        usage=get("usage"),
+        result=get("result"),
+        structured_output=get("structured_output"),
     )
 
 
@@ -240,3 +274,14 @@ def _parse_control_response(data: dict[str, Any]) -> ControlResponseMessage:
         request_id=response_data.get("request_id"),
         response=response_data,
     )
+
+
+# Message type -> parser, built once so dispatch is a single dict lookup
+_MESSAGE_PARSERS: dict[str, Callable[[dict[str, Any]], Message]] = {
+    "user": _parse_user_message,
+    "assistant": _parse_assistant_message,
+    "system": _parse_system_message,
+    "result": _parse_result_message,
+    "stream_event": _parse_stream_event,
+    "control_response": _parse_control_response,
+}
@@ -17,10 +17,10 @@ import json
 import logging
 import os
 import queue
+import secrets
 import subprocess
 import sys
 import threading
-import time
 from collections.abc import Iterator
 from queue import Queue, SimpleQueue
 from typing import Any
@@ -140,14 +140,15 @@ class PersistentProcessManager:
                     kwargs = kwargs.copy()
                     kwargs["start_new_session"] = True
 
-                # Start process with stdin for bidirectional communication
-                # Use bufsize=0 for unbuffered I/O (critical for pipe communication)
+                # Start process with stdin for bidirectional communication.
+                # Keep the default buffered pipes: readline() on an unbuffered pipe
+                # issues one read syscall per byte, and the stdin writer flushes
+                # after every request anyway.
                 self._process = subprocess.Popen(
                     cmd,
                     stdin=subprocess.PIPE,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    bufsize=0,  # Unbuffered
                     **kwargs,
                 )
 
@@ -209,17 +210,14 @@ class PersistentProcessManager:
         with self._init_cond:
             # Wait for initialization to complete if in progress
             # This prevents race conditions where stop() is called during start()
-            wait_start = time.time()
-            while self._initializing:
-                remaining = MAX_INITIALIZATION_WAIT_TIME - (time.time() - wait_start)
-                if remaining <= 0:
-                    logger.warning(
-                        "Initialization still in progress after %.1fs, proceeding with stop",
-                        MAX_INITIALIZATION_WAIT_TIME,
-                    )
-                    break
-                # Wait with timeout to avoid deadlock
-                self._init_cond.wait(timeout=min(0.1, remaining))
+            # wait_for() handles spurious wakeups and the deadline itself
+            if not self._init_cond.wait_for(
+                lambda: not self._initializing, timeout=MAX_INITIALIZATION_WAIT_TIME
+            ):
+                logger.warning(
+                    "Initialization still in progress after %.1fs, proceeding with stop",
+                    MAX_INITIALIZATION_WAIT_TIME,
+                )
 
             if self._process is None:
                 return
@@ -323,26 +321,9 @@ class PersistentProcessManager:
                     yield line
 
                 except queue.Empty:
-                    # Timeout - check if process is still alive
-
-                    # Check for worker thread errors
-                    if thread_error := self.check_error():
-                        raise RuntimeError(f"Worker thread error: {thread_error}") from thread_error
-
-                    if self._process.poll() is not None:
-                        # Process died
-                        self._log_debug("Process is dead! exit code: %s", self._process.returncode)
-
-                        stderr_output = self._get_stderr_copy()
-                        if stderr_output:
-                            self._log_debug("Stderr output:\n%s", stderr_output)
-
-                        raise ProcessExecutionError(
-                            f"Process terminated unexpectedly (exit code {self._process.returncode})",
-                            exit_code=self._process.returncode or -1,
-                            stderr=stderr_output,
-                        )
-                    # Continue waiting if process is still running
+                    # Timeout - raise if a worker failed or the process died,
+                    # otherwise continue waiting
+                    self._raise_if_unhealthy(self._process)
                     continue
 
         except GeneratorExit:
@@ -354,11 +335,71 @@ class PersistentProcessManager:
 
         self._log_debug("read_lines() completed after %d iterations", iteration_count)
 
+    def read_one(self, timeout: float = DEFAULT_READ_TIMEOUT) -> bytes | None:
+        """Read a single line from stdout.
+
+        Unlike breaking out of read_lines() after the first line, this does not
+        create a generator and does not drain the lines still queued behind it.
+
+        Args:
+            timeout: Seconds to wait for the line (default: 30.0)
+
+        Returns:
+            Raw line bytes, or None on EOF or if no line arrived within timeout
+
+        Raises:
+            RuntimeError: If process not running
+            ProcessExecutionError: If process terminates unexpectedly
+        """
+        line_queue = self._line_queue
+        process = self._process
+        if line_queue is None or process is None:
+            raise RuntimeError("Process not running. Call start() first.")
+
+        try:
+            line = line_queue.get(timeout=timeout)
+        except queue.Empty:
+            self._raise_if_unhealthy(process)
+            return None
+
+        if line is None:
+            # EOF sentinel - put it back so later readers also see EOF
+            try:
+                line_queue.put(None, block=False)
+            except queue.Full:
+                pass
+
+        return line
+
+    def _raise_if_unhealthy(self, process: subprocess.Popen) -> None:
+        """Raise if a worker thread failed or the process died.
+
+        Args:
+            process: The subprocess being read from
+
+        Raises:
+            RuntimeError: If a worker thread captured an exception
+            ProcessExecutionError: If the process has terminated
+        """
+        if thread_error := self.check_error():
+            raise RuntimeError(f"Worker thread error: {thread_error}") from thread_error
+
+        if process.poll() is not None:
+            self._log_debug("Process is dead! exit code: %s", process.returncode)
+
+            stderr_output = self._get_stderr_copy()
+            if stderr_output:
+                self._log_debug("Stderr output:\n%s", stderr_output)
+
+            raise ProcessExecutionError(
+                f"Process terminated unexpectedly (exit code {process.returncode})",
+                exit_code=process.returncode or -1,
+                stderr=stderr_output,
+            )
+
     def write_interrupt(self) -> None:
         """Send interrupt signal via stdin."""
         # Generate unique request ID using secrets for cryptographic security
-        import secrets
-
         request_id = f"req_{secrets.token_hex(8)}"
 
         control_request = {
@@ -397,7 +438,24 @@ class PersistentProcessManager:
         with self._stderr_lock:
             return "\n".join(self._stderr_buffer) if self._stderr_buffer else ""
 
-    def _drain_line_queue(self) -> None:
+    def flush(self) -> int:
+        """Discard stdout lines that have been read but not yet consumed.
+
+        Allows a running process to be reused for independent exchanges
+        without output left over from a previous one leaking into the next.
+        An EOF sentinel, if queued, is preserved.
+
+        At most DRAIN_QUEUE_MAX_ITEMS lines are discarded per call, so a process
+        that keeps writing cannot keep flush() busy. Any lines beyond the cap stay
+        queued; call flush() again until it returns less than the cap to empty
+        the queue.
+
+        Returns:
+            Number of lines discarded
+        """
+        return self._drain_line_queue()
+
+    def _drain_line_queue(self) -> int:
         """Drain all remaining items from the line queue.
 
         This is called when a generator is closed prematurely to prevent
@@ -405,9 +463,12 @@ class PersistentProcessManager:
 
         Uses non-blocking get with a maximum item limit to avoid
         infinite loops or excessive processing time.
+
+        Returns:
+            Number of items discarded
         """
         if self._line_queue is None:
-            return
+            return 0
 
         drained = 0
         while drained < DRAIN_QUEUE_MAX_ITEMS:
@@ -431,6 +492,8 @@ class PersistentProcessManager:
             # Log if we hit the limit - might indicate a problem
             self._log_debug("Drained line queue hit max limit (%d items)", DRAIN_QUEUE_MAX_ITEMS)
 
+        return drained
+
     def is_alive(self) -> bool:
         """Check if the process is still running.
 
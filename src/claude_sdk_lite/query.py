@@ -19,7 +19,7 @@ from claude_sdk_lite.exceptions import (
     QueryError,
 )
 from claude_sdk_lite.executors import AsyncProcessExecutor, SyncProcessExecutor
-from claude_sdk_lite.message_parser import MessageParseError, parse_message
+from claude_sdk_lite.message_parser import MessageParseError, loads_json, parse_message
 from claude_sdk_lite.options import ClaudeOptions
 from claude_sdk_lite.types import AssistantMessage, Message, ResultMessage, TextBlock
 
@@ -45,7 +45,7 @@ def _parse_lines_to_messages(lines: Iterator[bytes]) -> Iterator[Message]:
 
         try:
             # Parse JSON line
-            data = json.loads(line_str)
+            data = loads_json(line_str)
             if _DEBUG:
                 logger.debug("Parsed JSON data: %s", data)
             message = parse_message(data)
@@ -83,7 +83,7 @@ async def _async_parse_lines_to_messages(lines: AsyncIterator[bytes]) -> AsyncIt
 
         try:
             # Parse JSON line
-            data = json.loads(line_str)
+            data = loads_json(line_str)
             if _DEBUG:
                 logger.debug("Parsed JSON data: %s", data)
             message = parse_message(data)
@@ -353,13 +353,13 @@ def query_text(
         # Output: The capital of France is Paris.
         ```
     """
-    text_parts = []
-
-    for message in query(prompt=prompt, options=options):
-        if isinstance(message, AssistantMessage):
-            for block in message.content:
-                if isinstance(block, TextBlock):
-                    text_parts.append(block.text)
+    text_parts = [
+        block.text
+        for message in query(prompt=prompt, options=options)
+        if isinstance(message, AssistantMessage)
+        for block in message.content
+        if isinstance(block, TextBlock)
+    ]
 
     return "".join(text_parts)
 
@@ -395,12 +395,12 @@ async def async_query_text(
             # Output: The capital of France is Paris.
         ```
     """
-    text_parts = []
-
-    async for message in async_query(prompt=prompt, options=options):
-        if isinstance(message, AssistantMessage):
-            for block in message.content:
-                if isinstance(block, TextBlock):
-                    text_parts.append(block.text)
+    text_parts = [
+        block.text
+        async for message in async_query(prompt=prompt, options=options)
+        if isinstance(message, AssistantMessage)
+        for block in message.content
+        if isinstance(block, TextBlock)
+    ]
 
     return "".join(text_parts)
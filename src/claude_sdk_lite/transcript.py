@@ -0,0 +1,142 @@
+"""Columnar view of a CLI message stream for bulk transcript processing.
+
+parse_message() builds one validated object per message, which suits interactive
+use. Analytics over long transcripts ("all assistant text", "total duration") only
+need a few fields per message, so parse_transcript() reads them straight from the
+decoded JSON into parallel per-message columns without constructing message models.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .message_parser import loads_json
+
+
+class Transcript(BaseModel):
+    """Per-message columns of a transcript; row ``i`` of every column is message ``i``.
+
+    Columns hold None (or an empty list) where a field does not apply to a message's
+    type, e.g. ``models`` is only set for assistant messages and ``durations_ms`` only
+    for result messages.
+
+    Example:
+        ```python
+        transcript = parse_transcript(stdout_bytes.splitlines())
+        print(transcript.assistant_text())
+        print(transcript.total_duration_ms())
+        ```
+    """
+
+    types: list[str] = Field(default_factory=list)
+    models: list[str | None] = Field(default_factory=list)
+    texts: list[list[str]] = Field(default_factory=list)
+    durations_ms: list[int | None] = Field(default_factory=list)
+    costs_usd: list[float | None] = Field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def assistant_text(self, separator: str = "") -> str:
+        """Concatenate the text blocks of all assistant messages, in order."""
+        return separator.join([text for texts in self.texts for text in texts])
+
+    def total_duration_ms(self) -> int:
+        """Sum the durations reported by result messages."""
+        return sum([duration for duration in self.durations_ms if duration is not None])
+
+    def total_cost_usd(self) -> float:
+        """Sum the costs reported by result messages."""
+        return sum([cost for cost in self.costs_usd if cost is not None], 0.0)
+
+
+def _str_or_none(value: Any) -> str | None:
+    return value if isinstance(value, str) else None
+
+
+def _int_or_none(value: Any) -> int | None:
+    # bool is an int subclass but never a valid count
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _float_or_none(value: Any) -> float | None:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def parse_transcript(lines: Iterable[dict[str, Any] | str | bytes]) -> Transcript:
+    """
+    Build a columnar Transcript from CLI output lines in a single pass.
+
+    Like parse_message(), this never raises for malformed input: blank lines are
+    skipped, lines that are not JSON objects get the type "invalid_json" and
+    messages without a string type get "missing_type". Fields are read leniently:
+    a message missing a field, or holding a value of the wrong JSON type, only
+    leaves its cell empty.
+
+    Args:
+        lines: NDJSON lines (str or bytes) or already-decoded message dicts
+
+    Returns:
+        Transcript with one row per message
+    """
+    types: list[str] = []
+    models: list[str | None] = []
+    texts: list[list[str]] = []
+    durations_ms: list[int | None] = []
+    costs_usd: list[float | None] = []
+
+    for line in lines:
+        if not isinstance(line, dict):
+            if not line.strip():
+                continue
+            try:
+                line = loads_json(line)
+            except ValueError:
+                line = None
+            if not isinstance(line, dict):
+                types.append("invalid_json")
+                models.append(None)
+                texts.append([])
+                durations_ms.append(None)
+                costs_usd.append(None)
+                continue
+
+        get = line.get
+        message_type = get("type")
+        if not message_type or not isinstance(message_type, str):
+            message_type = "missing_type"
+        model = None
+        message_texts: list[str] = []
+        if message_type == "assistant":
+            try:
+                message = line["message"]
+                model = _str_or_none(message.get("model"))
+                message_texts = [
+                    block["text"]
+                    for block in message["content"]
+                    if block["type"] == "text" and isinstance(block["text"], str)
+                ]
+            except (KeyError, TypeError, AttributeError):
+                pass
+
+        types.append(message_type)
+        models.append(model)
+        texts.append(message_texts)
+        if message_type == "result":
+            durations_ms.append(_int_or_none(get("duration_ms")))
+            costs_usd.append(_float_or_none(get("total_cost_usd")))
+        else:
+            durations_ms.append(None)
+            costs_usd.append(None)
+
+    # Every cell was type-checked as it was appended, so skip re-validating the columns
+    return Transcript.model_construct(
+        types=types,
+        models=models,
+        texts=texts,
+        durations_ms=durations_ms,
+        costs_usd=costs_usd,
+    )
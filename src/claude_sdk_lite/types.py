@@ -5,12 +5,19 @@ Compatible with official claude-agent-sdk message types.
 
 from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, InstanceOf
+
+# Free-form JSON objects passed through from the CLI are checked to be dicts but not
+# copied or walked key by key (so keys are not checked to be str); their contents are
+# only read if the caller needs them, and the model aliases the caller's dict
+_RawJSONObject = InstanceOf[dict[str, Any]]
 
 
 class TextBlock(BaseModel):
     """Text content block."""
 
+    __match_args__ = ("text",)
+
     text: str
     type: Literal["text"] = "text"
 
@@ -18,23 +25,33 @@ class TextBlock(BaseModel):
 class ThinkingBlock(BaseModel):
     """Thinking content block (extended thinking)."""
 
+    __match_args__ = ("thinking", "signature")
+
     thinking: str
     signature: str
     type: Literal["thinking"] = "thinking"
 
 
 class ToolUseBlock(BaseModel):
-    """Tool use content block."""
+    """Tool use content block.
+
+    ``input`` is the tool input dict as received from the CLI, stored by reference
+    rather than copied; treat it as read-only.
+    """
+
+    __match_args__ = ("id", "name", "input")
 
     id: str
     name: str
-    input: dict[str, Any]
+    input: _RawJSONObject
     type: Literal["tool_use"] = "tool_use"
 
 
 class ToolResultBlock(BaseModel):
     """Tool result content block."""
 
+    __match_args__ = ("tool_use_id", "content", "is_error")
+
     tool_use_id: str
     content: str | list[dict[str, Any]] | None = None
     is_error: bool | None = None
@@ -57,6 +74,8 @@ ContentBlock = TextBlock | ThinkingBlock | ToolUseBlock | ToolResultBlock | Inte
 class UserMessage(BaseModel):
     """User message."""
 
+    __match_args__ = ("content", "uuid", "parent_tool_use_id", "tool_use_result")
+
     content: str | list[ContentBlock]
     uuid: str | None = None
     parent_tool_use_id: str | None = None
@@ -75,6 +94,8 @@ class AssistantMessage(BaseModel):
         ```
     """
 
+    __match_args__ = ("content", "model", "parent_tool_use_id", "error")
+
     content: list[ContentBlock]
     model: str
     parent_tool_use_id: str | None = None
@@ -82,10 +103,16 @@ class AssistantMessage(BaseModel):
 
 
 class SystemMessage(BaseModel):
-    """System message with metadata."""
+    """System message with metadata.
+
+    ``data`` is the raw message dict as received from the CLI, stored by reference
+    rather than copied; treat it as read-only.
+    """
+
+    __match_args__ = ("subtype", "data")
 
     subtype: str
-    data: dict[str, Any]
+    data: _RawJSONObject
 
 
 class ResultMessage(BaseModel):
@@ -105,6 +132,19 @@ class ResultMessage(BaseModel):
         ```
     """
 
+    __match_args__ = (
+        "subtype",
+        "duration_ms",
+        "duration_api_ms",
+        "is_error",
+        "num_turns",
+        "session_id",
+        "total_cost_usd",
+        "usage",
+        "result",
+        "structured_output",
+    )
+
     subtype: str
     duration_ms: int
     duration_api_ms: int
@@ -118,11 +158,17 @@ class ResultMessage(BaseModel):
 
 
 class StreamEvent(BaseModel):
-    """Stream event for partial message updates during streaming."""
+    """Stream event for partial message updates during streaming.
+
+    ``event`` is the raw event dict as received from the CLI, stored by reference
+    rather than copied; treat it as read-only.
+    """
+
+    __match_args__ = ("uuid", "session_id", "event", "parent_tool_use_id")
 
     uuid: str
     session_id: str
-    event: dict[str, Any]
+    event: _RawJSONObject
     parent_tool_use_id: str | None = None
 
 
@@ -133,6 +179,8 @@ class ControlResponseMessage(BaseModel):
     (like interrupt signals). It contains the response status and request ID.
     """
 
+    __match_args__ = ("subtype", "request_id", "response")
+
     subtype: str
     request_id: str | None = None
     response: dict[str, Any]
@@ -145,6 +193,9 @@ class UnknownMessage(BaseModel):
     to continue processing instead of failing. Users can inspect the raw data
     and decide how to handle these messages.
 
+    ``raw_data`` is the dict as received from the CLI, stored by reference rather
+    than copied; treat it as read-only.
+
     Example:
         ```python
         msg = UnknownMessage(
@@ -156,8 +207,10 @@ class UnknownMessage(BaseModel):
         ```
     """
 
+    __match_args__ = ("type", "raw_data")
+
     type: str
-    raw_data: dict[str, Any]
+    raw_data: _RawJSONObject
 
 
 Message = (
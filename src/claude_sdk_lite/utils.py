@@ -75,9 +75,7 @@ async def find_tool_in_system(tool_name: str) -> str | None:
         executor = AsyncProcessExecutor()
 
         # Collect all output lines
-        output_lines = []
-        async for line in executor.async_execute(command):
-            output_lines.append(line.decode().strip())
+        output_lines = [line.decode().strip() async for line in executor.async_execute(command)]
 
         return _select_best_path(output_lines, system)
 
@@ -102,9 +100,7 @@ def find_tool_in_system_sync(tool_name: str) -> str | None:
         executor = SyncProcessExecutor()
 
         # Collect all output lines
-        output_lines = []
-        for line in executor.execute(command):
-            output_lines.append(line.decode().strip())
+        output_lines = [line.decode().strip() for line in executor.execute(command)]
 
         return _select_best_path(output_lines, system)
 
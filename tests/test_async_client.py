@@ -5,9 +5,16 @@ with the new event-driven message handling.
 """
 
 import asyncio
+import os
+import uuid
 
 import pytest
-from test_helpers import get_cat_command, get_echo_command
+from test_helpers import (
+    CMD_HELLO_AND_RESULT,
+    CMD_HI_AND_RESULT,
+    CMD_STDERR_AND_RESULT,
+    get_cat_command,
+)
 
 from claude_sdk_lite import (
     AsyncClaudeClient,
@@ -17,6 +24,7 @@ from claude_sdk_lite import (
     DefaultMessageHandler,
     MessageEventListener,
 )
+from claude_sdk_lite.async_persistent_executor import AsyncPersistentProcessManager
 from claude_sdk_lite.types import (
     AssistantMessage,
     TextBlock,
@@ -61,8 +69,6 @@ class TestAsyncClaudeClientInit:
 
     def test_init_with_valid_uuid_session_id(self):
         """Test that valid UUID session_id is accepted."""
-        import uuid
-
         handler = DefaultMessageHandler()
         session_id = str(uuid.uuid4())
         options = ClaudeOptions(session_id=session_id)
@@ -80,8 +86,6 @@ class TestAsyncClaudeClientInit:
 
     def test_debug_flag_caching(self):
         """Test that debug flag is cached at init."""
-        import os
-
         handler = DefaultMessageHandler()
         options = ClaudeOptions()
 
@@ -170,7 +174,7 @@ class TestAsyncClaudeClientSendRequest:
 
         handler = TrackingHandler()
         client = AsyncClaudeClient(message_handler=handler)
-        client._build_command = lambda: get_echo_command("{}")
+        client._build_command = lambda: get_cat_command()
 
         await client.connect()
         await client.send_request("Test prompt")
@@ -193,7 +197,7 @@ class TestAsyncClaudeClientSendRequest:
 
         handler = AsyncTrackingHandler()
         client = AsyncClaudeClient(message_handler=handler)
-        client._build_command = lambda: get_echo_command("{}")
+        client._build_command = lambda: get_cat_command()
 
         await client.connect()
         await client.send_request("Test prompt")
@@ -215,8 +219,6 @@ class TestAsyncClaudeClientMessageHandler:
     @pytest.mark.asyncio
     async def test_custom_handler_receives_messages(self):
         """Test that custom handler receives messages."""
-        import sys
-
         class CountingHandler(MessageEventListener):
             def __init__(self):
                 self.message_count = 0
@@ -228,14 +230,7 @@ class TestAsyncClaudeClientMessageHandler:
         client = AsyncClaudeClient(message_handler=handler)
 
         # Script that outputs 2 messages
-        script = """
-import sys
-import json
-
-print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": "Hi"}]}}))
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: CMD_HI_AND_RESULT
 
         await client.connect()
         await client._manager.write_request({"start": True})
@@ -260,15 +255,7 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
         client = AsyncClaudeClient(message_handler=handler)
 
         # Use Python script to output JSON messages (more portable)
-        import sys
-
-        script = """
-import sys
-import json
-print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": "Hello"}]}}))
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: CMD_HELLO_AND_RESULT
 
         await client.connect()
         await client._manager.write_request({"start": True})
@@ -339,20 +326,11 @@ class TestAsyncClaudeClientProperties:
     @pytest.mark.asyncio
     async def test_stderr_property(self):
         """Test get_stderr method."""
-        import sys
-
         handler = DefaultMessageHandler()
         client = AsyncClaudeClient(message_handler=handler)
 
         # Use Python script to output to stderr and stdout
-        script = """
-import sys
-import json
-sys.stderr.write("error message\\n")
-sys.stderr.flush()
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: CMD_STDERR_AND_RESULT
 
         await client.connect()
         await client._manager.write_request({"start": True})
@@ -440,6 +418,9 @@ class TestAsyncDefaultMessageHandler:
         # Now should complete immediately
         assert await handler.wait_for_completion(timeout=1.0)
 
+        # Already-set event is reported without waiting, even with no timeout budget
+        assert await handler.wait_for_completion(timeout=0)
+
     @pytest.mark.asyncio
     async def test_async_handler_is_complete(self):
         """Test that is_complete returns correct status."""
@@ -501,8 +482,6 @@ class TestAsyncClaudeClientManagerType:
 
     def test_uses_async_persistent_process_manager(self):
         """Test that client uses AsyncPersistentProcessManager."""
-        from claude_sdk_lite.async_persistent_executor import AsyncPersistentProcessManager
-
         handler = DefaultMessageHandler()
         client = AsyncClaudeClient(message_handler=handler)
         assert isinstance(client._manager, AsyncPersistentProcessManager)
@@ -4,6 +4,7 @@ Uses standard Unix commands (cat, wc, grep, etc.) to test subprocess communicati
 """
 
 import asyncio
+import json
 import sys
 
 import pytest
@@ -14,6 +15,7 @@ from test_helpers import (
     get_true_command,
 )
 
+from claude_sdk_lite import async_persistent_executor
 from claude_sdk_lite.async_persistent_executor import AsyncPersistentProcessManager
 
 # ========== Helper Functions ==========
@@ -22,10 +24,11 @@ from claude_sdk_lite.async_persistent_executor import AsyncPersistentProcessMana
 async def read_n_lines_async(manager, n, timeout=2.0):
     """Read exactly n lines from manager (async)."""
     lines = []
-    async for line in manager.read_lines(timeout=timeout):
-        lines.append(line)
-        if len(lines) >= n:
+    while len(lines) < n:
+        line = await manager.read_one(timeout=timeout)
+        if line is None:
             break
+        lines.append(line)
     return lines
 
 
@@ -112,15 +115,10 @@ class TestAsyncBidirectionalCommunication:
             await manager.write_request(test_data)
 
             # cat echoes back the exact bytes
-            import json
-
-            response = None
-            async for line in manager.read_lines(timeout=2.0):
-                response = json.loads(line.decode("utf-8"))
-                break  # Only read one line
+            line = await manager.read_one(timeout=2.0)
 
-            assert response is not None
-            assert response == test_data
+            assert line is not None
+            assert json.loads(line) == test_data
 
         finally:
             await manager.stop()
@@ -144,9 +142,7 @@ class TestAsyncBidirectionalCommunication:
                 responses = await read_n_lines_async(manager, 1)
                 assert len(responses) == 1
 
-                import json
-
-                response = json.loads(responses[0].decode("utf-8"))
+                response = json.loads(responses[0])
                 assert response == msg
 
         finally:
@@ -165,10 +161,8 @@ class TestAsyncBidirectionalCommunication:
                 await manager.write_request({"sequence": i})
 
             # Then read all responses (cat echoes in order)
-            import json
-
             responses = await read_n_lines_async(manager, num_requests)
-            responses = [json.loads(r.decode("utf-8")) for r in responses]
+            responses = [json.loads(r) for r in responses]
 
             assert len(responses) == num_requests
             assert [r["sequence"] for r in responses] == [0, 1, 2]
@@ -331,9 +325,7 @@ class TestAsyncInterruptFunctionality:
             responses = await read_n_lines_async(manager, 1)
             assert len(responses) == 1
 
-            import json
-
-            response = json.loads(responses[0].decode("utf-8"))
+            response = json.loads(responses[0])
             assert response["type"] == "control_request"
             assert response["request"]["subtype"] == "interrupt"
 
@@ -362,9 +354,7 @@ class TestAsyncDataIntegrity:
             responses = await read_n_lines_async(manager, 1)
             assert len(responses) == 1
 
-            import json
-
-            response = json.loads(responses[0].decode("utf-8"))
+            response = json.loads(responses[0])
             assert response["data"] == large_data
 
         finally:
@@ -391,9 +381,7 @@ class TestAsyncDataIntegrity:
                 responses = await read_n_lines_async(manager, 1)
                 assert len(responses) == 1
 
-                import json
-
-                response = json.loads(responses[0].decode("utf-8"))
+                response = json.loads(responses[0])
                 assert response["message"] == test_str
 
         finally:
@@ -420,9 +408,7 @@ class TestAsyncDataIntegrity:
             responses = await read_n_lines_async(manager, 1)
             assert len(responses) == 1
 
-            import json
-
-            response = json.loads(responses[0].decode("utf-8"))
+            response = json.loads(responses[0])
             assert response == complex_request
 
         finally:
@@ -449,15 +435,11 @@ class TestAsyncIntegrationScenarios:
                 {"role": "user", "content": "goodbye"},
             ]
 
-            import json
-
             responses = []
             for msg in messages:
                 await manager.write_request(msg)
-                async for line in manager.read_lines(timeout=2.0):
-                    response = json.loads(line.decode("utf-8"))
-                    responses.append(response)
-                    break  # Only read one response per message
+                line = await manager.read_one(timeout=2.0)
+                responses.append(json.loads(line))
 
             assert len(responses) == 3
             for i, response in enumerate(responses):
@@ -491,13 +473,11 @@ class TestAsyncIntegrationScenarios:
         await manager.start(get_cat_command())
 
         # Do some work
-        import json
-
         for i in range(3):
             await manager.write_request({"id": i})
             responses = await read_n_lines_async(manager, 1)
             assert len(responses) == 1
-            assert json.loads(responses[0].decode("utf-8"))["id"] == i
+            assert json.loads(responses[0])["id"] == i
 
         # Stop should cleanup cleanly
         await manager.stop()
@@ -533,6 +513,89 @@ class TestAsyncGeneratorBehavior:
         finally:
             await manager.stop()
 
+    @pytest.mark.asyncio
+    async def test_read_one_does_not_drain_queue(self):
+        """Test that read_one leaves later lines queued for the next read."""
+        manager = AsyncPersistentProcessManager()
+        await manager.start(get_cat_command())
+
+        try:
+            await manager.write_request({"id": 1})
+            await manager.write_request({"id": 2})
+
+            first = await manager.read_one(timeout=2.0)
+            second = await manager.read_one(timeout=2.0)
+
+            assert json.loads(first)["id"] == 1
+            assert json.loads(second)["id"] == 2
+
+        finally:
+            await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_read_one_returns_none_on_timeout_and_eof(self):
+        """Test that read_one returns None on timeout and on EOF."""
+        manager = AsyncPersistentProcessManager()
+        await manager.start(get_cat_command())
+
+        try:
+            assert await manager.read_one(timeout=0.1) is None
+        finally:
+            await manager.stop()
+
+        await manager.start(get_true_command())
+        try:
+            assert await manager.read_one(timeout=2.0) is None
+            # EOF sentinel is preserved for subsequent reads
+            assert await manager.read_one(timeout=2.0) is None
+        finally:
+            await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_flush_discards_pending_lines(self):
+        """Test that flush discards queued lines so the process can be reused."""
+        manager = AsyncPersistentProcessManager()
+        await manager.start(get_cat_command())
+
+        try:
+            await manager.write_request({"stale": True})
+            # Wait until cat has echoed the line into the queue
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 5.0
+            while manager._line_queue.qsize() < 1 and loop.time() < deadline:
+                await asyncio.sleep(0.01)
+
+            assert await manager.flush() == 1
+            assert await manager.read_one(timeout=0.1) is None
+
+            await manager.write_request({"fresh": True})
+            assert b"fresh" in await manager.read_one(timeout=2.0)
+
+        finally:
+            await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_flush_discards_at_most_the_drain_cap(self, monkeypatch):
+        """Test that flush stops at DRAIN_QUEUE_MAX_ITEMS and leaves the rest queued."""
+        monkeypatch.setattr(async_persistent_executor, "DRAIN_QUEUE_MAX_ITEMS", 2)
+        manager = AsyncPersistentProcessManager()
+        await manager.start(get_cat_command())
+
+        try:
+            for i in range(3):
+                await manager.write_request({"stale": i})
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 5.0
+            while manager._line_queue.qsize() < 3 and loop.time() < deadline:
+                await asyncio.sleep(0.01)
+
+            assert await manager.flush() == 2
+            assert await manager.flush() == 1
+            assert await manager.flush() == 0
+
+        finally:
+            await manager.stop()
+
     @pytest.mark.asyncio
     async def test_read_lines_with_timeout(self):
         """Test read_lines respects timeout parameter."""
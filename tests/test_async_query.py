@@ -1,9 +1,15 @@
 """Tests for async query function with mocked subprocess."""
 
+import asyncio
 import json
-from unittest.mock import AsyncMock, patch
 
 import pytest
+from test_helpers import (
+    AsyncSubprocessStub,
+    MockAsyncProcess,
+    encode_json_lines,
+    fake_async_exit,
+)
 
 from claude_sdk_lite import ClaudeOptions
 from claude_sdk_lite.query import (
@@ -15,40 +21,20 @@ from claude_sdk_lite.query import async_query_text as query_text
 from claude_sdk_lite.types import AssistantMessage, ResultMessage
 
 
-class AsyncIteratorMock:
-    """Mock async iterator."""
-
-    def __init__(self, items):
-        self.items = items
-        self.index = 0
-
-    def __aiter__(self):
-        return self
-
-    async def __anext__(self):
-        if self.index >= len(self.items):
-            raise StopAsyncIteration
-        item = self.items[self.index]
-        self.index += 1
-        return item
+@pytest.fixture
+def subprocess_exec_stub(monkeypatch):
+    """Replace asyncio.create_subprocess_exec with a stub; tests set its ``process``."""
+    stub = AsyncSubprocessStub()
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", stub)
+    return stub
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_cli_response():
     """Create a mock CLI process with given responses."""
 
     def _create(responses, returncode=0):
-        mock_process = AsyncMock()
-        mock_process.returncode = returncode
-        mock_process.wait = AsyncMock(return_value=returncode)
-        mock_process.stderr = AsyncMock()
-
-        # Create a list of encoded responses
-        lines = [json.dumps(r).encode() + b"\n" for r in responses]
-
-        # Create async iterator mock
-        mock_process.stdout = AsyncIteratorMock(lines)
-        return mock_process
+        return MockAsyncProcess(stdout_lines=encode_json_lines(responses), returncode=returncode)
 
     return _create
 
@@ -57,7 +43,7 @@ def mock_cli_response():
 class TestAsyncQueryFunction:
     """Test the async query() function."""
 
-    async def test_query_simple_success(self, mock_cli_response):
+    async def test_query_simple_success(self, mock_cli_response, subprocess_exec_stub):
         """Test successful query with simple response."""
         responses = [
             {
@@ -67,16 +53,16 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            messages = []
-            async for msg in query(prompt="Hi"):
-                messages.append(msg)
+        subprocess_exec_stub.process = mock_process
+        messages = []
+        async for msg in query(prompt="Hi"):
+            messages.append(msg)
 
-            assert len(messages) == 1
-            assert isinstance(messages[0], AssistantMessage)
-            assert messages[0].content[0].text == "Hello!"
+        assert len(messages) == 1
+        assert isinstance(messages[0], AssistantMessage)
+        assert messages[0].content[0].text == "Hello!"
 
-    async def test_query_with_thinking(self, mock_cli_response):
+    async def test_query_with_thinking(self, mock_cli_response, subprocess_exec_stub):
         """Test query with thinking blocks."""
         responses = [
             {
@@ -101,17 +87,17 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            messages = []
-            async for msg in query(prompt="What is the meaning of life?"):
-                messages.append(msg)
+        subprocess_exec_stub.process = mock_process
+        messages = []
+        async for msg in query(prompt="What is the meaning of life?"):
+            messages.append(msg)
 
-            assert len(messages) == 2
-            assert isinstance(messages[0], AssistantMessage)
-            assert len(messages[0].content) == 2
-            assert isinstance(messages[1], ResultMessage)
+        assert len(messages) == 2
+        assert isinstance(messages[0], AssistantMessage)
+        assert len(messages[0].content) == 2
+        assert isinstance(messages[1], ResultMessage)
 
-    async def test_query_with_tool_use(self, mock_cli_response):
+    async def test_query_with_tool_use(self, mock_cli_response, subprocess_exec_stub):
         """Test query that uses tools."""
         responses = [
             {
@@ -132,16 +118,16 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            messages = []
-            async for msg in query(prompt="List files"):
-                messages.append(msg)
+        subprocess_exec_stub.process = mock_process
+        messages = []
+        async for msg in query(prompt="List files"):
+            messages.append(msg)
 
-            assert len(messages) == 1
-            assert len(messages[0].content) == 2
-            assert messages[0].content[1].name == "bash"
+        assert len(messages) == 1
+        assert len(messages[0].content) == 2
+        assert messages[0].content[1].name == "bash"
 
-    async def test_query_with_custom_options(self, mock_cli_response):
+    async def test_query_with_custom_options(self, mock_cli_response, subprocess_exec_stub):
         """Test query with custom options."""
         responses = [
             {
@@ -154,43 +140,51 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_subprocess:
-            options = ClaudeOptions(model="haiku", max_turns=1, system_prompt="Be concise")
+        subprocess_exec_stub.process = mock_process
+        options = ClaudeOptions(model="haiku", max_turns=1, system_prompt="Be concise")
 
-            async for msg in query(prompt="Quick question", options=options):
-                pass
+        async for msg in query(prompt="Quick question", options=options):
+            pass
 
-            # Verify subprocess was called with correct arguments
-            call_args = mock_subprocess.call_args[0]
-            assert "--model" in call_args
-            assert "haiku" in call_args
-            assert "--max-turns" in call_args
-            assert "1" in call_args
-            assert "--system-prompt" in call_args
-            assert "Be concise" in call_args
+        # Verify subprocess was called with correct arguments
+        call_args = subprocess_exec_stub.call_args[0]
+        assert "--model" in call_args
+        assert "haiku" in call_args
+        assert "--max-turns" in call_args
+        assert "1" in call_args
+        assert "--system-prompt" in call_args
+        assert "Be concise" in call_args
 
-    async def test_query_cli_not_found(self):
+    async def test_query_cli_not_found(self, subprocess_exec_stub):
         """Test query when CLI is not found."""
-        with patch("asyncio.create_subprocess_exec", side_effect=FileNotFoundError):
-            with pytest.raises(CLINotFoundError, match="Claude Code CLI not found"):
-                async for msg in query(prompt="test"):
-                    pass
+        subprocess_exec_stub.side_effect = FileNotFoundError
+        with pytest.raises(CLINotFoundError, match="Claude Code CLI not found"):
+            async for msg in query(prompt="test"):
+                pass
 
-    async def test_query_cli_execution_error(self):
+    async def test_query_cli_execution_error(self, subprocess_exec_stub):
         """Test query when CLI execution fails."""
-        mock_process = AsyncMock()
-        mock_process.returncode = 1
-        mock_process.wait = AsyncMock(return_value=1)
-        mock_process.stderr = AsyncMock()
-        mock_process.stderr.read = AsyncMock(return_value=b"Error: Invalid option\n")
-        mock_process.stdout = AsyncIteratorMock([])
-
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            with pytest.raises(CLIExecutionError, match="CLI exited with code 1"):
-                async for msg in query(prompt="test"):
-                    pass
-
-    async def test_query_stops_at_result_message(self, mock_cli_response):
+        mock_process = fake_async_exit(1, stderr=b"Error: Invalid option\n")
+
+        subprocess_exec_stub.process = mock_process
+        with pytest.raises(CLIExecutionError, match="CLI exited with code 1"):
+            async for msg in query(prompt="test"):
+                pass
+
+    async def test_query_reads_stderr_in_large_chunks(self, subprocess_exec_stub):
+        """Test that stderr is drained to EOF or in reads of at least 64 KiB, never tiny chunks."""
+        stderr = b"e" * 200_000
+        mock_process = fake_async_exit(1, stderr=stderr)
+
+        subprocess_exec_stub.process = mock_process
+        with pytest.raises(CLIExecutionError) as exc_info:
+            async for msg in query(prompt="test"):
+                pass
+
+        assert exc_info.value.stderr == stderr.decode()
+        assert all(size < 0 or size >= 65536 for size in mock_process.stderr.read_sizes)
+
+    async def test_query_stops_at_result_message(self, mock_cli_response, subprocess_exec_stub):
         """Test that query stops iteration at result message."""
         responses = [
             {
@@ -209,15 +203,15 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            messages = []
-            async for msg in query(prompt="test"):
-                messages.append(msg)
+        subprocess_exec_stub.process = mock_process
+        messages = []
+        async for msg in query(prompt="test"):
+            messages.append(msg)
 
-            assert len(messages) == 2
-            assert isinstance(messages[1], ResultMessage)
+        assert len(messages) == 2
+        assert isinstance(messages[1], ResultMessage)
 
-    async def test_query_uses_default_options(self, mock_cli_response):
+    async def test_query_uses_default_options(self, mock_cli_response, subprocess_exec_stub):
         """Test that query uses default options when none provided."""
         responses = [
             {
@@ -232,16 +226,16 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_subprocess:
-            async for msg in query(prompt="test"):
-                pass
+        subprocess_exec_stub.process = mock_process
+        async for msg in query(prompt="test"):
+            pass
 
-            call_args = mock_subprocess.call_args[0]
-            assert "--print" in call_args
-            assert "--output-format" in call_args
-            assert "stream-json" in call_args
+        call_args = subprocess_exec_stub.call_args[0]
+        assert "--print" in call_args
+        assert "--output-format" in call_args
+        assert "stream-json" in call_args
 
-    async def test_query_with_working_dir(self, mock_cli_response):
+    async def test_query_with_working_dir(self, mock_cli_response, subprocess_exec_stub):
         """Test query with custom working directory."""
         responses = [
             {
@@ -256,16 +250,16 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_subprocess:
-            options = ClaudeOptions(working_dir="/custom/path")
-            async for msg in query(prompt="test", options=options):
-                pass
+        subprocess_exec_stub.process = mock_process
+        options = ClaudeOptions(working_dir="/custom/path")
+        async for msg in query(prompt="test", options=options):
+            pass
 
-            call_kwargs = mock_subprocess.call_args[1]
-            assert "cwd" in call_kwargs
-            assert call_kwargs["cwd"] == "/custom/path"
+        call_kwargs = subprocess_exec_stub.call_args[1]
+        assert "cwd" in call_kwargs
+        assert call_kwargs["cwd"] == "/custom/path"
 
-    async def test_query_with_env_vars(self, mock_cli_response):
+    async def test_query_with_env_vars(self, mock_cli_response, subprocess_exec_stub):
         """Test query with custom environment variables."""
         responses = [
             {
@@ -280,21 +274,21 @@ class TestAsyncQueryFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_subprocess:
-            options = ClaudeOptions(env={"CUSTOM_VAR": "custom_value"})
-            async for msg in query(prompt="test", options=options):
-                pass
+        subprocess_exec_stub.process = mock_process
+        options = ClaudeOptions(env={"CUSTOM_VAR": "custom_value"})
+        async for msg in query(prompt="test", options=options):
+            pass
 
-            call_kwargs = mock_subprocess.call_args[1]
-            assert "env" in call_kwargs
-            assert call_kwargs["env"]["CUSTOM_VAR"] == "custom_value"
+        call_kwargs = subprocess_exec_stub.call_args[1]
+        assert "env" in call_kwargs
+        assert call_kwargs["env"]["CUSTOM_VAR"] == "custom_value"
 
 
 @pytest.mark.asyncio
 class TestAsyncQueryTextFunction:
     """Test the async query_text() convenience function."""
 
-    async def test_query_text_simple(self, mock_cli_response):
+    async def test_query_text_simple(self, mock_cli_response, subprocess_exec_stub):
         """Test query_text with simple response."""
         responses = [
             {
@@ -313,11 +307,11 @@ class TestAsyncQueryTextFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            result = await query_text(prompt="Say hello")
-            assert result == "Hello!"
+        subprocess_exec_stub.process = mock_process
+        result = await query_text(prompt="Say hello")
+        assert result == "Hello!"
 
-    async def test_query_text_multiple_blocks(self, mock_cli_response):
+    async def test_query_text_multiple_blocks(self, mock_cli_response, subprocess_exec_stub):
         """Test query_text concatenates multiple text blocks."""
         responses = [
             {
@@ -342,11 +336,11 @@ class TestAsyncQueryTextFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            result = await query_text(prompt="Test")
-            assert result == "First part. Second part."
+        subprocess_exec_stub.process = mock_process
+        result = await query_text(prompt="Test")
+        assert result == "First part. Second part."
 
-    async def test_query_text_ignores_thinking(self, mock_cli_response):
+    async def test_query_text_ignores_thinking(self, mock_cli_response, subprocess_exec_stub):
         """Test query_text ignores thinking blocks."""
         responses = [
             {
@@ -371,11 +365,11 @@ class TestAsyncQueryTextFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            result = await query_text(prompt="Test")
-            assert result == "Actual response"
+        subprocess_exec_stub.process = mock_process
+        result = await query_text(prompt="Test")
+        assert result == "Actual response"
 
-    async def test_query_text_with_options(self, mock_cli_response):
+    async def test_query_text_with_options(self, mock_cli_response, subprocess_exec_stub):
         """Test query_text with custom options."""
         responses = [
             {
@@ -397,15 +391,15 @@ class TestAsyncQueryTextFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_subprocess:
-            options = ClaudeOptions(model="haiku")
-            result = await query_text(prompt="Test", options=options)
+        subprocess_exec_stub.process = mock_process
+        options = ClaudeOptions(model="haiku")
+        result = await query_text(prompt="Test", options=options)
 
-            call_args = mock_subprocess.call_args[0]
-            assert "haiku" in call_args
-            assert result == "Quick response"
+        call_args = subprocess_exec_stub.call_args[0]
+        assert "haiku" in call_args
+        assert result == "Quick response"
 
-    async def test_query_text_empty_response(self, mock_cli_response):
+    async def test_query_text_empty_response(self, mock_cli_response, subprocess_exec_stub):
         """Test query_text with no text content."""
         responses = [
             {
@@ -434,22 +428,22 @@ class TestAsyncQueryTextFunction:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            result = await query_text(prompt="Test")
-            assert result == ""
+        subprocess_exec_stub.process = mock_process
+        result = await query_text(prompt="Test")
+        assert result == ""
 
-    async def test_query_text_handles_errors(self):
+    async def test_query_text_handles_errors(self, subprocess_exec_stub):
         """Test query_text propagates errors."""
-        with patch("asyncio.create_subprocess_exec", side_effect=FileNotFoundError):
-            with pytest.raises(CLINotFoundError):
-                await query_text(prompt="Test")
+        subprocess_exec_stub.side_effect = FileNotFoundError
+        with pytest.raises(CLINotFoundError):
+            await query_text(prompt="Test")
 
 
 @pytest.mark.asyncio
 class TestAsyncRealWorldScenarios:
     """Test real-world usage scenarios with async query."""
 
-    async def test_code_generation_workflow(self, mock_cli_response):
+    async def test_code_generation_workflow(self, mock_cli_response, subprocess_exec_stub):
         """Test a typical code generation workflow."""
         responses = [
             {
@@ -496,40 +490,37 @@ class TestAsyncRealWorldScenarios:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            messages = []
-            async for msg in query(prompt="Create a hello world function"):
-                messages.append(msg)
+        subprocess_exec_stub.process = mock_process
+        messages = []
+        async for msg in query(prompt="Create a hello world function"):
+            messages.append(msg)
 
-            assert len(messages) == 3
-            assert isinstance(messages[0], AssistantMessage)
-            assert isinstance(messages[1], AssistantMessage)
-            assert isinstance(messages[2], ResultMessage)
-            assert messages[2].total_cost_usd == 0.002
+        assert len(messages) == 3
+        assert isinstance(messages[0], AssistantMessage)
+        assert isinstance(messages[1], AssistantMessage)
+        assert isinstance(messages[2], ResultMessage)
+        assert messages[2].total_cost_usd == 0.002
 
-    async def test_error_recovery_scenario(self):
+    async def test_error_recovery_scenario(self, subprocess_exec_stub):
         """Test error scenario with CLI execution error."""
-        mock_process = AsyncMock()
-        mock_process.returncode = 1
-        mock_process.wait = AsyncMock(return_value=1)
-        mock_process.stderr = AsyncMock()
-        mock_process.stderr.read = AsyncMock(return_value=b"Error: API rate limit exceeded\n")
-        mock_process.stdout = AsyncIteratorMock([])
+        mock_process = fake_async_exit(1, stderr=b"Error: API rate limit exceeded\n")
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            with pytest.raises(CLIExecutionError) as exc_info:
-                async for msg in query(prompt="test"):
-                    pass
+        subprocess_exec_stub.process = mock_process
+        with pytest.raises(CLIExecutionError) as exc_info:
+            async for msg in query(prompt="test"):
+                pass
 
-            assert exc_info.value.exit_code == 1
-            assert "API rate limit" in str(exc_info.value.stderr)
+        assert exc_info.value.exit_code == 1
+        assert "API rate limit" in str(exc_info.value.stderr)
 
 
 @pytest.mark.asyncio
 class TestAsyncQueryStreaming:
     """Test async query streaming behavior."""
 
-    async def test_query_streams_messages_incrementally(self, mock_cli_response):
+    async def test_query_streams_messages_incrementally(
+        self, mock_cli_response, subprocess_exec_stub
+    ):
         """Test that query yields messages as they arrive."""
         responses = [
             {
@@ -556,36 +547,21 @@ class TestAsyncQueryStreaming:
         ]
         mock_process = mock_cli_response(responses)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            message_count = 0
-            async for msg in query(prompt="Test"):
-                message_count += 1
-                if message_count < 4:  # First 3 are assistant messages
-                    assert isinstance(msg, AssistantMessage)
-                else:  # Last is result
-                    assert isinstance(msg, ResultMessage)
+        subprocess_exec_stub.process = mock_process
+        message_count = 0
+        async for msg in query(prompt="Test"):
+            message_count += 1
+            if message_count < 4:  # First 3 are assistant messages
+                assert isinstance(msg, AssistantMessage)
+            else:  # Last is result
+                assert isinstance(msg, ResultMessage)
 
-            assert message_count == 4
+        assert message_count == 4
 
-    async def test_query_handles_malformed_json(self, mock_cli_response):
+    async def test_query_handles_malformed_json(self, mock_cli_response, subprocess_exec_stub):
         """Test that query handles malformed JSON gracefully by skipping invalid lines."""
 
         # Create mock with some valid and some invalid JSON
-        class MockStdoutWithInvalid:
-            def __init__(self, items):
-                self.items = items
-                self.index = 0
-
-            def __aiter__(self):
-                return self
-
-            async def __anext__(self):
-                if self.index >= len(self.items):
-                    raise StopAsyncIteration
-                item = self.items[self.index]
-                self.index += 1
-                return item
-
         responses = [
             {
                 "type": "assistant",
@@ -609,17 +585,14 @@ class TestAsyncQueryStreaming:
             json.dumps(responses[2]).encode(),
         ]
 
-        mock_process = AsyncMock()
-        mock_process.returncode = 0
-        mock_process.wait = AsyncMock(return_value=0)
-        mock_process.stdout = MockStdoutWithInvalid(lines)
+        mock_process = MockAsyncProcess(stdout_lines=lines)
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-            messages = []
-            async for msg in query(prompt="test"):
-                messages.append(msg)
+        subprocess_exec_stub.process = mock_process
+        messages = []
+        async for msg in query(prompt="test"):
+            messages.append(msg)
 
-            # Should skip invalid JSON and return only valid messages
-            assert len(messages) == 2
-            assert isinstance(messages[0], AssistantMessage)
-            assert isinstance(messages[1], ResultMessage)
+        # Should skip invalid JSON and return only valid messages
+        assert len(messages) == 2
+        assert isinstance(messages[0], AssistantMessage)
+        assert isinstance(messages[1], ResultMessage)
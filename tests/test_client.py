@@ -4,8 +4,16 @@ Tests that the client with required message_handler works correctly
 with the new event-driven message handling.
 """
 
+import os
+import time
+import uuid
+
 import pytest
-from test_helpers import get_cat_command, get_echo_command
+from test_helpers import (
+    CMD_HI_AND_RESULT,
+    CMD_STDERR_AND_RESULT,
+    get_cat_command,
+)
 
 from claude_sdk_lite import (
     ClaudeClient,
@@ -13,6 +21,7 @@ from claude_sdk_lite import (
     DefaultMessageHandler,
     MessageEventListener,
 )
+from claude_sdk_lite.types import AssistantMessage, TextBlock
 
 
 class TestClaudeClientInit:
@@ -53,8 +62,6 @@ class TestClaudeClientInit:
 
     def test_init_with_valid_uuid_session_id(self):
         """Test that valid UUID session_id is accepted."""
-        import uuid
-
         handler = DefaultMessageHandler()
         session_id = str(uuid.uuid4())
         options = ClaudeOptions(session_id=session_id)
@@ -72,8 +79,6 @@ class TestClaudeClientInit:
 
     def test_debug_flag_caching(self):
         """Test that debug flag is cached at init."""
-        import os
-
         handler = DefaultMessageHandler()
         options = ClaudeOptions()
 
@@ -156,7 +161,7 @@ class TestClaudeClientSendRequest:
 
         handler = TrackingHandler()
         client = ClaudeClient(message_handler=handler)
-        client._build_command = lambda: get_echo_command("{}")
+        client._build_command = lambda: get_cat_command()
 
         client.connect()
         client.send_request("Test prompt")
@@ -189,21 +194,11 @@ class TestClaudeClientMessageHandler:
         client = ClaudeClient(message_handler=handler)
 
         # Use Python script to output JSON messages (more portable than shell)
-        import sys
-
-        script = """
-import sys
-import json
-print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": "Hi"}]}}))
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: CMD_HI_AND_RESULT
 
         client.connect()
         client._manager.write_request({"start": True})
 
-        import time
-
         time.sleep(0.3)  # Wait for listener to process
 
         assert handler.message_count >= 2
@@ -267,26 +262,15 @@ class TestClaudeClientProperties:
 
     def test_stderr_property(self):
         """Test stderr_output property."""
-        import sys
-
         handler = DefaultMessageHandler()
         client = ClaudeClient(message_handler=handler)
 
         # Use Python script to output to stderr and stdout
-        script = """
-import sys
-import json
-sys.stderr.write("error message\\n")
-sys.stderr.flush()
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: CMD_STDERR_AND_RESULT
 
         client.connect()
         client._manager.write_request({"start": True})
 
-        import time
-
         time.sleep(0.2)
 
         stderr = client.stderr_output
@@ -321,8 +305,6 @@ class TestDefaultMessageHandler:
         """Test that DefaultMessageHandler buffers messages."""
         handler = DefaultMessageHandler()
 
-        from claude_sdk_lite.types import AssistantMessage, TextBlock
-
         msg = AssistantMessage(
             model="test",
             content=[TextBlock(text="Hello")],
@@ -338,8 +320,6 @@ class TestDefaultMessageHandler:
         """Test that on_query_start resets the buffer."""
         handler = DefaultMessageHandler()
 
-        from claude_sdk_lite.types import AssistantMessage, TextBlock
-
         msg1 = AssistantMessage(model="test", content=[TextBlock(text="First")])
         msg2 = AssistantMessage(model="test", content=[TextBlock(text="Second")])
 
@@ -6,18 +6,26 @@ and session management with the new message handler architecture.
 """
 
 import asyncio
+import json
+import os
+import queue
 import sys
+import tempfile
+import textwrap
 import threading
 import time
+import uuid
 
 import pytest
 from test_helpers import (
+    RESULT_LINE,
     get_cat_command,
 )
 
 from claude_sdk_lite import (
     AsyncClaudeClient,
     AsyncDefaultMessageHandler,
+    AsyncMessageEventListener,
     ClaudeClient,
     ClaudeOptions,
     DefaultMessageHandler,
@@ -25,34 +33,306 @@ from claude_sdk_lite import (
 )
 from claude_sdk_lite.types import (
     AssistantMessage,
+    InterruptBlock,
     ResultMessage,
     TextBlock,
+    UserMessage,
 )
 
+# Interpreter used to run fake CLI scripts
+_PY = sys.executable
 
-def create_echo_script(num_lines=1, add_result=False):
-    """Create a shell command that echoes input and optionally adds a result message.
+# Default options shared by every test; clients copy rather than mutate them
+_OPTIONS = ClaudeOptions()
 
-    Args:
-        num_lines: Number of echo commands to include
-        add_result: Whether to append a result message
+# Result line written by the fake CLIs, as raw bytes for their binary stdout
+_RESULT_LINE = RESULT_LINE.encode()
+
+# Fake CLI that emits a single result message and exits, shared by every test
+# that only needs the listener to see one message
+_RESULT_ONLY_CMD = [_PY, "-c", f"import sys; sys.stdout.buffer.write({_RESULT_LINE!r})"]
+
+# Fake CLI scripts shared by several tests; each starts with RESULT bound to
+# _RESULT_LINE and does all stdin/stdout I/O on the binary buffers
+
+# Echo one request, then complete
+_SCRIPT_ONESHOT = f"RESULT = {_RESULT_LINE!r}\n" + textwrap.dedent(
+    """
+    import sys
+    out = sys.stdout.buffer
+    line = sys.stdin.buffer.readline()
+    if line:
+        out.write(line)
+    out.write(RESULT)
+    out.flush()
+    """
+)
+
+# Echo, answer and complete each of three requests
+_SCRIPT_THREE_REQUESTS = f"RESULT = {_RESULT_LINE!r}\n" + textwrap.dedent(
+    """
+    import sys
+    out = sys.stdout.buffer
+    for i in range(1, 4):
+        line = sys.stdin.buffer.readline()
+        if line:
+            out.write(line)
+        out.write(b'{"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": "Response %d"}]}}\\n' % i)
+        out.write(RESULT)
+        out.flush()
+    """
+)
+
+# Answer once and complete without reading stdin
+_SCRIPT_ASSISTANT_AND_RESULT = f"RESULT = {_RESULT_LINE!r}\n" + textwrap.dedent(
+    """
+    import sys
+    out = sys.stdout.buffer
+    out.write(b'{"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": "Hi"}]}}\\n')
+    out.write(RESULT)
+    out.flush()
+    """
+)
+
+
+def is_user_echo_with_text(message, text):
+    """Check that a single message is a replayed user prompt carrying exactly text."""
+    # Exact type checks: the message and block models are never subclassed
+    if type(message) is not UserMessage:
+        return False
+    content = message.content
+    if type(content) is str:
+        return content == text
+    if type(content) is not list or not content:
+        return False
+    block = content[0]
+    return type(block) is TextBlock and block.text == text
+
+
+def has_user_echo_with_text(messages, text):
+    """Check whether any message is a replayed user prompt carrying text.
+
+    Single pass with early exit; use is_user_echo_with_text() to fully
+    validate one message.
+    """
+    for msg in messages:
+        if type(msg) is UserMessage:
+            content = msg.content
+            if content == text:
+                return True
+            if content and getattr(content[0], "text", None) == text:
+                return True
+    return False
+
+
+def wait_until(predicate, timeout=2.0):
+    """Poll predicate until it is true or timeout seconds have passed.
+
+    For state with no listener callback to wait on, such as the process exiting
+    or stderr arriving.
 
     Returns:
-        List of command arguments for subprocess
+        True if predicate became true, False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class SyncMessageCapture(MessageEventListener):
+    """Handler that records messages and lets tests wait for them without sleeping."""
+
+    def __init__(self):
+        self.messages = []
+        self.errors = []
+        self.query_started = False
+        self._gen = 0
+        self._cv = threading.Condition()
+
+    def on_query_start(self, prompt):
+        # No notify: waiters also need a message, and on_message wakes them
+        with self._cv:
+            self.query_started = True
+
+    def on_message(self, message):
+        with self._cv:
+            self.messages.append(message)
+            self._gen += 1
+            self._cv.notify_all()
+
+    def on_error(self, error):
+        with self._cv:
+            self.errors.append(error)
+            self._cv.notify_all()
+
+    def wait_for_message(self, timeout=2.0, min_count=1):
+        """Wait until at least min_count messages have been captured.
+
+        Returns:
+            True if the messages arrived, False on timeout
+        """
+        # Messages only accumulate, so an unlocked read can safely short-circuit
+        if len(self.messages) >= min_count:
+            return True
+        with self._cv:
+            return self._cv.wait_for(lambda: len(self.messages) >= min_count, timeout=timeout)
+
+    def wait_for_response(self, timeout=2.0, min_count=1):
+        """Wait until a query has started and min_count messages have been captured.
+
+        Returns:
+            True if both happened, False on timeout
+        """
+        with self._cv:
+            return self._cv.wait_for(
+                lambda: self.query_started and len(self.messages) >= min_count, timeout=timeout
+            )
+
+    def generation(self):
+        """Return the number of messages captured so far."""
+        with self._cv:
+            return self._gen
+
+    def wait_for_new(self, since_gen, min_new=1, timeout=2.0):
+        """Wait until min_new messages have arrived after generation since_gen.
+
+        Returns:
+            True if the messages arrived, False on timeout
+        """
+        with self._cv:
+            return self._cv.wait_for(lambda: self._gen - since_gen >= min_new, timeout=timeout)
+
+
+class AsyncMessageCapture(AsyncMessageEventListener):
+    """Async handler that records messages and lets tests await them without sleeping."""
+
+    def __init__(self):
+        self.messages = []
+        self._count = 0
+        self._cv = asyncio.Condition()
+
+    async def on_message(self, message):
+        async with self._cv:
+            self.messages.append(message)
+            self._count += 1
+            self._cv.notify_all()
+
+    async def wait_for_message(self, timeout=2.0, min_count=1):
+        """Wait until at least min_count messages have been captured.
+
+        Returns:
+            True if the messages arrived, False on timeout
+        """
+        # Already captured: skip the lock and the wait_for task
+        if self._count >= min_count:
+            return True
+        async with self._cv:
+            try:
+                await asyncio.wait_for(
+                    self._cv.wait_for(lambda: self._count >= min_count), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+
+class InProcessCatManager:
+    """Stand-in for PersistentProcessManager that replays requests like cat.
+
+    Requests are queued as JSON lines and read back by the client's listener,
+    so tests exercise parsing and callbacks without spawning a subprocess.
     """
-    # Use Python script for cross-platform compatibility
-    echo_cmds = []
-    for i in range(num_lines):
-        echo_cmds.append(f'print(json.dumps({{"seq": {i}, "text": "message{i}"}}))')
-
-    # Add result message if requested
-    if add_result:
-        echo_cmds.append(
-            'print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test-session"}))'
+
+    def __init__(self):
+        self._lines = queue.SimpleQueue()
+        self._alive = False
+
+    def start(self, cmd, **kwargs):
+        self._alive = True
+
+    def stop(self):
+        self._alive = False
+
+    def is_alive(self):
+        return self._alive
+
+    def write_request(self, data):
+        self._lines.put((json.dumps(data) + "\n").encode())
+
+    def write_interrupt(self):
+        self.write_request(
+            {
+                "type": "control_request",
+                "request_id": "req_fake",
+                "request": {"subtype": "interrupt"},
+            }
         )
 
-    script = f"import json; " + "; ".join(echo_cmds)
-    return [sys.executable, "-c", script]
+    def read_lines(self, timeout=0.5):
+        # Return when idle so the listener rechecks its stop flag promptly
+        while True:
+            try:
+                yield self._lines.get(timeout=min(timeout, 0.05))
+            except queue.Empty:
+                return
+
+    def get_stderr(self):
+        return []
+
+
+def make_in_process_client(handler):
+    """Build a connected ClaudeClient whose manager is an InProcessCatManager."""
+    client = ClaudeClient(message_handler=handler, options=_OPTIONS)
+    client._manager = InProcessCatManager()
+    client.connect()
+    return client
+
+
+@pytest.fixture
+def in_process_cat_client():
+    """In-process cat-like client paired with a SyncMessageCapture handler."""
+    handler = SyncMessageCapture()
+    client = make_in_process_client(handler)
+    yield client, handler
+    client.disconnect()
+
+
+@pytest.fixture(scope="module")
+def shared_cat_client():
+    """Connected client backed by a single cat process shared across the module."""
+    client = ClaudeClient(message_handler=DefaultMessageHandler(), options=_OPTIONS)
+    client._build_command = lambda: get_cat_command()
+    client.connect()
+    yield client
+    client.disconnect()
+
+
+def use_shared_cat_client(client, handler):
+    """Drain output left in the shared cat client, then install handler.
+
+    cat echoes requests in order, so once a barrier request comes back every
+    line written by a previous test has already been delivered.
+    """
+    barrier = SyncMessageCapture()
+    client._handler = barrier
+    client._manager.write_request({"type": "barrier"})
+    with barrier._cv:
+        assert barrier._cv.wait_for(
+            lambda: any(getattr(m, "type", None) == "barrier" for m in barrier.messages),
+            timeout=2.0,
+        )
+    client._handler = handler
+    return client
+
+
+@pytest.fixture
+def cat_client(shared_cat_client):
+    """Shared cat-backed client paired with a fresh SyncMessageCapture handler."""
+    handler = SyncMessageCapture()
+    return use_shared_cat_client(shared_cat_client, handler), handler
 
 
 class TestClaudeClientRealSubprocess:
@@ -60,20 +340,10 @@ class TestClaudeClientRealSubprocess:
 
     def test_full_lifecycle_with_cat(self):
         """Test full connect/query/disconnect lifecycle using cat."""
-        options = ClaudeOptions()
-        handler = DefaultMessageHandler()
-        client = ClaudeClient(message_handler=handler, options=options)
+        handler = SyncMessageCapture()
+        client = ClaudeClient(message_handler=handler, options=_OPTIONS)
 
-        # Use Python script to output messages after reading stdin
-        script = """
-import sys, json
-line = sys.stdin.readline()
-if line:
-    data = json.loads(line)
-    print(json.dumps(data))
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: [_PY, "-c", _SCRIPT_ONESHOT]
 
         try:
             # Connect - this starts the listener thread
@@ -85,11 +355,7 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
             client._manager.write_request(test_message)
 
             # The listener thread will capture the message
-            time.sleep(0.3)  # Give listener time to read
-
-            # Check that handler received the message
-            messages = client.message_handler.get_messages()
-            assert len(messages) >= 1
+            assert handler.wait_for_message(timeout=2.0, min_count=1)
 
         finally:
             client.disconnect()
@@ -97,84 +363,63 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
 
     def test_multiple_queries_in_session(self):
         """Test multiple queries within the same session."""
-        options = ClaudeOptions()
-        handler = DefaultMessageHandler()
-        client = ClaudeClient(message_handler=handler, options=options)
+        handler = SyncMessageCapture()
+        client = ClaudeClient(message_handler=handler, options=_OPTIONS)
 
-        # Use Python script with a loop that reads stdin and outputs messages 3 times
-        script = """
-import sys, json
-for i in range(1, 4):
-    line = sys.stdin.readline()
-    if line:
-        data = json.loads(line)
-        print(json.dumps(data))
-    print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": f"Response {i}"}]}}))
-    print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: [_PY, "-c", _SCRIPT_THREE_REQUESTS]
 
         try:
             client.connect()
 
-            # Send multiple messages
+            # Send multiple messages; each is echoed, then answered and completed
             for i in range(3):
-                client.message_handler._query_complete_event = threading.Event()
+                gen = handler.generation()
                 test_msg = {"seq": i, "text": f"message{i}"}
                 client._manager.write_request(test_msg)
-                time.sleep(0.2)  # Wait for processing
+                assert handler.wait_for_new(gen, min_new=3)
 
-            messages = client.message_handler.get_messages()
-            # Should have 6 messages (3 assistant + 3 result)
-            assert len(messages) >= 6
+            # Should have at least 6 messages (3 assistant + 3 result)
+            assert len(handler.messages) >= 6
 
         finally:
             client.disconnect()
 
-    def test_session_id_persists_across_queries(self):
+    def test_session_id_persists_across_queries(self, shared_cat_client):
         """Test that session_id remains constant across multiple queries."""
-        options = ClaudeOptions()
-        handler = DefaultMessageHandler()
-        client = ClaudeClient(options=options, message_handler=handler)
+        handler = SyncMessageCapture()
+        client = use_shared_cat_client(shared_cat_client, handler)
         session_id = client.session_id
 
-        client._build_command = lambda: get_cat_command()
-
-        try:
-            client.connect()
-
-            # Query 1
-            client.message_handler._query_complete_event = threading.Event()
-            client._manager.write_request({"q": 1})
-            time.sleep(0.1)
+        # Query 1
+        client._manager.write_request({"q": 1})
+        assert handler.wait_for_message(min_count=1)
 
-            # Query 2
-            client.message_handler._query_complete_event = threading.Event()
-            client._manager.write_request({"q": 2})
-            time.sleep(0.1)
+        # Query 2
+        client._manager.write_request({"q": 2})
+        assert handler.wait_for_message(min_count=2)
 
-            # Session ID should be unchanged
-            assert client.session_id == session_id
-
-        finally:
-            client.disconnect()
+        # Session ID should be unchanged
+        assert client.session_id == session_id
 
-    def test_interrupt_signal(self):
+    def test_interrupt_signal(self, shared_cat_client):
         """Test sending interrupt signal."""
-        options = ClaudeOptions()
-        handler = DefaultMessageHandler()
-        client = ClaudeClient(options=options, message_handler=handler)
-        client._build_command = lambda: get_cat_command()
-
-        try:
-            client.connect()
-            client.interrupt()
-
-            # The interrupt was sent successfully
-            assert client.is_connected
-
-        finally:
-            client.disconnect()
+        handler = SyncMessageCapture()
+        client = use_shared_cat_client(shared_cat_client, handler)
+        client.send_request("hello")
+        assert handler.wait_for_response(min_count=1)
+
+        client.interrupt()
+
+        # cat replays the control request; wait for it instead of sleeping
+        assert handler.wait_for_message(min_count=2)
+        assert client.is_connected
+        assert handler.messages[1].type == "control_request"
+        assert not any(
+            type(block) is InterruptBlock
+            for msg in handler.messages
+            if type(msg) is UserMessage and type(msg.content) is list
+            for block in msg.content
+        )
 
 
 class TestClaudeClientMessageHandling:
@@ -182,9 +427,8 @@ class TestClaudeClientMessageHandling:
 
     def test_parse_assistant_message_from_script(self):
         """Test parsing assistant messages using echo script."""
-        options = ClaudeOptions()
-        handler = DefaultMessageHandler()
-        client = ClaudeClient(message_handler=handler, options=options)
+        handler = SyncMessageCapture()
+        client = ClaudeClient(message_handler=handler, options=_OPTIONS)
 
         # Use Python script to output messages
         script = """
@@ -192,7 +436,7 @@ import sys, json
 print(json.dumps({"type": "assistant", "message": {"model": "claude-sonnet-4-5", "content": [{"type": "text", "text": "Hello, world!"}, {"type": "thinking", "thinking": "Let me think...", "signature": "sig"}]}}))
 print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test-session"}))
 """
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: [_PY, "-c", script]
 
         try:
             client.connect()
@@ -200,13 +444,10 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
             # Send a dummy message to trigger the script
             client._manager.write_request({"trigger": "start"})
 
-            # Wait for listener to capture all messages
-            time.sleep(0.5)
-
-            messages = client.message_handler.get_messages()
-
             # Should get back assistant and result messages
-            assert len(messages) >= 2
+            assert handler.wait_for_message(timeout=2.0, min_count=2)
+
+            messages = handler.messages
             assert isinstance(messages[0], AssistantMessage)
             assert len(messages[0].content) == 2
             assert isinstance(messages[0].content[0], TextBlock)
@@ -217,9 +458,6 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
 
     def test_handle_malformed_json_gracefully(self):
         """Test that malformed JSON is handled gracefully by the listener."""
-        import os
-        import tempfile
-
         # Create a temporary file with mixed valid/invalid JSON
         with tempfile.NamedTemporaryFile(
             mode="w", delete=False, suffix=".txt", encoding="utf-8"
@@ -232,22 +470,8 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
             )
 
         try:
-            options = ClaudeOptions()
-
-            # Custom handler to track errors
-            class TrackingHandler(MessageEventListener):
-                def __init__(self):
-                    self.messages = []
-                    self.errors = []
-
-                def on_message(self, message):
-                    self.messages.append(message)
-
-                def on_error(self, error):
-                    self.errors.append(error)
-
-            handler = TrackingHandler()
-            client = ClaudeClient(options=options, message_handler=handler)
+            handler = SyncMessageCapture()
+            client = ClaudeClient(options=_OPTIONS, message_handler=handler)
 
             # Use Python script to output the file content once (cross-platform)
             script = f"""
@@ -256,7 +480,7 @@ with open(r"{temp_file}", "r", encoding="utf-8") as f:
     for line in f:
         print(line, end="")
 """
-            client._build_command = lambda: [sys.executable, "-c", script]
+            client._build_command = lambda: [_PY, "-c", script]
 
             client.connect()
 
@@ -264,7 +488,7 @@ with open(r"{temp_file}", "r", encoding="utf-8") as f:
             client._manager.write_request({"start": True})
 
             # Wait for listener to process all messages
-            time.sleep(0.5)
+            assert handler.wait_for_message(timeout=2.0, min_count=2)
 
             # Should get 2 valid messages (assistant + result)
             # Malformed JSON should be skipped and error logged
@@ -281,69 +505,103 @@ with open(r"{temp_file}", "r", encoding="utf-8") as f:
             os.unlink(temp_file)
 
 
+class TestReplayUserMessages:
+    """Test replayed user prompts; the in-process manager echoes requests like cat."""
+
+    def test_prompt_is_replayed_as_user_message(self, in_process_cat_client):
+        """Test that a sent prompt comes back as a UserMessage."""
+        client, handler = in_process_cat_client
+        client.send_request("hello")
+
+        assert handler.wait_for_response(timeout=2.0, min_count=1)
+        assert is_user_echo_with_text(handler.messages[0], "hello")
+
+    def test_multiple_prompts_are_replayed(self, in_process_cat_client):
+        """Test that every prompt in a session is replayed."""
+        client, handler = in_process_cat_client
+        prompts = ["first", "second", "third"]
+        for prompt in prompts:
+            client.send_request(prompt)
+
+        assert handler.wait_for_response(timeout=2.0, min_count=len(prompts))
+        for prompt in prompts:
+            assert has_user_echo_with_text(handler.messages, prompt)
+        assert not has_user_echo_with_text(handler.messages, "fourth")
+
+    def test_replayed_message_arrives_after_query_start(self):
+        """Test that on_query_start fires before the replayed prompt is delivered."""
+
+        class OrderingHandler(MessageEventListener):
+            def __init__(self):
+                self.query_started = threading.Event()
+                self.first_message = threading.Event()
+                self.started_before_message = None
+
+            def on_query_start(self, prompt):
+                self.query_started.set()
+
+            def on_message(self, message):
+                if not self.first_message.is_set():
+                    self.started_before_message = self.query_started.is_set()
+                    self.first_message.set()
+
+        handler = OrderingHandler()
+        client = make_in_process_client(handler)
+
+        try:
+            client.send_request("hello")
+
+            assert handler.first_message.wait(timeout=2.0)
+            assert handler.started_before_message is True
+
+        finally:
+            client.disconnect()
+
+
 class TestClaudeClientErrorScenarios:
     """Test error handling and edge cases."""
 
     def test_process_during_query(self):
         """Test behavior when process exits during query."""
-        options = ClaudeOptions()
         handler = DefaultMessageHandler()
-        client = ClaudeClient(message_handler=handler, options=options)
+        client = ClaudeClient(message_handler=handler, options=_OPTIONS)
 
         # Use Python command that reads one line then exits
         script = 'import sys; line = sys.stdin.readline(); print(line if line else "")'
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: [_PY, "-c", script]
 
         try:
             client.connect()
             client._manager.write_request({"test": "data"})
 
-            # Wait for listener to process
-            time.sleep(0.2)
-
-            # Process should have exited
-            assert not client.is_connected
+            # Process should exit after reading the request
+            assert wait_until(lambda: not client.is_connected)
 
         finally:
             client.disconnect()
 
     def test_query_after_reconnect(self):
         """Test that client can be reused after disconnect."""
-        options = ClaudeOptions()
+        handler1 = SyncMessageCapture()
+        client = ClaudeClient(message_handler=handler1, options=_OPTIONS)
 
-        handler1 = DefaultMessageHandler()
-        client = ClaudeClient(message_handler=handler1, options=options)
-
-        # Use Python script that echoes a result message
-        script = """
-import sys, json
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: _RESULT_ONLY_CMD
 
         try:
             # First session
             client.connect()
             client._manager.write_request({"session": 1})
-            time.sleep(0.3)
-            messages1 = client.message_handler.get_messages()
-            len(messages1)
+            assert handler1.wait_for_message(timeout=2.0, min_count=1)
             client.disconnect()
 
-            # Wait a bit for cleanup
-            time.sleep(0.1)
-
             # Second session - create new client to simulate fresh start
-            handler2 = DefaultMessageHandler()
-            client2 = ClaudeClient(message_handler=handler2, options=options)
-            client2._build_command = lambda: [sys.executable, "-c", script]
+            handler2 = SyncMessageCapture()
+            client2 = ClaudeClient(message_handler=handler2, options=_OPTIONS)
+            client2._build_command = lambda: _RESULT_ONLY_CMD
             client2.connect()
-            client2.message_handler._query_complete_event = threading.Event()
             client2._manager.write_request({"session": 2})
-            time.sleep(0.3)
 
-            messages2 = client2.message_handler.get_messages()
-            assert len(messages2) >= 1
+            assert handler2.wait_for_message(timeout=2.0, min_count=1)
 
             client2.disconnect()
 
@@ -356,9 +614,8 @@ class TestClaudeClientContextManager:
 
     def test_context_manager_cleanup_on_error(self):
         """Test that context manager cleans up even on error."""
-        options = ClaudeOptions()
         handler = DefaultMessageHandler()
-        client = ClaudeClient(options=options, message_handler=handler)
+        client = ClaudeClient(options=_OPTIONS, message_handler=handler)
         client._build_command = lambda: get_cat_command()
 
         with pytest.raises(ValueError):
@@ -372,13 +629,10 @@ class TestClaudeClientContextManager:
 
     def test_nested_context_managers(self):
         """Test using multiple clients in nested contexts."""
-        options1 = ClaudeOptions()
-        options2 = ClaudeOptions()
-
         handler1 = DefaultMessageHandler()
         handler2 = DefaultMessageHandler()
-        client1 = ClaudeClient(options=options1, message_handler=handler1)
-        client2 = ClaudeClient(options=options2, message_handler=handler2)
+        client1 = ClaudeClient(options=_OPTIONS, message_handler=handler1)
+        client2 = ClaudeClient(options=_OPTIONS, message_handler=handler2)
 
         client1._build_command = lambda: get_cat_command()
         client2._build_command = lambda: get_cat_command()
@@ -403,9 +657,8 @@ class TestClaudeClientStderrCapture:
 
     def test_stderr_is_captured(self):
         """Test that stderr output is captured."""
-        options = ClaudeOptions()
         handler = DefaultMessageHandler()
-        client = ClaudeClient(message_handler=handler, options=options)
+        client = ClaudeClient(message_handler=handler, options=_OPTIONS)
 
         # Use Python script to write to stderr
         script = """
@@ -414,7 +667,7 @@ sys.stderr.write("stderr message\\n")
 sys.stderr.flush()
 print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
 """
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: [_PY, "-c", script]
 
         try:
             client.connect()
@@ -422,12 +675,10 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
             # Send trigger
             client._manager.write_request({"start": True})
 
-            # Wait for processing
-            time.sleep(0.3)
+            # Wait for the stderr reader to capture the line
+            assert wait_until(lambda: len(client.stderr_output) > 0)
 
-            # Check stderr
             stderr = client.stderr_output
-            assert len(stderr) > 0
             assert any("stderr message" in line for line in stderr)
 
         finally:
@@ -437,12 +688,9 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
 class TestClaudeClientLargeData:
     """Test handling of large data."""
 
-    def test_large_message_handling(self):
+    def test_large_message_handling(self, cat_client):
         """Test handling of large JSON messages."""
-        options = ClaudeOptions()
-        handler = DefaultMessageHandler()
-        client = ClaudeClient(options=options, message_handler=handler)
-        client._build_command = lambda: get_cat_command()
+        client, handler = cat_client
 
         # Create a large message
         large_text = "x" * 10000
@@ -451,25 +699,15 @@ class TestClaudeClientLargeData:
             "message": {"model": "sonnet", "content": [{"type": "text", "text": large_text}]},
         }
 
-        try:
-            client.connect()
-            client._manager.write_request(large_message)
-
-            # Wait for listener
-            time.sleep(0.2)
-
-            messages = client.message_handler.get_messages()
-            assert len(messages) >= 1
+        client._manager.write_request(large_message)
 
-        finally:
-            client.disconnect()
+        assert handler.wait_for_message(timeout=2.0, min_count=1)
+        assert handler.messages[0].content[0].text == large_text
 
     def test_multiple_messages_in_sequence(self):
         """Test sending many messages in sequence."""
-        options = ClaudeOptions()
-
         # Use Python script with a loop that outputs 10 messages
-        handler = DefaultMessageHandler()
+        handler = SyncMessageCapture()
         script = """
 import sys, json
 for i in range(1, 11):
@@ -480,8 +718,8 @@ for i in range(1, 11):
     print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": f"Message {i}"}]}}))
 print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 10, "session_id": "test"}))
 """
-        client = ClaudeClient(message_handler=handler, options=options)
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client = ClaudeClient(message_handler=handler, options=_OPTIONS)
+        client._build_command = lambda: [_PY, "-c", script]
 
         try:
             client.connect()
@@ -490,14 +728,9 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
             for i in range(10):
                 msg = {"index": i}
                 client._manager.write_request(msg)
-                time.sleep(0.02)  # Small delay between sends
-
-            # Wait for processing
-            time.sleep(0.5)
 
-            messages = client.message_handler.get_messages()
-            # Should have 11 messages (10 assistant + 1 result)
-            assert len(messages) >= 11
+            # Should have at least 11 messages (10 assistant + 1 result)
+            assert handler.wait_for_message(timeout=5.0, min_count=11)
 
         finally:
             client.disconnect()
@@ -508,23 +741,17 @@ class TestClaudeClientTimeouts:
 
     def test_read_timeout_with_alive_process(self):
         """Test that timeout works correctly."""
-        import sys
-
-        options = ClaudeOptions()
         handler = DefaultMessageHandler()
-        client = ClaudeClient(options=options, message_handler=handler)
+        client = ClaudeClient(options=_OPTIONS, message_handler=handler)
 
         # Use Python script that sleeps then exits
-        client._build_command = lambda: [sys.executable, "-c", "import time; time.sleep(0.1)"]
+        client._build_command = lambda: [_PY, "-c", "import time; time.sleep(0.1)"]
 
         try:
             client.connect()
 
-            # Wait for process to exit
-            time.sleep(0.3)
-
-            # Process should have exited
-            assert not client.is_connected
+            # Process should exit once its sleep ends
+            assert wait_until(lambda: not client.is_connected)
 
         finally:
             client.disconnect()
@@ -536,16 +763,10 @@ class TestAsyncClaudeClientRealSubprocess:
     @pytest.mark.asyncio
     async def test_full_lifecycle_with_cat(self):
         """Test full connect/query/disconnect lifecycle."""
-        options = ClaudeOptions()
-        handler = DefaultMessageHandler()
-        client = AsyncClaudeClient(message_handler=handler, options=options)
+        handler = AsyncMessageCapture()
+        client = AsyncClaudeClient(message_handler=handler, options=_OPTIONS)
 
-        # Use Python script to output messages
-        script = """
-import sys, json
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: _RESULT_ONLY_CMD
 
         try:
             # Connect
@@ -557,10 +778,7 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
             await client._manager.write_request(test_message)
 
             # Wait for listener
-            await asyncio.sleep(0.3)
-
-            messages = client.message_handler.get_messages()
-            assert len(messages) >= 1
+            assert await handler.wait_for_message(timeout=2.0, min_count=1)
 
         finally:
             await client.disconnect()
@@ -569,34 +787,20 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
     @pytest.mark.asyncio
     async def test_multiple_queries_in_session(self):
         """Test multiple queries within the same session."""
-        options = ClaudeOptions()
-
-        # Use Python script with a loop that outputs 3 responses
-        handler = AsyncDefaultMessageHandler()
-        script = """
-import sys, json
-for i in range(1, 4):
-    line = sys.stdin.readline()
-    if line:
-        data = json.loads(line)
-        print(json.dumps(data))
-    print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": f"Response {i}"}]}}))
-    print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client = AsyncClaudeClient(message_handler=handler, options=options)
-        client._build_command = lambda: [sys.executable, "-c", script]
+        handler = AsyncMessageCapture()
+        client = AsyncClaudeClient(message_handler=handler, options=_OPTIONS)
+        client._build_command = lambda: [_PY, "-c", _SCRIPT_THREE_REQUESTS]
 
         try:
             await client.connect()
 
-            # Send multiple messages
+            # Send multiple messages; each is echoed, then answered and completed
             for i in range(3):
                 await client._manager.write_request({"seq": i})
-                await asyncio.sleep(0.15)
+                assert await handler.wait_for_message(timeout=2.0, min_count=3 * (i + 1))
 
-            messages = await client.message_handler.get_messages()
-            # Should have 6 messages (3 assistant + 3 result)
-            assert len(messages) >= 6
+            # Should have at least 6 messages (3 assistant + 3 result)
+            assert len(handler.messages) >= 6
 
         finally:
             await client.disconnect()
@@ -604,9 +808,8 @@ for i in range(1, 4):
     @pytest.mark.asyncio
     async def test_async_context_manager(self):
         """Test async context manager behavior."""
-        options = ClaudeOptions()
         handler = DefaultMessageHandler()
-        client = AsyncClaudeClient(options=options, message_handler=handler)
+        client = AsyncClaudeClient(options=_OPTIONS, message_handler=handler)
         client._build_command = lambda: get_cat_command()
 
         async with client:
@@ -620,9 +823,8 @@ for i in range(1, 4):
     @pytest.mark.asyncio
     async def test_async_interrupt(self):
         """Test async interrupt functionality."""
-        options = ClaudeOptions()
         handler = DefaultMessageHandler()
-        client = AsyncClaudeClient(options=options, message_handler=handler)
+        client = AsyncClaudeClient(options=_OPTIONS, message_handler=handler)
         client._build_command = lambda: get_cat_command()
 
         try:
@@ -641,16 +843,12 @@ class TestClientComparison:
 
     def test_sync_async_equivalent_session_id_generation(self):
         """Test that sync and async clients generate session IDs the same way."""
-        options = ClaudeOptions()
-
-        sync_client = ClaudeClient(options=options, message_handler=DefaultMessageHandler())
+        sync_client = ClaudeClient(options=_OPTIONS, message_handler=DefaultMessageHandler())
         async_client = AsyncClaudeClient(
-            options=ClaudeOptions(), message_handler=DefaultMessageHandler()
+            options=_OPTIONS, message_handler=DefaultMessageHandler()
         )
 
         # Both should generate valid UUIDs
-        import uuid
-
         uuid.UUID(sync_client.session_id)
         uuid.UUID(async_client.session_id)
 
@@ -682,36 +880,36 @@ class TestMessageHandlerIntegration:
 
     def test_custom_handler_receives_messages(self):
         """Test that custom handler receives all messages."""
-        options = ClaudeOptions()
-
         class CustomHandler(MessageEventListener):
             def __init__(self):
                 self.received = []
+                self._cv = threading.Condition()
 
             def on_message(self, message):
-                self.received.append(message)
+                with self._cv:
+                    self.received.append(message)
+                    self._cv.notify_all()
 
             def on_query_complete(self, messages):
-                self.received.append(("complete", len(messages)))
+                with self._cv:
+                    self.received.append(("complete", len(messages)))
+                    self._cv.notify_all()
+
+            def wait_for_events(self, count, timeout=2.0):
+                with self._cv:
+                    return self._cv.wait_for(lambda: len(self.received) >= count, timeout=timeout)
 
         handler = CustomHandler()
-        client = ClaudeClient(message_handler=handler, options=options)
+        client = ClaudeClient(message_handler=handler, options=_OPTIONS)
 
-        # Use Python script to output messages
-        script = """
-import sys, json
-print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": "Hi"}]}}))
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: [_PY, "-c", _SCRIPT_ASSISTANT_AND_RESULT]
 
         try:
             client.connect()
             client._manager.write_request({"start": True})
-            time.sleep(0.3)
 
-            # Handler should have received messages and completion event
-            assert len(handler.received) >= 3  # 2 messages + 1 complete event
+            # Handler should receive 2 messages + 1 complete event
+            assert handler.wait_for_events(3)
 
         finally:
             client.disconnect()
@@ -719,18 +917,10 @@ print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "
     @pytest.mark.asyncio
     async def test_async_handler_receives_messages(self):
         """Test that async handler receives all messages."""
-        options = ClaudeOptions()
-
         handler = AsyncDefaultMessageHandler()
-        client = AsyncClaudeClient(message_handler=handler, options=options)
+        client = AsyncClaudeClient(message_handler=handler, options=_OPTIONS)
 
-        # Use Python script to output messages
-        script = """
-import sys, json
-print(json.dumps({"type": "assistant", "message": {"model": "test", "content": [{"type": "text", "text": "Hi"}]}}))
-print(json.dumps({"type": "result", "subtype": "complete", "duration_ms": 100, "duration_api_ms": 50, "is_error": False, "num_turns": 1, "session_id": "test"}))
-"""
-        client._build_command = lambda: [sys.executable, "-c", script]
+        client._build_command = lambda: [_PY, "-c", _SCRIPT_ASSISTANT_AND_RESULT]
 
         try:
             await client.connect()
@@ -1,131 +1,210 @@
 """Tests for process executors using real subprocess calls."""
 
+import asyncio
+import codecs
 import json
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
 
 import pytest
 from test_helpers import (
     IS_WINDOWS,
+    AsyncSubprocessStub,
+    MockProcess,
+    PopenStub,
     create_error_command,
     create_json_command,
+    get_echo_command,
     get_false_command,
     get_seq_command,
 )
 
-from claude_sdk_lite.executors import AsyncProcessExecutor, SyncProcessExecutor
+from claude_sdk_lite import executors
+from claude_sdk_lite.executors import (
+    AsyncProcessExecutor,
+    SyncProcessExecutor,
+    _cleanup_process,
+)
 
-# ========== SyncProcessExecutor Tests ==========
+# Interpreter used to run cross-platform Python one-liners
+_PY = sys.executable
+
+# Commands shared across tests, built once at import time
+_CMD_NO_OUTPUT = [_PY, "-c", "pass"]
+_CMD_HELLO_WORLD = [_PY, "-u", "-c", 'print("Hello")\nprint("World")\nprint("123")']
+_CMD_LARGE_STDERR = [_PY, "-c", "import sys; sys.stderr.write('x' * 1048576); sys.exit(3)"]
+# Fails after leaving a grandchild that keeps the inherited stderr pipe open
+_CMD_STDERR_HELD_OPEN = [
+    _PY,
+    "-c",
+    "import subprocess, sys; sys.stderr.write('boom'); sys.stderr.flush(); "
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)'], "
+    "stdout=subprocess.DEVNULL); sys.exit(3)",
+]
+_CMD_TEST_DATA = [_PY, "-u", "-c", 'print("Test1")\nprint("Data2")\nprint("Emoji3")']
+
+# JSON output fixtures and their commands, shared by the sync and async tests
+_JSON_SIMPLE = (
+    '{"type": "test", "id": 1}',
+    '{"type": "test", "id": 2}',
+    '{"type": "test", "id": 3}',
+)
+_CMD_JSON_SIMPLE = create_json_command(_JSON_SIMPLE)
 
+# Simulated Claude response stream
+_JSON_STREAM = (
+    '{"type": "assistant", "model": "sonnet", "text": "Hello"}',
+    '{"type": "result", "value": 42}',
+)
+_CMD_JSON_STREAM = create_json_command(_JSON_STREAM)
 
-class TestSyncProcessExecutor:
-    """Test SyncProcessExecutor with real subprocess calls."""
+# Upper bound for a single async executor run, so a hung subprocess fails the
+# test instead of stalling the whole run
+_ASYNC_TIMEOUT = 10.0
 
-    def test_execute_echo_command(self):
-        """Test executing simple echo command."""
-        import sys
+# ========== Helper Functions ==========
 
-        executor = SyncProcessExecutor()
-        # Use Python script for cross-platform compatibility
-        result = list(executor.execute([sys.executable, "-u", "-c", "print('hello world')"]))
-        assert len(result) == 1
-        # Check content, strip to handle both \n and \r\n line endings
-        assert result[0].decode("utf-8").strip() == "hello world"
 
-    def test_execute_multi_line_output(self):
-        """Test executing command that produces multiple lines."""
-        executor = SyncProcessExecutor()
-        result = list(executor.execute(get_seq_command(1, 5)))
-        assert len(result) == 5
-        assert [line.strip().decode("utf-8") for line in result] == ["1", "2", "3", "4", "5"]
+def _decode(lines):
+    """Decode a sequence of UTF-8 byte lines, even if a code point spans two lines."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    return "".join(decoder.decode(line) for line in lines) + decoder.decode(b"", final=True)
 
-    def test_execute_json_output(self):
-        """Test executing command with JSON output."""
-        executor = SyncProcessExecutor()
-        json_lines = [
-            '{"type": "test", "id": 1}',
-            '{"type": "test", "id": 2}',
-            '{"type": "test", "id": 3}',
-        ]
 
-        cmd = create_json_command(json_lines)
-        result = list(executor.execute(cmd))
-        assert len(result) == 3
-        assert json.loads(result[0].decode("utf-8"))["id"] == 1
-        assert json.loads(result[1].decode("utf-8"))["id"] == 2
-        assert json.loads(result[2].decode("utf-8"))["id"] == 3
+async def _collect(lines, timeout=_ASYNC_TIMEOUT):
+    """Collect every line of an async line stream into a list, bounded by timeout."""
 
-    def test_execute_command_with_error(self):
-        """Test executing command that exits with non-zero code."""
-        executor = SyncProcessExecutor()
+    async def collect():
+        return [line async for line in lines]
 
-        cmd = get_false_command()
-        with pytest.raises(RuntimeError) as exc_info:
-            list(executor.execute(cmd))
+    return await asyncio.wait_for(collect(), timeout=timeout)
 
-        assert exc_info.value.message == "CLI exited with code 1"
-        assert exc_info.value.exit_code == 1
 
-    def test_execute_command_with_custom_error(self):
-        """Test executing command with custom error code."""
-        executor = SyncProcessExecutor()
+async def _count(lines, timeout=_ASYNC_TIMEOUT):
+    """Count the lines of an async line stream without keeping them, bounded by timeout."""
+
+    async def count():
+        n = 0
+        async for _ in lines:
+            n += 1
+        return n
+
+    return await asyncio.wait_for(count(), timeout=timeout)
+
+
+async def _lines(executor, cmd):
+    """Run cmd on either executor and return its output lines."""
+    if isinstance(executor, SyncProcessExecutor):
+        return list(executor.execute(cmd))
+    return await _collect(executor.async_execute(cmd))
+
+
+# ========== SyncProcessExecutor Tests ==========
 
+
+@pytest.fixture(scope="module")
+def sync_executor():
+    """SyncProcessExecutor shared across tests; it keeps no state between runs."""
+    return SyncProcessExecutor()
+
+
+class TestSyncProcessExecutor:
+    """Test SyncProcessExecutor with real subprocess calls."""
+
+    def test_execute_command_with_custom_error(self, sync_executor):
+        """Test executing command with custom error code."""
         cmd = create_error_command(42, "Custom error message")
         with pytest.raises(RuntimeError) as exc_info:
-            list(executor.execute(cmd))
+            list(sync_executor.execute(cmd))
 
         assert exc_info.value.exit_code == 42
         assert "Custom error" in exc_info.value.stderr or "error" in exc_info.value.stderr.lower()
 
-    def test_execute_cat_with_stdin(self):
-        """Test executing command that produces no output."""
-        import sys
+    def test_execute_with_large_output(self, sync_executor):
+        """Test executing command that produces large output."""
+        # Generate 1000 lines; a maxlen=1 deque drains the stream in C, keeping only the last
+        lines = sync_executor.execute(get_seq_command(1, 1000))
+        first = next(lines)
+        ((count, last),) = deque(enumerate(lines, start=2), maxlen=1)
 
-        executor = SyncProcessExecutor()
-        # Use Python script that produces no output
-        # This simulates a command that runs successfully but produces nothing
-        cmd = [sys.executable, "-c", "pass"]
-        result = list(executor.execute(cmd))
-        # Should produce no output
-        assert len(result) == 0
+        assert count == 1000
+        assert first.strip() == b"1"
+        assert last.strip() == b"1000"
+
+    def test_execute_drains_large_stderr(self, sync_executor):
+        """Test that a command writing 1 MB to stderr cannot stall the executor.
+
+        stderr is only needed on the error path, but it must be drained while stdout
+        is read: a process blocked on a full stderr pipe never closes stdout.
+        """
+        errors = []
+
+        def run():
+            try:
+                list(sync_executor.execute(_CMD_LARGE_STDERR))
+            except RuntimeError as e:
+                errors.append(e)
+
+        start = time.perf_counter()
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(timeout=5.0)
+
+        assert not worker.is_alive(), "executor deadlocked on a full stderr pipe"
+        assert time.perf_counter() - start < 5.0
+        assert errors[0].exit_code == 3
+        assert len(errors[0].stderr) == 1048576
+
+    def test_execute_reports_stderr_held_open_by_grandchild(self, sync_executor, monkeypatch):
+        """Test that a grandchild holding stderr open cannot hang error reporting."""
+        monkeypatch.setattr(executors, "STDERR_READ_TIMEOUT", 0.2)
+
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError) as exc_info:
+            list(sync_executor.execute(_CMD_STDERR_HELD_OPEN))
 
-    def test_execute_grep_command(self):
-        """Test executing grep with pattern that has matches."""
-        import sys
+        assert time.perf_counter() - start < 4.0
+        assert exc_info.value.exit_code == 3
+        assert exc_info.value.stderr == "boom"
 
-        executor = SyncProcessExecutor()
-        # Since we can't pipe on Windows reliably, we'll skip the pipe test
-        # and just test that the executor can run the Python script
-        # We'll use a simpler test instead
-        simple_cmd = [sys.executable, "-c", 'print("test")']
-        result = list(executor.execute(simple_cmd))
-        assert len(result) == 1
-        assert result[0].decode("utf-8").strip() == "test"
+    def test_execute_uses_buffered_pipes(self, sync_executor, monkeypatch):
+        """Test that stdout is read through a buffered pipe.
 
-    def test_execute_with_large_output(self):
-        """Test executing command that produces large output."""
-        executor = SyncProcessExecutor()
-        # Generate 1000 lines
-        result = list(executor.execute(get_seq_command(1, 1000)))
-        assert len(result) == 1000
-        assert result[0].decode("utf-8").strip() == "1"
-        assert result[-1].decode("utf-8").strip() == "1000"
+        The subprocess docs note that bufsize=0 makes the pipes unbuffered, so every
+        readline() becomes one read syscall per byte; the default (-1) reads in
+        io.DEFAULT_BUFFER_SIZE chunks.
+        """
+        calls = []
+        real_popen = subprocess.Popen
 
-    def test_execute_with_unicode_output(self):
-        """Test executing command that produces Unicode output."""
-        import sys
+        def recording_popen(*args, **kwargs):
+            calls.append(kwargs)
+            return real_popen(*args, **kwargs)
 
-        executor = SyncProcessExecutor()
+        monkeypatch.setattr(subprocess, "Popen", recording_popen)
+        assert len(list(sync_executor.execute(get_seq_command(1, 10)))) == 10
 
-        # Use Python script with -u for unbuffered UTF-8 output
-        script = """
-print("Hello")
-print("World")
-print("123")
-"""
-        cmd = [sys.executable, "-u", "-c", script]
+        assert calls[0].get("bufsize", -1) != 0
 
-        result = list(executor.execute(cmd))
+    def test_execute_stdout_pipe_missing_raises_error(self, sync_executor, monkeypatch):
+        """Test that a process without a stdout pipe is reported, not iterated."""
+        popen = PopenStub()
+        # Plain namespace: the executor only checks stdout, then polls during cleanup
+        popen.process = SimpleNamespace(stdout=None, stderr=None, poll=lambda: 0)
+        monkeypatch.setattr(subprocess, "Popen", popen)
+
+        with pytest.raises(RuntimeError, match="stdout pipe"):
+            list(sync_executor.execute(["claude"]))
+
+    def test_execute_with_unicode_output(self, sync_executor):
+        """Test executing command that produces Unicode output."""
+        result = list(sync_executor.execute(_CMD_HELLO_WORLD))
         # Result may be split differently depending on platform
-        combined_output = b"".join(result).decode("utf-8", errors="replace")
+        combined_output = _decode(result)
         assert "Hello" in combined_output
         assert "World" in combined_output
         assert "123" in combined_output
@@ -134,116 +213,129 @@ print("123")
 # ========== AsyncProcessExecutor Tests ==========
 
 
+@pytest.fixture(scope="module")
+def async_executor():
+    """AsyncProcessExecutor shared across tests; it keeps no state between runs."""
+    return AsyncProcessExecutor()
+
+
 class TestAsyncProcessExecutor:
     """Test AsyncProcessExecutor with real subprocess calls."""
 
     @pytest.mark.asyncio
-    async def test_async_execute_echo_command(self):
-        """Test async executing simple echo command."""
-        import sys
-
-        executor = AsyncProcessExecutor()
-        result = []
-        async for line in executor.async_execute(
-            [sys.executable, "-u", "-c", "print('async test')"]
-        ):
-            result.append(line)
+    async def test_async_execute_with_custom_error(self, async_executor):
+        """Test async executing command with custom error."""
+        cmd = create_error_command(99, "Async error")
+        with pytest.raises(RuntimeError) as exc_info:
+            await _count(async_executor.async_execute(cmd))
 
-        assert len(result) == 1
-        # Windows uses \r\n, Unix uses \n
-        assert result[0].decode("utf-8").strip() == "async test"
+        assert exc_info.value.exit_code == 99
+        # stderr might be empty or contain error text
+        assert (
+            exc_info.value.stderr is None
+            or "error" in exc_info.value.stderr.lower()
+            or "Async" in str(exc_info.value.stderr)
+        )
 
     @pytest.mark.asyncio
-    async def test_async_execute_multi_line_output(self):
-        """Test async executing command with multiple lines."""
-        executor = AsyncProcessExecutor()
-        result = []
-        async for line in executor.async_execute(get_seq_command(1, 5)):
-            result.append(line)
+    async def test_async_stdout_pipe_missing_raises_error(self, async_executor, monkeypatch):
+        """Test that a process without a stdout pipe is reported, not iterated."""
+        create = AsyncSubprocessStub()
+        # returncode set, so cleanup treats the namespace as an exited process
+        create.process = SimpleNamespace(stdout=None, stderr=None, returncode=0)
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", create)
 
-        assert len(result) == 5
-        assert [line.strip().decode("utf-8") for line in result] == ["1", "2", "3", "4", "5"]
+        with pytest.raises(RuntimeError, match="stdout pipe"):
+            await _count(async_executor.async_execute(["claude"]))
 
     @pytest.mark.asyncio
-    async def test_async_execute_json_output(self):
-        """Test async executing command with JSON output."""
-        executor = AsyncProcessExecutor()
-        json_lines = ['{"type": "async", "id": 1}', '{"type": "async", "id": 2}']
+    async def test_async_with_large_output(self, async_executor):
+        """Test async with large output."""
+        assert await _count(async_executor.async_execute(get_seq_command(1, 1000))) == 1000
 
-        cmd = create_json_command(json_lines)
-        result = []
-        async for line in executor.async_execute(cmd):
-            result.append(line)
+    @pytest.mark.asyncio
+    async def test_async_with_unicode(self, async_executor):
+        """Test async with Unicode output."""
+        result = await _collect(async_executor.async_execute(_CMD_TEST_DATA))
 
-        assert len(result) == 2
-        assert json.loads(result[0].decode("utf-8"))["id"] == 1
-        assert json.loads(result[1].decode("utf-8"))["id"] == 2
+        # Check that output is present
+        combined_output = _decode(result)
+        assert "Test1" in combined_output
+        assert "Data2" in combined_output
+        assert "Emoji3" in combined_output
 
     @pytest.mark.asyncio
-    async def test_async_execute_with_error(self):
-        """Test async executing command that exits with error."""
-        executor = AsyncProcessExecutor()
-
-        cmd = get_false_command()
+    async def test_async_execute_drains_large_stderr(self, async_executor):
+        """Test that a command writing 1 MB to stderr cannot stall the async executor."""
         with pytest.raises(RuntimeError) as exc_info:
-            async for _ in executor.async_execute(cmd):
-                pass
+            await _count(async_executor.async_execute(_CMD_LARGE_STDERR), timeout=5.0)
 
-        assert exc_info.value.message == "CLI exited with code 1"
-        assert exc_info.value.exit_code == 1
+        assert exc_info.value.exit_code == 3
+        assert len(exc_info.value.stderr) == 1048576
 
     @pytest.mark.asyncio
-    async def test_async_execute_with_custom_error(self):
-        """Test async executing command with custom error."""
-        executor = AsyncProcessExecutor()
+    async def test_async_concurrent_executions(self, async_executor):
+        """Test that several commands stream concurrently on one event loop."""
+        echo, seq, large, error = await asyncio.gather(
+            _collect(async_executor.async_execute(get_echo_command("async test"))),
+            _collect(async_executor.async_execute(get_seq_command(1, 5))),
+            _collect(async_executor.async_execute(get_seq_command(1, 1000))),
+            _collect(async_executor.async_execute(create_error_command(7))),
+            return_exceptions=True,
+        )
 
-        cmd = create_error_command(99, "Async error")
-        with pytest.raises(RuntimeError) as exc_info:
-            async for _ in executor.async_execute(cmd):
-                pass
+        assert [line.strip() for line in echo] == [b"async test"]
+        assert [line.strip() for line in seq] == [b"1", b"2", b"3", b"4", b"5"]
+        assert len(large) == 1000
+        assert isinstance(error, RuntimeError)
+        assert error.exit_code == 7
 
-        assert exc_info.value.exit_code == 99
-        # stderr might be empty or contain error text
-        assert (
-            exc_info.value.stderr is None
-            or "error" in exc_info.value.stderr.lower()
-            or "Async" in str(exc_info.value.stderr)
-        )
 
-    @pytest.mark.asyncio
-    async def test_async_with_large_output(self):
-        """Test async with large output."""
-        executor = AsyncProcessExecutor()
-        count = 0
-        async for line in executor.async_execute(get_seq_command(1, 1000)):
-            count += 1
+# ========== Shared Executor Tests ==========
 
-        assert count == 1000
 
-    @pytest.mark.asyncio
-    async def test_async_with_unicode(self):
-        """Test async with Unicode output."""
-        import sys
+@pytest.fixture(params=["sync", "async"])
+def executor(request):
+    """Each module-level executor in turn, for behaviour both must share."""
+    return request.getfixturevalue(f"{request.param}_executor")
 
-        executor = AsyncProcessExecutor()
 
-        # Use Python script with -u for unbuffered UTF-8 output
-        script = """
-print("Test1")
-print("Data2")
-print("Emoji3")
-"""
-        cmd = [sys.executable, "-u", "-c", script]
+@pytest.mark.asyncio
+class TestProcessExecutorContract:
+    """Test behaviour common to SyncProcessExecutor and AsyncProcessExecutor."""
 
-        result = []
-        async for line in executor.async_execute(cmd):
-            result.append(line)
+    @pytest.mark.parametrize(
+        "cmd, expected",
+        [
+            pytest.param(get_echo_command("hello world"), ["hello world"], id="echo"),
+            pytest.param(get_seq_command(1, 5), ["1", "2", "3", "4", "5"], id="multi_line"),
+            pytest.param(_CMD_NO_OUTPUT, [], id="no_output"),
+        ],
+    )
+    async def test_output_lines(self, executor, cmd, expected):
+        """Test that every output line is yielded, whatever the line ending."""
+        result = await _lines(executor, cmd)
 
-        # Check that output is present
-        combined_output = b"".join(result).decode("utf-8", errors="replace")
-        assert "Test1" in combined_output
-        assert "Data2" in combined_output
-        assert "Emoji3" in combined_output
+        assert len(result) == len(expected)
+        # splitlines() handles both \n and \r\n line endings
+        assert b"".join(result).decode("utf-8").splitlines() == expected
+
+    async def test_json_output(self, executor):
+        """Test executing command with JSON output."""
+        result = await _lines(executor, _CMD_JSON_SIMPLE)
+
+        assert len(result) == 3
+        assert json.loads(result[0])["id"] == 1
+        assert json.loads(result[1])["id"] == 2
+        assert json.loads(result[2])["id"] == 3
+
+    async def test_command_with_error(self, executor):
+        """Test executing command that exits with non-zero code."""
+        with pytest.raises(RuntimeError) as exc_info:
+            await _lines(executor, get_false_command())
+
+        assert exc_info.value.message == "CLI exited with code 1"
+        assert exc_info.value.exit_code == 1
 
 
 # ========== Integration Tests ==========
@@ -262,11 +354,9 @@ class TestExecutorIntegration:
         else:
             cmd = ["sh", "-c", "for i in 0 1 2 3 4; do echo line$i; done"]
 
-        result = []
-        for line in executor.execute(cmd):
-            result.append(line.decode().strip())
+        result = list(executor.execute(cmd))
 
-        assert result == [f"line{i}" for i in range(5)]
+        assert b"".join(result).decode().split() == [f"line{i}" for i in range(5)]
 
     @pytest.mark.asyncio
     async def test_async_executor_streaming(self):
@@ -278,80 +368,80 @@ class TestExecutorIntegration:
         else:
             cmd = ["sh", "-c", "for i in 0 1 2 3 4; do echo async_line$i; done"]
 
-        result = []
-        async for line in executor.async_execute(cmd):
-            result.append(line.decode().strip())
+        result = await _collect(executor.async_execute(cmd))
 
-        assert result == [f"async_line{i}" for i in range(5)]
+        assert b"".join(result).decode().split() == [f"async_line{i}" for i in range(5)]
 
     def test_sync_executor_with_json_stream(self):
         """Test sync executor with JSON output stream (simulating Claude output)."""
         executor = SyncProcessExecutor()
 
-        # Simulate Claude API responses
-        json_lines = [
-            '{"type": "assistant", "model": "sonnet", "text": "Hello"}',
-            '{"type": "assistant", "model": "sonnet", "text": "World"}',
-        ]
-
-        cmd = create_json_command(json_lines)
-
         result = []
-        for line in executor.execute(cmd):
-            result.append(json.loads(line.decode("utf-8")))
+        for line in executor.execute(_CMD_JSON_STREAM):
+            result.append(json.loads(line))
 
         assert len(result) == 2
         assert result[0]["text"] == "Hello"
-        assert result[1]["text"] == "World"
+        assert result[1]["value"] == 42
 
     @pytest.mark.asyncio
     async def test_async_executor_with_json_stream(self):
         """Test async executor with JSON output stream."""
         executor = AsyncProcessExecutor()
 
-        responses = [
-            '{"type": "status", "message": "Processing"}',
-            '{"type": "result", "value": 42}',
-        ]
-
-        cmd = create_json_command(responses)
-
-        result = []
-        async for line in executor.async_execute(cmd):
-            result.append(json.loads(line.decode("utf-8")))
+        lines = await _collect(executor.async_execute(_CMD_JSON_STREAM))
+        result = [json.loads(line) for line in lines]
 
         assert len(result) == 2
-        assert result[0]["message"] == "Processing"
+        assert result[0]["text"] == "Hello"
         assert result[1]["value"] == 42
 
     def test_sync_executor_cleanup(self):
         """Test that sync executor properly cleans up processes."""
-        import sys
-
         executor = SyncProcessExecutor()
 
         # Execute command that finishes
-        list(executor.execute([sys.executable, "-u", "-c", "print('test')"]))
+        list(executor.execute(get_echo_command("test")))
 
         # Executor should be ready for next command
-        result = list(executor.execute([sys.executable, "-u", "-c", "print('test2')"]))
+        result = list(executor.execute(get_echo_command("test2")))
         assert len(result) == 1
-        assert result[0].decode("utf-8").strip() == "test2"
+        assert result[0].strip() == b"test2"
 
     @pytest.mark.asyncio
     async def test_async_executor_cleanup(self):
         """Test that async executor properly cleans up processes."""
-        import sys
-
         executor = AsyncProcessExecutor()
 
-        async for _ in executor.async_execute([sys.executable, "-u", "-c", "print('test1')"]):
-            pass
+        await _count(executor.async_execute(get_echo_command("test1")))
 
         # Executor should be ready for next command
-        result = []
-        async for line in executor.async_execute([sys.executable, "-u", "-c", "print('test2')"]):
-            result.append(line)
+        result = await _collect(executor.async_execute(get_echo_command("test2")))
 
         assert len(result) == 1
-        assert result[0].decode("utf-8").strip() == "test2"
+        assert result[0].strip() == b"test2"
+
+
+class TestCleanupProcess:
+    """Test _cleanup_process against a mock process."""
+
+    def test_cleanup_skips_finished_process(self):
+        """Test that a process that already exited is not terminated."""
+        process = MockProcess(returncode=0)
+
+        _cleanup_process(process)
+
+        assert process.terminate_calls == 0
+
+    def test_cleanup_terminates_running_process(self):
+        """Test that a process still producing output is terminated once."""
+        process = MockProcess(stdout_lines=[b"pending\n"])
+
+        _cleanup_process(process)
+
+        assert process.terminate_calls == 1
+        assert process.poll() == 0
+
+    def test_cleanup_accepts_none(self):
+        """Test that cleanup is a no-op when the process never started."""
+        _cleanup_process(None)
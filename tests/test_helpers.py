@@ -1,50 +1,64 @@
 """Shared test fixtures and utilities for cross-platform compatibility."""
 
-import platform
+import functools
+import io
+import json
 import sys
 
 import pytest
 
 # ========== Platform Detection ==========
-IS_WINDOWS = platform.system() == "Windows"
+IS_WINDOWS = sys.platform == "win32"
 is_windows = IS_WINDOWS  # Alias for consistency
 
+# Platform-specific commands and shell syntax resolved once at import time,
+# so helpers don't branch per call
+if IS_WINDOWS:
+    _CAT_CMD = (
+        "powershell",
+        "-NoProfile",
+        "-Command",
+        "$input | ForEach-Object { Write-Output $_ }",
+    )
+    _TRUE_CMD = ("cmd.exe", "/c", "exit 0")
+    _FALSE_CMD = ("cmd.exe", "/c", "exit 1")
+    _SHELL = ("cmd.exe", "/c")
+    _THEN = " & "
+    _AND = " & "
+    _ECHO_STDERR = "echo {} >&2"
+else:
+    _CAT_CMD = ("cat",)
+    _TRUE_CMD = ("true",)
+    _FALSE_CMD = ("false",)
+    _SHELL = ("sh", "-c")
+    _THEN = "; "
+    _AND = " && "
+    _ECHO_STDERR = "echo '{}' >&2"
+
 
 # ========== Cross-Platform Command Helpers ==========
 
 
 def get_cat_command():
     """Get a command that reads from stdin and writes to stdout."""
-    if IS_WINDOWS:
-        # PowerShell script that reads stdin and writes to stdout
-        return [
-            "powershell",
-            "-NoProfile",
-            "-Command",
-            "$input | ForEach-Object { Write-Output $_ }",
-        ]
-    return ["cat"]
+    return list(_CAT_CMD)
 
 
 def get_true_command():
     """Get a command that exits successfully with no output."""
-    if IS_WINDOWS:
-        return ["cmd.exe", "/c", "exit 0"]
-    return ["true"]
+    return list(_TRUE_CMD)
 
 
 def get_false_command():
     """Get a command that exits with code 1."""
-    if IS_WINDOWS:
-        return ["cmd.exe", "/c", "exit 1"]
-    return ["false"]
+    return list(_FALSE_CMD)
 
 
 def get_head_command(lines=1):
     """Get a command that reads N lines from stdin then exits."""
-    import sys
-
-    # Use Python script for cross-platform compatibility
+    # Native tool on Unix avoids a Python interpreter startup per call
+    if not IS_WINDOWS:
+        return ["head", "-n", str(lines)]
     return [
         sys.executable,
         "-u",
@@ -68,17 +82,17 @@ def get_grep_command(pattern):
 
 def get_echo_command(text):
     """Get a command that outputs text."""
-    import sys
-
-    # Use Python script for cross-platform compatibility
+    # Native tool on Unix avoids a Python interpreter startup per call
+    if not IS_WINDOWS:
+        return ["printf", "%s\\n", text]
     return [sys.executable, "-u", "-c", f"print('{text}')"]
 
 
 def get_echo_command_args():
     """Get a command that outputs arguments (for testing echo with args)."""
-    import sys
-
-    # Use Python script that prints all arguments
+    # Native tool on Unix avoids a Python interpreter startup per call
+    if not IS_WINDOWS:
+        return ["sh", "-c", 'echo "$@"', "--"]
     return [sys.executable, "-u", "-c", "import sys; print(' '.join(sys.argv[1:]))"]
 
 
@@ -94,43 +108,46 @@ def get_seq_command(start, end=None):
     if end is None:
         end = start
         start = 1
+    return list(_seq_command(start, end))
 
+
+@functools.lru_cache(maxsize=None)
+def _seq_command(start, end):
     if IS_WINDOWS:
         # PowerShell to generate sequence
-        return [
+        return (
             "powershell",
             "-NoProfile",
             "-Command",
             f"{start}..{end} | ForEach-Object {{ Write-Output $_ }}",
-        ]
-    return ["seq", str(start), str(end)]
+        )
+    return ("seq", str(start), str(end))
 
 
 def get_shell_command():
     """Get appropriate shell command for the platform."""
-    if IS_WINDOWS:
-        return ["cmd.exe", "/c"]
-    return ["sh", "-c"]
+    return list(_SHELL)
 
 
 def create_json_command(json_lines):
     """Create a command that outputs JSON lines, one per line.
 
+    Writes the lines from a single Python process, so no shell quoting is involved
+    and the same command works on every platform.
+
     Args:
-        json_lines: List of JSON strings to output
+        json_lines: Iterable of JSON strings to output
 
     Returns:
         Command list for subprocess
     """
-    if IS_WINDOWS:
-        # PowerShell to output JSON lines
-        escaped_lines = [line.replace('"', '`"') for line in json_lines]
-        lines_script = "; ".join(f'Write-Output "{line}"' for line in escaped_lines)
-        return ["powershell", "-NoProfile", "-Command", lines_script]
-    else:
-        # Use printf for consistent output
-        lines_str = "\\n".join(json_lines)
-        return ["sh", "-c", f"printf '{lines_str}\\n'"]
+    return list(_json_command(tuple(json_lines)))
+
+
+@functools.lru_cache(maxsize=None)
+def _json_command(json_lines):
+    payload = "\n".join(json_lines) + "\n"
+    return (sys.executable, "-u", "-c", f"import sys; sys.stdout.write({payload!r})")
 
 
 def create_echo_script(commands):
@@ -142,14 +159,7 @@ def create_echo_script(commands):
     Returns:
         Command list for subprocess
     """
-    if IS_WINDOWS:
-        # Join commands with & for Windows
-        combined = " & ".join(commands)
-        return ["cmd.exe", "/c", combined]
-    else:
-        # Join commands with && for Unix
-        combined = " && ".join(commands)
-        return ["sh", "-c", combined]
+    return [*_SHELL, _AND.join(commands)]
 
 
 def create_stderr_command(message, stdout_message="{}"):
@@ -162,16 +172,10 @@ def create_stderr_command(message, stdout_message="{}"):
     Returns:
         Command list for subprocess
     """
-    if IS_WINDOWS:
-        stderr_cmd = f"echo {message} >&2"
-        if stdout_message:
-            return ["cmd.exe", "/c", f'{stderr_cmd} & echo "{stdout_message}"']
-        return ["cmd.exe", "/c", stderr_cmd]
-    else:
-        stderr_cmd = f"echo '{message}' >&2"
-        if stdout_message:
-            return ["sh", "-c", f'{stderr_cmd} && echo "{stdout_message}"']
-        return ["sh", "-c", stderr_cmd]
+    stderr_cmd = _ECHO_STDERR.format(message)
+    if stdout_message:
+        return [*_SHELL, f'{stderr_cmd}{_AND}echo "{stdout_message}"']
+    return [*_SHELL, stderr_cmd]
 
 
 def create_error_command(exit_code, stderr_message=""):
@@ -184,14 +188,14 @@ def create_error_command(exit_code, stderr_message=""):
     Returns:
         Command list for subprocess
     """
-    if IS_WINDOWS:
-        if stderr_message:
-            return ["cmd.exe", "/c", f"echo {stderr_message} >&2 & exit {exit_code}"]
-        return ["cmd.exe", "/c", f"exit {exit_code}"]
-    else:
-        if stderr_message:
-            return ["sh", "-c", f"echo '{stderr_message}' >&2; exit {exit_code}"]
-        return ["sh", "-c", f"exit {exit_code}"]
+    return list(_error_command(exit_code, stderr_message))
+
+
+@functools.lru_cache(maxsize=None)
+def _error_command(exit_code, stderr_message):
+    if stderr_message:
+        return (*_SHELL, f"{_ECHO_STDERR.format(stderr_message)}{_THEN}exit {exit_code}")
+    return (*_SHELL, f"exit {exit_code}")
 
 
 def create_loop_script(num_iterations, output_template):
@@ -237,6 +241,216 @@ def skip_if_windows_unless(condition=True):
     )
 
 
+# ========== Mock Processes ==========
+
+
+class _MockProcessBase:
+    """State shared by the sync and async subprocess mocks.
+
+    stdout_lines must already be bytes, as read from a real pipe; __slots__ keeps the
+    per-test instances small.
+    """
+
+    __slots__ = ("stdout_lines", "returncode", "stderr_data", "stdout", "stderr")
+
+    def __init__(self, stdout_lines=None, returncode=0, stderr=b""):
+        self.stdout_lines = stdout_lines or []
+        self.returncode = returncode
+        self.stderr_data = stderr
+
+
+class MockStderrPipe(io.BytesIO):
+    """In-memory stderr pipe that records the size passed to each read()."""
+
+    def __init__(self, data=b""):
+        super().__init__(data)
+        self.read_sizes = []
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        return super().read(size)
+
+
+class MockProcess(_MockProcessBase):
+    """Mock subprocess.Popen object.
+
+    Counts terminate() calls in ``terminate_calls`` so cleanup tests need no MagicMock.
+    """
+
+    __slots__ = ("_done", "terminate_calls")
+
+    def __init__(self, stdout_lines=None, returncode=0, stderr=b""):
+        super().__init__(stdout_lines, returncode, stderr)
+        # A process with nothing to write counts as already exited
+        self._done = not self.stdout_lines
+        self.terminate_calls = 0
+        # Plain list iterator over the byte lines stands in for the stdout pipe
+        self.stdout = iter(self.stdout_lines)
+        # In-memory stream is enough for the executor's stderr.read()
+        self.stderr = MockStderrPipe(self.stderr_data)
+
+    def poll(self):
+        """Check if process has terminated."""
+        return self.returncode if self._done else None
+
+    def wait(self, timeout=None):
+        """Wait for process to complete."""
+        self._done = True
+        return self.returncode
+
+    def terminate(self):
+        """Terminate the process."""
+        self.terminate_calls += 1
+        self._done = True
+
+    def kill(self):
+        """Kill the process."""
+        self._done = True
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        return False
+
+    def communicate(self, input=None, timeout=None):
+        """Communicate with process (for subprocess.run compatibility)."""
+        return (b"".join(self.stdout_lines), self.stderr_data)
+
+
+def encode_json_lines(responses):
+    """Serialize responses into newline-terminated byte lines, as the CLI writes them.
+
+    The whole batch is encoded in one call and then split, rather than encoding line by line.
+    """
+    payload = "".join(json.dumps(r) + "\n" for r in responses).encode()
+    return payload.splitlines(keepends=True)
+
+
+# Fake CLI output shared by the client test modules, serialized once here so the
+# child processes write ready-made lines instead of importing json and encoding per test
+RESULT_LINE = (
+    json.dumps(
+        {
+            "type": "result",
+            "subtype": "complete",
+            "duration_ms": 100,
+            "duration_api_ms": 50,
+            "is_error": False,
+            "num_turns": 1,
+            "session_id": "test",
+        }
+    )
+    + "\n"
+)
+
+
+def assistant_line(text):
+    """Serialize an assistant message with a single text block."""
+    message = {"model": "test", "content": [{"type": "text", "text": text}]}
+    return json.dumps({"type": "assistant", "message": message}) + "\n"
+
+
+def create_stdout_command(*lines):
+    """Build a fake CLI command that writes the given lines to stdout."""
+    return [sys.executable, "-c", f"import sys; sys.stdout.write({''.join(lines)!r})"]
+
+
+CMD_HI_AND_RESULT = create_stdout_command(assistant_line("Hi"), RESULT_LINE)
+CMD_HELLO_AND_RESULT = create_stdout_command(assistant_line("Hello"), RESULT_LINE)
+CMD_STDERR_AND_RESULT = [
+    sys.executable,
+    "-c",
+    f"import sys; sys.stderr.write('error message\\n'); sys.stdout.write({RESULT_LINE!r})",
+]
+
+
+async def async_lines(items):
+    """Yield pre-encoded lines like an async subprocess stdout stream."""
+    for item in items:
+        yield item
+
+
+class MockStderr:
+    """Mock async stderr stream with a fixed payload."""
+
+    __slots__ = ("_data", "read_sizes")
+
+    def __init__(self, data=b""):
+        self._data = data
+        self.read_sizes = []
+
+    async def read(self, n=-1):
+        self.read_sizes.append(n)
+        data, self._data = self._data, b""
+        return data
+
+
+class MockAsyncProcess(_MockProcessBase):
+    """Lightweight stand-in for asyncio.subprocess.Process."""
+
+    __slots__ = ()
+
+    def __init__(self, stdout_lines=None, returncode=0, stderr=b""):
+        super().__init__(stdout_lines, returncode, stderr)
+        self.stdout = async_lines(self.stdout_lines)
+        self.stderr = MockStderr(self.stderr_data)
+
+    async def wait(self):
+        return self.returncode
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
+
+
+class PopenStub:
+    """Plain callable that stands in for subprocess.Popen.
+
+    Returns ``process`` (or raises ``side_effect``) and keeps the last call's
+    ``(args, kwargs)`` in ``call_args`` like a mock would.
+    """
+
+    __slots__ = ("process", "side_effect", "call_args")
+
+    def __init__(self):
+        self.process = None
+        self.side_effect = None
+        self.call_args = None
+
+    def __call__(self, *args, **kwargs):
+        self.call_args = (args, kwargs)
+        if self.side_effect is not None:
+            raise self.side_effect
+        return self.process
+
+
+class AsyncSubprocessStub(PopenStub):
+    """Awaitable counterpart of PopenStub for asyncio.create_subprocess_exec."""
+
+    __slots__ = ()
+
+    async def __call__(self, *args, **kwargs):
+        return PopenStub.__call__(self, *args, **kwargs)
+
+
+def fake_exit(returncode, stderr=b""):
+    """Mock Popen process that exits with returncode and produces no stdout.
+
+    For tests that only need an exit status, so no real process is spawned.
+    """
+    return MockProcess(returncode=returncode, stderr=stderr)
+
+
+def fake_async_exit(returncode, stderr=b""):
+    """Async counterpart of fake_exit for asyncio.create_subprocess_exec patches."""
+    return MockAsyncProcess(returncode=returncode, stderr=stderr)
+
+
 # ========== Pytest fixtures ==========
 
 
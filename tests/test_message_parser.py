@@ -3,7 +3,10 @@
 Tests that various CLI response formats are correctly parsed.
 """
 
-from claude_sdk_lite import parse_message
+import json
+import math
+
+from claude_sdk_lite import message_parser, parse_message, parse_messages
 from claude_sdk_lite.types import (
     AssistantMessage,
     ResultMessage,
@@ -276,8 +279,8 @@ class TestParseSystemMessage:
         msg = parse_message(data)
         assert isinstance(msg, SystemMessage)
         assert msg.subtype == "config"
-        # SystemMessage.data stores the entire original dict
-        assert msg.data == data
+        # SystemMessage.data stores the entire original dict, without copying it
+        assert msg.data is data
         assert msg.data["data"]["setting"] == "value"
 
     def test_system_message_status(self):
@@ -455,6 +458,70 @@ class TestParseFromJSONString:
         assert msg.model == "sonnet"
         assert msg.content[0].text == "Hi"
 
+    def test_parse_from_json_bytes(self):
+        """Test parsing message from raw JSON bytes, as read from the CLI pipe."""
+        json_bytes = b'{"type": "assistant", "message": {"model": "sonnet", "content": []}}\n'
+
+        msg = parse_message(json_bytes)
+        assert isinstance(msg, AssistantMessage)
+        assert msg.model == "sonnet"
+
+    def test_parse_from_json_string_with_nan(self):
+        """Test that NaN and big integers decode as json.loads decodes them."""
+        msg = parse_message('{"type": "unknown_type", "value": NaN, "big": 123456789012345678901}')
+        assert isinstance(msg, UnknownMessage)
+        assert math.isnan(msg.raw_data["value"])
+        assert msg.raw_data["big"] == 123456789012345678901
+
+    def test_parse_from_json_string_with_big_integer(self):
+        """Test that integers wider than 64 bits are not rounded to floats."""
+        raw = '{"type": "unknown_type", "big": 123456789012345678901, "neg": -18446744073709551617}'
+
+        msg = parse_message(raw)
+        assert isinstance(msg, UnknownMessage)
+        assert msg.raw_data == json.loads(raw)
+        assert type(msg.raw_data["big"]) is int
+        assert message_parser.loads_json(raw.encode()) == json.loads(raw)
+
+    def test_parse_from_json_string_falls_back_to_stdlib(self):
+        """Test that documents pydantic-core rejects are still decoded by the stdlib."""
+        msg = parse_message('{"type": "unknown_type", "text": "\\ud800", "value": NaN}')
+        assert isinstance(msg, UnknownMessage)
+        assert msg.raw_data["text"] == "\ud800"
+        assert math.isnan(msg.raw_data["value"])
+
+    def test_parse_from_invalid_json_string_after_fallback(self):
+        """Test that JSON neither decoder accepts returns UnknownMessage."""
+        msg = parse_message('{"type": "system",')
+        assert isinstance(msg, UnknownMessage)
+        assert msg.type == "invalid_json"
+
+    def test_parse_from_json_bytes_with_utf8_bom(self):
+        """Test that bytes starting with a UTF-8 BOM still parse, as json.loads allows."""
+        msg = parse_message(b'\xef\xbb\xbf{"type": "system", "subtype": "init"}')
+        assert isinstance(msg, SystemMessage)
+        assert msg.subtype == "init"
+
+    def test_parse_from_non_json_text_skips_decoder(self, monkeypatch):
+        """Test that text which cannot start a JSON value is rejected up front."""
+
+        def fail_loads(data):
+            raise AssertionError("decoder should not run")
+
+        monkeypatch.setattr(message_parser, "loads_json", fail_loads)
+
+        for raw in ("hello", b"  <html>", ""):
+            msg = parse_message(raw)
+            assert isinstance(msg, UnknownMessage)
+            assert msg.type == "invalid_json"
+
+    def test_parse_from_invalid_json_bytes(self):
+        """Test parsing invalid JSON bytes returns UnknownMessage with decoded text."""
+        msg = parse_message(b"not a json")
+        assert isinstance(msg, UnknownMessage)
+        assert msg.type == "invalid_json"
+        assert msg.raw_data == {"raw_string": "not a json"}
+
     def test_parse_from_invalid_json_string(self):
         """Test parsing invalid JSON string returns UnknownMessage."""
         msg = parse_message("not a json")
@@ -484,6 +551,16 @@ class TestParseErrors:
         assert msg.type == "unknown_type"
         assert msg.raw_data == data
 
+    def test_parse_repeated_unknown_type_keeps_each_payload(self):
+        """Test that repeated unknown messages each wrap their own raw dict."""
+        first = {"type": "heartbeat", "seq": 1}
+        second = {"type": "heartbeat", "seq": 2}
+
+        first_msg, second_msg = parse_message(first), parse_message(second)
+        assert first_msg is not second_msg
+        assert first_msg.raw_data is first
+        assert second_msg.raw_data is second
+
     def test_parse_non_dict_data(self):
         """Test parsing non-dict data returns UnknownMessage."""
         msg = parse_message(["list", "not", "dict"])
@@ -519,6 +596,31 @@ class TestParseErrors:
         assert msg.type == "result"
         assert msg.raw_data == data
 
+    def test_parse_block_missing_required_field(self):
+        """Test that a content block missing a required field yields UnknownMessage."""
+        data = {
+            "type": "assistant",
+            "message": {"model": "sonnet", "content": [{"type": "thinking", "thinking": "..."}]},
+        }
+
+        msg = parse_message(data)
+        assert isinstance(msg, UnknownMessage)
+        assert msg.type == "assistant"
+
+    def test_parse_skips_unknown_block_types(self):
+        """Test that blocks of unrecognized types are dropped, keeping the rest."""
+        data = {
+            "type": "assistant",
+            "message": {
+                "model": "sonnet",
+                "content": [{"type": "image", "source": {}}, {"type": "text", "text": "Hi"}],
+            },
+        }
+
+        msg = parse_message(data)
+        assert isinstance(msg, AssistantMessage)
+        assert msg.content == [TextBlock(text="Hi")]
+
 
 class TestRealWorldScenarios:
     """Test parsing of realistic CLI output scenarios."""
@@ -808,3 +910,50 @@ class TestEdgeCasesAndValidation:
         msg = parse_message(data)
         assert isinstance(msg, UserMessage)
         assert msg.content[0].content == ""
+
+
+class TestParseMessages:
+    """Test parsing buffers of newline-delimited JSON messages."""
+
+    def test_parse_ndjson_bytes(self):
+        """Test that each line of an NDJSON buffer becomes one message, in order."""
+        buf = (
+            b'{"type": "system", "subtype": "init"}\n'
+            b'{"type": "assistant", "message": {"model": "sonnet", "content": []}}\n'
+            b'{"type": "result", "subtype": "success", "duration_ms": 1, "duration_api_ms": 1,'
+            b' "is_error": false, "num_turns": 1, "session_id": "s"}\n'
+        )
+
+        messages = parse_messages(buf)
+        assert [type(m) for m in messages] == [SystemMessage, AssistantMessage, ResultMessage]
+
+    def test_parse_ndjson_skips_blank_lines(self):
+        """Test that blank lines and CRLF line endings are ignored."""
+        buf = '{"type": "system", "subtype": "init"}\r\n\n   \n{"type": "system", "subtype": "x"}'
+
+        messages = parse_messages(buf)
+        assert [m.subtype for m in messages] == ["init", "x"]
+
+    def test_parse_ndjson_invalid_line(self):
+        """Test that an invalid line becomes UnknownMessage without affecting others."""
+        messages = parse_messages(b'not json\n{"type": "system", "subtype": "init"}\n')
+        assert isinstance(messages[0], UnknownMessage)
+        assert messages[0].type == "invalid_json"
+        assert isinstance(messages[1], SystemMessage)
+
+    def test_parse_ndjson_unicode_line_separators(self):
+        """Test that U+2028 inside a JSON string does not split the line."""
+        line = (
+            '{"type": "assistant", "message": {"model": "sonnet",'
+            ' "content": [{"type": "text", "text": "a\u2028b\u2029c\x85d"}]}}\n'
+        )
+
+        for buf in (line, line.encode()):
+            messages = parse_messages(buf)
+            assert len(messages) == 1
+            assert isinstance(messages[0], AssistantMessage)
+            assert messages[0].content[0].text == "a\u2028b\u2029c\x85d"
+
+    def test_parse_empty_buffer(self):
+        """Test that an empty buffer yields no messages."""
+        assert parse_messages(b"") == []
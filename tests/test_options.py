@@ -5,7 +5,6 @@ Tests that various options are correctly passed to the claudecode CLI.
 
 import json
 import os
-import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
@@ -14,263 +13,236 @@ import pytest
 from claude_sdk_lite import ClaudeOptions, CLINotFoundError
 
 
-class TestBasicCommandBuilding:
-    """Test basic command building functionality."""
-
-    def test_command_without_prompt(self):
-        """Test building command without prompt."""
-        options = ClaudeOptions(model="sonnet")
-        cmd = options.build_command()
-        assert "--model" in cmd
-        assert "sonnet" in cmd
+def _flag_values(cmd):
+    """Map each ``--flag`` in cmd to the argument after it, or True if none follows.
 
+    Built in one pass so tests look values up by flag instead of scanning cmd per check.
+    """
+    values = {}
+    for token, following in zip(cmd, [*cmd[1:], None]):
+        if token.startswith("--"):
+            values[token] = True if following is None or following.startswith("--") else following
+    return values
 
-class TestModelOptions:
-    """Test model-related options."""
-
-    def test_model_option(self):
-        """Test --model option."""
-        options = ClaudeOptions(model="haiku")
-        cmd = options.build_command()
-        assert "--model" in cmd
-        assert "haiku" in cmd
 
-    def test_fallback_model(self):
-        """Test --fallback-model option."""
-        options = ClaudeOptions(fallback_model="opus")
-        cmd = options.build_command()
-        assert "--fallback-model" in cmd
-        assert "opus" in cmd
+@pytest.fixture(scope="module")
+def mock_find_cli():
+    """Mock CLI finding once for the tests that resolve the CLI path by search."""
+    with patch("claude_sdk_lite.utils.find_tool_in_system_sync", return_value="/bin/ls"):
+        yield
 
-    def test_max_thinking_tokens(self):
-        """Test --max-thinking-tokens option."""
-        options = ClaudeOptions(max_thinking_tokens=50000)
-        cmd = options.build_command()
-        assert "--max-thinking-tokens" in cmd
-        assert "50000" in cmd
 
+@pytest.fixture(scope="module")
+def ci_cd_scenario():
+    """Build a typical CI/CD configuration once; returns (cmd flags, cmd, subprocess kwargs)."""
+    options = ClaudeOptions(
+        model="haiku",
+        print_mode=True,
+        output_format="stream-json",
+        max_budget_usd=0.10,
+        max_turns=1,
+        system_prompt="You are a code reviewer",
+        permission_mode="acceptEdits",
+        disallowed_tools=["Browser", "Task"],
+        working_dir="/path/to/repo",
+    )
+    cmd = options.build_command("Review the code")
+    return _flag_values(cmd), cmd, options.build_subprocess_kwargs()
 
-class TestAgentOptions:
-    """Test agent-related options."""
 
-    def test_agent_option(self):
-        """Test --agent option."""
-        options = ClaudeOptions(agent="reviewer")
-        cmd = options.build_command()
-        assert "--agent" in cmd
-        assert "reviewer" in cmd
+class TestBasicCommandBuilding:
+    """Test basic command building functionality."""
 
-    def test_agents_json(self):
-        """Test --agents option with JSON."""
-        agents = {"reviewer": {"description": "Code reviewer", "prompt": "Review the code"}}
-        options = ClaudeOptions(agents=agents)
+    def test_command_without_prompt(self):
+        """Test building command without prompt."""
+        options = ClaudeOptions(model="sonnet")
         cmd = options.build_command()
-        assert "--agents" in cmd
-        # Verify JSON is correctly serialized
-        agents_idx = cmd.index("--agents")
-        agents_json = json.loads(cmd[agents_idx + 1])
-        assert agents_json["reviewer"]["description"] == "Code reviewer"
+        assert _flag_values(cmd)["--model"] == "sonnet"
+
+
+class TestBooleanFlagOptions:
+    """Test options that add a single flag to the command when enabled."""
+
+    @pytest.mark.parametrize(
+        "kwarg,flag",
+        [
+            ("continue_conversation", "--continue"),
+            ("fork_session", "--fork-session"),
+            ("no_session_persistence", "--no-session-persistence"),
+            ("print_mode", "--print"),
+            ("dangerously_skip_permissions", "--dangerously-skip-permissions"),
+            ("include_partial_messages", "--include-partial-messages"),
+            ("mcp_debug", "--mcp-debug"),
+            ("strict_mcp_config", "--strict-mcp-config"),
+            ("disable_slash_commands", "--disable-slash-commands"),
+            ("debug", "--debug"),
+            ("verbose", "--verbose"),
+            ("ide", "--ide"),
+            ("chrome", "--chrome"),
+            ("no_chrome", "--no-chrome"),
+        ],
+    )
+    def test_boolean_flag(self, kwarg, flag):
+        """Test that enabling the option adds its flag."""
+        cmd = ClaudeOptions(**{kwarg: True}).build_command()
+        assert flag in cmd
+
+
+class TestValueOptions:
+    """Test options that add a flag followed by their value."""
+
+    @pytest.mark.parametrize(
+        "kwarg,flag,value,expected",
+        [
+            ("model", "--model", "haiku", "haiku"),
+            ("fallback_model", "--fallback-model", "opus", "opus"),
+            ("max_thinking_tokens", "--max-thinking-tokens", 50000, "50000"),
+            ("agent", "--agent", "reviewer", "reviewer"),
+            ("system_prompt", "--system-prompt", "You are helpful", "You are helpful"),
+            ("append_system_prompt", "--append-system-prompt", "Be concise", "Be concise"),
+            ("resume", "--resume", "session-123", "session-123"),
+            ("session_id", "--session-id", "abc-123-def", "abc-123-def"),
+            ("permission_mode", "--permission-mode", "acceptEdits", "acceptEdits"),
+            ("output_format", "--output-format", "json", "json"),
+            ("output_format", "--output-format", "stream-json", "stream-json"),
+            ("input_format", "--input-format", "stream-json", "stream-json"),
+            ("max_budget_usd", "--max-budget-usd", 0.50, "0.5"),
+            ("max_turns", "--max-turns", 5, "5"),
+            ("debug_file", "--debug-file", "/path/to/debug.log", "/path/to/debug.log"),
+            ("from_pr", "--from-pr", "123", "123"),
+            (
+                "from_pr",
+                "--from-pr",
+                "https://github.com/user/repo/pull/42",
+                "https://github.com/user/repo/pull/42",
+            ),
+            ("from_pr", "--from-pr", "fix auth bug", "fix auth bug"),
+        ],
+    )
+    def test_flag_with_value(self, kwarg, flag, value, expected):
+        """Test that the option adds its flag immediately followed by the value."""
+        cmd = ClaudeOptions(**{kwarg: value}).build_command()
+        assert _flag_values(cmd)[flag] == expected
+
+
+class TestInvalidOptionValues:
+    """Test that options with a fixed set of values reject anything else."""
+
+    @pytest.mark.parametrize(
+        "kwarg,bad,match",
+        [
+            ("permission_mode", "invalid_mode", "Invalid permission_mode"),
+            ("output_format", "xml", "Invalid output_format"),
+            ("input_format", "invalid", "Invalid input_format"),
+        ],
+    )
+    def test_invalid_value(self, kwarg, bad, match):
+        """Test that an unsupported value raises ValueError."""
+        with pytest.raises(ValueError, match=match):
+            ClaudeOptions(**{kwarg: bad})
+
+
+class TestListOptions:
+    """Test options that pass a list as one comma-joined value."""
+
+    @pytest.mark.parametrize(
+        "kwarg,flag,value,joined",
+        [
+            ("tools", "--tools", ["Bash", "Edit", "Read"], "Bash,Edit,Read"),
+            # An empty list disables all tools
+            ("tools", "--tools", [], ""),
+            ("allowed_tools", "--allowedTools", ["Bash(git:*)", "Edit"], "Bash(git:*),Edit"),
+            ("disallowed_tools", "--disallowedTools", ["Browser", "Task"], "Browser,Task"),
+            ("setting_sources", "--setting-sources", ["user", "project"], "user,project"),
+            ("betas", "--betas", ["feature1", "feature2"], "feature1,feature2"),
+        ],
+    )
+    def test_comma_joined_list(self, kwarg, flag, value, joined):
+        """Test that the list is passed after its flag as a comma-joined string."""
+        cmd = ClaudeOptions(**{kwarg: value}).build_command()
+        assert _flag_values(cmd)[flag] == joined
+
+
+class TestRepeatableOptions:
+    """Test options that repeat their flag once per list item."""
+
+    @pytest.mark.parametrize(
+        "kwarg,flag,values",
+        [
+            ("add_dirs", "--add-dir", ["/dir1", "/dir2"]),
+            ("add_dirs", "--add-dir", [Path("/dir1"), Path("/dir2")]),
+            ("plugin_dir", "--plugin-dir", ["/plugins1", "/plugins2"]),
+            ("files", "--file", ["file-id-1:relative/path", "file-id-2:other/path"]),
+        ],
+    )
+    def test_repeated_flag(self, kwarg, flag, values):
+        """Test that each item gets its own flag occurrence."""
+        cmd = ClaudeOptions(**{kwarg: values}).build_command()
+        assert cmd.count(flag) == len(values)
+        for value in values:
+            # str() normalizes Path items for cross-platform comparison
+            assert str(value) in cmd
+
+
+class TestJSONOptions:
+    """Test options whose dict value is passed as a JSON string."""
+
+    @pytest.mark.parametrize(
+        "kwarg,flag,value,expected",
+        [
+            (
+                "agents",
+                "--agents",
+                {"reviewer": {"description": "Code reviewer", "prompt": "Review the code"}},
+                {"reviewer": {"description": "Code reviewer", "prompt": "Review the code"}},
+            ),
+            (
+                "json_schema",
+                "--json-schema",
+                {"type": "object", "properties": {"name": {"type": "string"}}},
+                {"type": "object", "properties": {"name": {"type": "string"}}},
+            ),
+            (
+                "settings",
+                "--settings",
+                {"key": "value", "enabled": True},
+                {"key": "value", "enabled": True},
+            ),
+            # A bare server mapping is wrapped in an mcpServers key
+            (
+                "mcp_config",
+                "--mcp-config",
+                {"server1": {"command": "node", "args": ["server.js"]}},
+                {"mcpServers": {"server1": {"command": "node", "args": ["server.js"]}}},
+            ),
+            (
+                "mcp_config",
+                "--mcp-config",
+                {"mcpServers": {"server1": {"command": "node"}}},
+                {"mcpServers": {"server1": {"command": "node"}}},
+            ),
+        ],
+    )
+    def test_json_value(self, kwarg, flag, value, expected):
+        """Test that the value after the flag decodes to the expected JSON."""
+        cmd = ClaudeOptions(**{kwarg: value}).build_command()
+        assert json.loads(_flag_values(cmd)[flag]) == expected
 
 
 class TestSystemPromptOptions:
     """Test system prompt options."""
 
-    def test_system_prompt(self):
-        """Test --system-prompt option."""
-        options = ClaudeOptions(system_prompt="You are a helpful assistant")
-        cmd = options.build_command()
-        assert "--system-prompt" in cmd
-        assert "You are a helpful assistant" in cmd
-
-    def test_append_system_prompt(self):
-        """Test --append-system-prompt option."""
-        options = ClaudeOptions(append_system_prompt="Always be concise")
-        cmd = options.build_command()
-        assert "--append-system-prompt" in cmd
-        assert "Always be concise" in cmd
-
     def test_both_system_prompts(self):
         """Test both system prompt options together."""
         options = ClaudeOptions(system_prompt="You are helpful", append_system_prompt="Be concise")
-        cmd = options.build_command()
-        assert "--system-prompt" in cmd
-        assert "--append-system-prompt" in cmd
-
-
-class TestToolOptions:
-    """Test tool-related options."""
-
-    def test_tools_list(self):
-        """Test --tools option."""
-        options = ClaudeOptions(tools=["Bash", "Edit", "Read"])
-        cmd = options.build_command()
-        assert "--tools" in cmd
-        tools_idx = cmd.index("--tools")
-        assert cmd[tools_idx + 1] == "Bash,Edit,Read"
-
-    def test_tools_empty_list(self):
-        """Test --tools with empty list (disable all tools)."""
-        options = ClaudeOptions(tools=[])
-        cmd = options.build_command()
-        assert "--tools" in cmd
-        tools_idx = cmd.index("--tools")
-        assert cmd[tools_idx + 1] == ""
-
-    def test_allowed_tools(self):
-        """Test --allowedTools option."""
-        options = ClaudeOptions(allowed_tools=["Bash(git:*)", "Edit"])
-        cmd = options.build_command()
-        assert "--allowedTools" in cmd
-        tools_idx = cmd.index("--allowedTools")
-        assert cmd[tools_idx + 1] == "Bash(git:*),Edit"
-
-    def test_disallowed_tools(self):
-        """Test --disallowedTools option."""
-        options = ClaudeOptions(disallowed_tools=["Browser", "Task"])
-        cmd = options.build_command()
-        assert "--disallowedTools" in cmd
-
-
-class TestSessionManagementOptions:
-    """Test session management options."""
-
-    def test_continue_flag(self):
-        """Test --continue flag."""
-        options = ClaudeOptions(continue_conversation=True)
-        cmd = options.build_command()
-        assert "--continue" in cmd
-
-    def test_resume_option(self):
-        """Test --resume option."""
-        options = ClaudeOptions(resume="session-123")
-        cmd = options.build_command()
-        assert "--resume" in cmd
-        assert "session-123" in cmd
-
-    def test_fork_session_flag(self):
-        """Test --fork-session flag."""
-        options = ClaudeOptions(fork_session=True)
-        cmd = options.build_command()
-        assert "--fork-session" in cmd
-
-    def test_session_id(self):
-        """Test --session-id option."""
-        options = ClaudeOptions(session_id="abc-123-def")
-        cmd = options.build_command()
-        assert "--session-id" in cmd
-        assert "abc-123-def" in cmd
-
-    def test_no_session_persistence(self):
-        """Test --no-session-persistence flag."""
-        options = ClaudeOptions(no_session_persistence=True)
-        cmd = options.build_command()
-        assert "--no-session-persistence" in cmd
-
-
-class TestModeOptions:
-    """Test mode-related options."""
-
-    def test_print_mode(self):
-        """Test --print flag."""
-        options = ClaudeOptions(print_mode=True)
-        cmd = options.build_command()
-        assert "--print" in cmd
-
-    def test_permission_mode(self):
-        """Test --permission-mode option."""
-        options = ClaudeOptions(permission_mode="acceptEdits")
-        cmd = options.build_command()
-        assert "--permission-mode" in cmd
-        assert "acceptEdits" in cmd
-
-    def test_permission_mode_invalid(self):
-        """Test invalid permission mode raises error."""
-        with pytest.raises(ValueError, match="Invalid permission_mode"):
-            ClaudeOptions(permission_mode="invalid_mode")
-
-    def test_dangerously_skip_permissions(self):
-        """Test --dangerously-skip-permissions flag."""
-        options = ClaudeOptions(dangerously_skip_permissions=True)
-        cmd = options.build_command()
-        assert "--dangerously-skip-permissions" in cmd
-
-    def test_include_partial_messages(self):
-        """Test --include-partial-messages flag."""
-        options = ClaudeOptions(include_partial_messages=True)
-        cmd = options.build_command()
-        assert "--include-partial-messages" in cmd
-
-
-class TestOutputFormatOptions:
-    """Test output format options."""
-
-    def test_output_format_json(self):
-        """Test --output-format json."""
-        options = ClaudeOptions(output_format="json")
-        cmd = options.build_command()
-        assert "--output-format" in cmd
-        assert "json" in cmd
-
-    def test_output_format_stream_json(self):
-        """Test --output-format stream-json."""
-        options = ClaudeOptions(output_format="stream-json")
-        cmd = options.build_command()
-        assert "--output-format" in cmd
-        assert "stream-json" in cmd
-
-    def test_output_format_invalid(self):
-        """Test invalid output format raises error."""
-        with pytest.raises(ValueError, match="Invalid output_format"):
-            ClaudeOptions(output_format="xml")
-
-    def test_input_format(self):
-        """Test --input-format option."""
-        options = ClaudeOptions(input_format="stream-json")
-        cmd = options.build_command()
-        assert "--input-format" in cmd
-        assert "stream-json" in cmd
-
-    def test_input_format_invalid(self):
-        """Test invalid input format raises error."""
-        with pytest.raises(ValueError, match="Invalid input_format"):
-            ClaudeOptions(input_format="invalid")
-
-
-class TestBudgetAndLimitsOptions:
-    """Test budget and limit options."""
-
-    def test_max_budget_usd(self):
-        """Test --max-budget-usd option."""
-        options = ClaudeOptions(max_budget_usd=0.50)
-        cmd = options.build_command()
-        assert "--max-budget-usd" in cmd
-        assert "0.5" in cmd
-
-    def test_max_turns(self):
-        """Test --max-turns option."""
-        options = ClaudeOptions(max_turns=5)
-        cmd = options.build_command()
-        assert "--max-turns" in cmd
-        assert "5" in cmd
+        flags = _flag_values(options.build_command())
+        assert flags["--system-prompt"] == "You are helpful"
+        assert flags["--append-system-prompt"] == "Be concise"
 
 
 class TestStructuredOutputOptions:
     """Test structured output options."""
 
-    def test_json_schema_dict(self):
-        """Test --json-schema with dict."""
-        schema = {
-            "type": "object",
-            "properties": {"name": {"type": "string"}, "age": {"type": "number"}},
-        }
-        options = ClaudeOptions(json_schema=schema)
-        cmd = options.build_command()
-        assert "--json-schema" in cmd
-        schema_idx = cmd.index("--json-schema")
-        schema_json = json.loads(cmd[schema_idx + 1])
-        assert schema_json["type"] == "object"
-        assert schema_json["properties"]["name"]["type"] == "string"
-
     def test_json_schema_string(self):
         """Test --json-schema with JSON string."""
         schema_json = '{"type": "object", "properties": {"name": {"type": "string"}}}'
@@ -298,205 +270,26 @@ class TestDirectoryAndFileOptions:
         # Normalize paths for cross-platform comparison
         assert Path(kwargs["cwd"]) == Path("/path/to/project")
 
-    def test_add_dirs(self):
-        """Test --add-dir option."""
-        options = ClaudeOptions(add_dirs=["/dir1", "/dir2"])
-        cmd = options.build_command()
-        add_dir_indices = [i for i, x in enumerate(cmd) if x == "--add-dir"]
-        assert len(add_dir_indices) == 2
-        assert "/dir1" in cmd
-        assert "/dir2" in cmd
-
-    def test_add_dirs_with_path(self):
-        """Test --add-dir with Path objects."""
-        options = ClaudeOptions(add_dirs=[Path("/dir1"), Path("/dir2")])
-        cmd = options.build_command()
-        # Normalize paths for cross-platform comparison
-        cmd_str = " ".join(cmd)
-        assert str(Path("/dir1")) in cmd_str or "dir1" in cmd_str
-        assert str(Path("/dir2")) in cmd_str or "dir2" in cmd_str
-
 
 class TestSettingsOptions:
     """Test settings-related options."""
 
-    def test_settings_dict(self):
-        """Test --settings with dict."""
-        settings = {"key": "value", "enabled": True}
-        options = ClaudeOptions(settings=settings)
-        cmd = options.build_command()
-        assert "--settings" in cmd
-        settings_idx = cmd.index("--settings")
-        settings_json = json.loads(cmd[settings_idx + 1])
-        assert settings_json["key"] == "value"
-
     def test_settings_string(self):
         """Test --settings with JSON string."""
         settings_json = '{"key": "value"}'
         options = ClaudeOptions(settings=settings_json)
         cmd = options.build_command()
-        assert "--settings" in cmd
-        assert '{"key": "value"}' in cmd
-
-    def test_setting_sources(self):
-        """Test --setting-sources option."""
-        options = ClaudeOptions(setting_sources=["user", "project"])
-        cmd = options.build_command()
-        assert "--setting-sources" in cmd
-        assert "user,project" in cmd
-
-
-class TestMCPOptions:
-    """Test MCP server options."""
-
-    def test_mcp_config_dict(self):
-        """Test --mcp-config with dict."""
-        mcp_config = {"server1": {"command": "node", "args": ["server.js"]}}
-        options = ClaudeOptions(mcp_config=mcp_config)
-        cmd = options.build_command()
-        assert "--mcp-config" in cmd
-        mcp_idx = cmd.index("--mcp-config")
-        mcp_json = json.loads(cmd[mcp_idx + 1])
-        assert "mcpServers" in mcp_json
-        assert "server1" in mcp_json["mcpServers"]
-
-    def test_mcp_config_with_mcpServers_key(self):
-        """Test --mcp-config when dict already has mcpServers key."""
-        mcp_config = {"mcpServers": {"server1": {"command": "node"}}}
-        options = ClaudeOptions(mcp_config=mcp_config)
-        cmd = options.build_command()
-        mcp_idx = cmd.index("--mcp-config")
-        mcp_json = json.loads(cmd[mcp_idx + 1])
-        assert "server1" in mcp_json["mcpServers"]
-
-    def test_mcp_debug(self):
-        """Test --mcp-debug flag."""
-        options = ClaudeOptions(mcp_debug=True)
-        cmd = options.build_command()
-        assert "--mcp-debug" in cmd
-
-    def test_strict_mcp_config(self):
-        """Test --strict-mcp-config flag."""
-        options = ClaudeOptions(strict_mcp_config=True)
-        cmd = options.build_command()
-        assert "--strict-mcp-config" in cmd
-
-
-class TestPluginOptions:
-    """Test plugin options."""
-
-    def test_plugin_dir(self):
-        """Test --plugin-dir option."""
-        options = ClaudeOptions(plugin_dir=["/plugins1", "/plugins2"])
-        cmd = options.build_command()
-        plugin_indices = [i for i, x in enumerate(cmd) if x == "--plugin-dir"]
-        assert len(plugin_indices) == 2
-
-    def test_disable_slash_commands(self):
-        """Test --disable-slash-commands flag."""
-        options = ClaudeOptions(disable_slash_commands=True)
-        cmd = options.build_command()
-        assert "--disable-slash-commands" in cmd
-
-
-class TestBetaOptions:
-    """Test beta feature options."""
-
-    def test_betas(self):
-        """Test --betas option."""
-        options = ClaudeOptions(betas=["feature1", "feature2"])
-        cmd = options.build_command()
-        assert "--betas" in cmd
-        assert "feature1,feature2" in cmd
+        assert _flag_values(cmd)["--settings"] == '{"key": "value"}'
 
 
 class TestDebugOptions:
     """Test debug options."""
 
-    def test_debug_flag(self):
-        """Test --debug flag."""
-        options = ClaudeOptions(debug=True)
-        cmd = options.build_command()
-        assert "--debug" in cmd
-
     def test_debug_with_filter(self):
         """Test --debug with filter."""
         options = ClaudeOptions(debug=True, debug_filter="api,hooks")
         cmd = options.build_command()
-        assert "--debug" in cmd
-        assert "api,hooks" in cmd
-
-    def test_debug_file(self):
-        """Test --debug-file option."""
-        options = ClaudeOptions(debug_file="/path/to/debug.log")
-        cmd = options.build_command()
-        assert "--debug-file" in cmd
-        assert "/path/to/debug.log" in cmd
-
-    def test_verbose_flag(self):
-        """Test --verbose flag."""
-        options = ClaudeOptions(verbose=True)
-        cmd = options.build_command()
-        assert "--verbose" in cmd
-
-
-class TestIDEIntegrationOptions:
-    """Test IDE integration options."""
-
-    def test_ide_flag(self):
-        """Test --ide flag."""
-        options = ClaudeOptions(ide=True)
-        cmd = options.build_command()
-        assert "--ide" in cmd
-
-    def test_chrome_flag(self):
-        """Test --chrome flag."""
-        options = ClaudeOptions(chrome=True)
-        cmd = options.build_command()
-        assert "--chrome" in cmd
-
-    def test_no_chrome_flag(self):
-        """Test --no-chrome flag."""
-        options = ClaudeOptions(no_chrome=True)
-        cmd = options.build_command()
-        assert "--no-chrome" in cmd
-
-
-class TestFileResourceOptions:
-    """Test file resource options."""
-
-    def test_files_option(self):
-        """Test --file option."""
-        options = ClaudeOptions(files=["file-id-1:relative/path", "file-id-2:other/path"])
-        cmd = options.build_command()
-        file_indices = [i for i, x in enumerate(cmd) if x == "--file"]
-        assert len(file_indices) == 2
-        assert "file-id-1:relative/path" in cmd
-
-
-class TestPROptions:
-    """Test PR integration options."""
-
-    def test_from_pr(self):
-        """Test --from-pr option."""
-        options = ClaudeOptions(from_pr="123")
-        cmd = options.build_command()
-        assert "--from-pr" in cmd
-        assert "123" in cmd
-
-    def test_from_pr_url(self):
-        """Test --from-pr option with PR URL."""
-        options = ClaudeOptions(from_pr="https://github.com/user/repo/pull/42")
-        cmd = options.build_command()
-        assert "--from-pr" in cmd
-        assert "https://github.com/user/repo/pull/42" in cmd
-
-    def test_from_pr_search_term(self):
-        """Test --from-pr option with search term."""
-        options = ClaudeOptions(from_pr="fix auth bug")
-        cmd = options.build_command()
-        assert "--from-pr" in cmd
-        assert "fix auth bug" in cmd
+        assert _flag_values(cmd)["--debug"] == "api,hooks"
 
 
 class TestEnvironmentOptions:
@@ -525,56 +318,46 @@ class TestExtraArgsOptions:
     def test_extra_args_with_values(self):
         """Test extra_args with values."""
         options = ClaudeOptions(extra_args={"new-flag": "value", "another-flag": "another-value"})
-        cmd = options.build_command()
-        assert "--new-flag" in cmd
-        assert "value" in cmd
-        assert "--another-flag" in cmd
-        assert "another-value" in cmd
+        flags = _flag_values(options.build_command())
+        assert flags["--new-flag"] == "value"
+        assert flags["--another-flag"] == "another-value"
 
     def test_extra_args_boolean_flags(self):
         """Test extra_args with boolean flags (None value)."""
         options = ClaudeOptions(extra_args={"new-bool-flag": None, "another-bool": None})
-        cmd = options.build_command()
-        assert "--new-bool-flag" in cmd
-        assert "--another-bool" in cmd
-        # Check the flags appear in order (boolean flags don't have values after them)
-        new_bool_idx = cmd.index("--new-bool-flag")
-        another_bool_idx = cmd.index("--another-bool")
-        # For two consecutive boolean flags, one immediately follows the other
-        assert another_bool_idx == new_bool_idx + 1
+        flags = _flag_values(options.build_command())
+        # Boolean flags don't have values after them
+        assert flags["--new-bool-flag"] is True
+        assert flags["--another-bool"] is True
 
 
 class TestComplexScenarios:
     """Test complex realistic scenarios."""
 
-    def test_full_options_ci_cd_scenario(self):
-        """Test a typical CI/CD scenario with many options."""
-        options = ClaudeOptions(
-            model="haiku",
-            print_mode=True,
-            output_format="stream-json",
-            max_budget_usd=0.10,
-            max_turns=1,
-            system_prompt="You are a code reviewer",
-            permission_mode="acceptEdits",
-            disallowed_tools=["Browser", "Task"],
-            working_dir="/path/to/repo",
-        )
-        cmd = options.build_command("Review the code")
-        kwargs = options.build_subprocess_kwargs()
-
-        # Verify all options are present
-        assert "--model" in cmd
-        assert "haiku" in cmd
-        assert "--print" in cmd
-        assert "--output-format" in cmd
-        assert "stream-json" in cmd
-        assert "--max-budget-usd" in cmd
-        assert "--max-turns" in cmd
-        assert "--system-prompt" in cmd
-        assert "--permission-mode" in cmd
-        assert "--disallowedTools" in cmd
-        assert "Review the code" in cmd
+    def test_ci_cd_model_and_output(self, ci_cd_scenario):
+        """Test the CI/CD scenario's model, print mode and output format."""
+        flags, _, _ = ci_cd_scenario
+        assert flags["--model"] == "haiku"
+        assert flags["--print"] is True
+        assert flags["--output-format"] == "stream-json"
+
+    def test_ci_cd_limits(self, ci_cd_scenario):
+        """Test the CI/CD scenario's budget and turn limits."""
+        flags, _, _ = ci_cd_scenario
+        assert flags["--max-budget-usd"] == "0.1"
+        assert flags["--max-turns"] == "1"
+
+    def test_ci_cd_system_prompt_and_permissions(self, ci_cd_scenario):
+        """Test the CI/CD scenario's system prompt, permissions and tool restrictions."""
+        flags, _, _ = ci_cd_scenario
+        assert flags["--system-prompt"] == "You are a code reviewer"
+        assert flags["--permission-mode"] == "acceptEdits"
+        assert flags["--disallowedTools"] == "Browser,Task"
+
+    def test_ci_cd_prompt_and_working_dir(self, ci_cd_scenario):
+        """Test the CI/CD scenario passes the prompt last and runs in the repo."""
+        _, cmd, kwargs = ci_cd_scenario
+        assert cmd[-1] == "Review the code"
         assert kwargs["cwd"] == "/path/to/repo"
 
     def test_development_scenario_with_mcp(self):
@@ -591,12 +374,12 @@ class TestComplexScenarios:
             allowed_tools=["Bash(*)", "Edit", "Read"],
             debug=True,
         )
-        cmd = options.build_command()
+        flags = _flag_values(options.build_command())
 
-        assert "--agent" in cmd
-        assert "--mcp-config" in cmd
-        assert "--allowedTools" in cmd
-        assert "--debug" in cmd
+        assert flags["--agent"] == "coder"
+        assert "filesystem" in json.loads(flags["--mcp-config"])["mcpServers"]
+        assert flags["--allowedTools"] == "Bash(*),Edit,Read"
+        assert flags["--debug"] is True
 
 
 class TestCLIPathValidation:
@@ -614,28 +397,18 @@ class TestCLIPathValidation:
         # Normalize path for comparison
         assert Path(cmd[0]) == Path(cli_executable)
 
-    def test_non_executable_cli_path(self):
+    # On Windows, os.access has no execute bit to check
+    @pytest.mark.skipif(os.name == "nt", reason="requires POSIX executable bit")
+    def test_non_executable_cli_path(self, tmp_path):
         """Test error when specified cli_path is not executable."""
-        # Create a temporary file that is not executable
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".sh") as f:
-            temp_path = f.name
-            f.write("#!/bin/bash\necho test\n")
-
-        try:
-            # Make sure it's not executable
-            os.chmod(temp_path, 0o644)
-
-            options = ClaudeOptions(cli_path=temp_path)
-
-            # On Unix, this should fail if the file is not executable
-            # On Windows, os.access check might behave differently
-            if os.name != "nt":  # Skip on Windows
-                with pytest.raises(CLINotFoundError, match="not executable"):
-                    options.build_command("test")
-        finally:
-            # Clean up
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        # Create a file that is not executable
+        script = tmp_path / "fake.sh"
+        script.write_text("#!/bin/bash\necho test\n")
+        script.chmod(0o644)
+
+        options = ClaudeOptions(cli_path=str(script))
+        with pytest.raises(CLINotFoundError, match="not executable"):
+            options.build_command("test")
 
     def test_cli_path_not_found(self):
         """Test error when specified cli_path does not exist."""
@@ -643,22 +416,18 @@ class TestCLIPathValidation:
         with pytest.raises(CLINotFoundError, match="does not exist"):
             options.build_command("test")
 
-    def test_working_dir_in_kwargs(self):
+    def test_working_dir_in_kwargs(self, mock_find_cli):
         """Test that working_dir is passed to subprocess kwargs."""
-        # Mock find_tool to avoid actual CLI search
-        with patch("claude_sdk_lite.utils.find_tool_in_system_sync", return_value="/bin/ls"):
-            options = ClaudeOptions(working_dir="/custom/path")
-            options.build_command("test")
-            kwargs = options.build_subprocess_kwargs()
-            assert kwargs["cwd"] == "/custom/path"
+        options = ClaudeOptions(working_dir="/custom/path")
+        options.build_command("test")
+        kwargs = options.build_subprocess_kwargs()
+        assert kwargs["cwd"] == "/custom/path"
 
-    def test_env_vars_merged(self):
+    def test_env_vars_merged(self, mock_find_cli):
         """Test that custom env vars are merged with os.environ."""
-        # Mock find_tool to avoid actual CLI search
-        with patch("claude_sdk_lite.utils.find_tool_in_system_sync", return_value="/bin/ls"):
-            options = ClaudeOptions(env={"CUSTOM_VAR": "custom_value"})
-            kwargs = options.build_subprocess_kwargs()
-            assert "env" in kwargs
-            assert kwargs["env"]["CUSTOM_VAR"] == "custom_value"
-            # Should also contain existing environment variables
-            assert "PATH" in kwargs["env"]
+        options = ClaudeOptions(env={"CUSTOM_VAR": "custom_value"})
+        kwargs = options.build_subprocess_kwargs()
+        assert "env" in kwargs
+        assert kwargs["env"]["CUSTOM_VAR"] == "custom_value"
+        # Should also contain existing environment variables
+        assert "PATH" in kwargs["env"]
@@ -3,6 +3,9 @@
 Uses standard Unix commands (cat, wc, grep, etc.) to test subprocess communication.
 """
 
+import json
+import queue
+import subprocess
 import sys
 import time
 
@@ -14,6 +17,7 @@ from test_helpers import (
     get_true_command,
 )
 
+from claude_sdk_lite import persistent_executor
 from claude_sdk_lite.persistent_executor import PersistentProcessManager
 
 # ========== Helper Functions ==========
@@ -22,10 +26,11 @@ from claude_sdk_lite.persistent_executor import PersistentProcessManager
 def read_n_lines(manager, n, timeout=2.0):
     """Read exactly n lines from manager."""
     lines = []
-    for line in manager.read_lines(timeout=timeout):
-        lines.append(line)
-        if len(lines) >= n:
+    while len(lines) < n:
+        line = manager.read_one(timeout=timeout)
+        if line is None:
             break
+        lines.append(line)
     return lines
 
 
@@ -88,6 +93,26 @@ class TestPersistentProcessManagerLifecycle:
         time.sleep(0.1)  # Give it time to exit
         assert not manager.is_alive()
 
+    def test_start_uses_buffered_pipes(self, monkeypatch):
+        """Test that the subprocess pipes are not opened unbuffered.
+
+        With bufsize=0, readline() on stdout/stderr costs one read syscall per byte.
+        """
+        calls = []
+        real_popen = subprocess.Popen
+
+        def recording_popen(*args, **kwargs):
+            calls.append(kwargs)
+            return real_popen(*args, **kwargs)
+
+        monkeypatch.setattr(subprocess, "Popen", recording_popen)
+        with PersistentProcessManager() as manager:
+            manager.start(get_cat_command())
+            manager.write_request({"ping": 1})
+            assert manager.read_one(timeout=2.0) is not None
+
+        assert calls[0].get("bufsize", -1) != 0
+
 
 # ========== Bidirectional Communication Tests ==========
 
@@ -111,15 +136,10 @@ class TestBidirectionalCommunication:
 
             # cat echoes back the exact bytes
             # Read only one response then stop (cat keeps running)
-            import json
-
-            response = None
-            for line in manager.read_lines(timeout=2.0):
-                response = json.loads(line.decode("utf-8"))
-                break  # Only read one line
+            line = manager.read_one(timeout=2.0)
 
-            assert response is not None
-            assert response == test_data
+            assert line is not None
+            assert json.loads(line) == test_data
 
         finally:
             manager.stop()
@@ -142,9 +162,7 @@ class TestBidirectionalCommunication:
                 responses = read_n_lines(manager, 1)
                 assert len(responses) == 1
 
-                import json
-
-                response = json.loads(responses[0].decode("utf-8"))
+                response = json.loads(responses[0])
                 assert response == msg
 
         finally:
@@ -162,10 +180,8 @@ class TestBidirectionalCommunication:
                 manager.write_request({"sequence": i})
 
             # Then read all responses (cat echoes in order)
-            import json
-
             responses = read_n_lines(manager, num_requests)
-            responses = [json.loads(r.decode("utf-8")) for r in responses]
+            responses = [json.loads(r) for r in responses]
 
             assert len(responses) == num_requests
             assert [r["sequence"] for r in responses] == [0, 1, 2]
@@ -209,8 +225,6 @@ class TestErrorHandling:
 
             # Process has exited after head -1
             # Give stdout_reader time to detect EOF
-            import time
-
             time.sleep(0.1)
 
             # Process should be dead now
@@ -289,13 +303,11 @@ for line in sys.stdin:
         try:
             # Don't send anything, directly test queue timeout behavior
             # grep won't produce output, so queue should be empty
-            import queue as queue_module
-
             line = None
             try:
                 # Try to get from queue with timeout
                 line = manager._line_queue.get(timeout=0.5)
-            except queue_module.Empty:
+            except queue.Empty:
                 pass  # Expected - no data available
 
             # Should have gotten nothing (line is None or we timed out)
@@ -325,9 +337,7 @@ class TestInterruptFunctionality:
             responses = read_n_lines(manager, 1)
             assert len(responses) == 1
 
-            import json
-
-            response = json.loads(responses[0].decode("utf-8"))
+            response = json.loads(responses[0])
             assert response["type"] == "control_request"
             assert response["request"]["subtype"] == "interrupt"
 
@@ -355,9 +365,7 @@ class TestDataIntegrity:
             responses = read_n_lines(manager, 1)
             assert len(responses) == 1
 
-            import json
-
-            response = json.loads(responses[0].decode("utf-8"))
+            response = json.loads(responses[0])
             assert response["data"] == large_data
 
         finally:
@@ -383,9 +391,7 @@ class TestDataIntegrity:
                 responses = read_n_lines(manager, 1)
                 assert len(responses) == 1
 
-                import json
-
-                response = json.loads(responses[0].decode("utf-8"))
+                response = json.loads(responses[0])
                 assert response["message"] == test_str
 
         finally:
@@ -411,9 +417,7 @@ class TestDataIntegrity:
             responses = read_n_lines(manager, 1)
             assert len(responses) == 1
 
-            import json
-
-            response = json.loads(responses[0].decode("utf-8"))
+            response = json.loads(responses[0])
             assert response == complex_request
 
         finally:
@@ -439,15 +443,11 @@ class TestIntegrationScenarios:
                 {"role": "user", "content": "goodbye"},
             ]
 
-            import json
-
             responses = []
             for msg in messages:
                 manager.write_request(msg)
-                for line in manager.read_lines(timeout=2.0):
-                    response = json.loads(line.decode("utf-8"))
-                    responses.append(response)
-                    break  # Only read one response per message
+                line = manager.read_one(timeout=2.0)
+                responses.append(json.loads(line))
 
             assert len(responses) == 3
             for i, response in enumerate(responses):
@@ -479,13 +479,11 @@ class TestIntegrationScenarios:
         manager.start(get_cat_command())
 
         # Do some work
-        import json
-
         for i in range(3):
             manager.write_request({"id": i})
             responses = read_n_lines(manager, 1)
             assert len(responses) == 1
-            assert json.loads(responses[0].decode("utf-8"))["id"] == i
+            assert json.loads(responses[0])["id"] == i
 
         # Stop should cleanup cleanly
         manager.stop()
@@ -520,6 +518,83 @@ class TestGeneratorBehavior:
         finally:
             manager.stop()
 
+    def test_read_one_does_not_drain_queue(self):
+        """Test that read_one leaves later lines queued for the next read."""
+        manager = PersistentProcessManager()
+        manager.start(get_cat_command())
+
+        try:
+            manager.write_request({"id": 1})
+            manager.write_request({"id": 2})
+
+            first = manager.read_one(timeout=2.0)
+            second = manager.read_one(timeout=2.0)
+
+            assert json.loads(first)["id"] == 1
+            assert json.loads(second)["id"] == 2
+
+        finally:
+            manager.stop()
+
+    def test_read_one_returns_none_on_timeout_and_eof(self):
+        """Test that read_one returns None on timeout and on EOF."""
+        manager = PersistentProcessManager()
+        manager.start(get_cat_command())
+
+        try:
+            assert manager.read_one(timeout=0.1) is None
+        finally:
+            manager.stop()
+
+        manager.start(get_true_command())
+        try:
+            assert manager.read_one(timeout=2.0) is None
+            # EOF sentinel is preserved for subsequent reads
+            assert manager.read_one(timeout=2.0) is None
+        finally:
+            manager.stop()
+
+    def test_flush_discards_pending_lines(self):
+        """Test that flush discards queued lines so the process can be reused."""
+        manager = PersistentProcessManager()
+        manager.start(get_cat_command())
+
+        try:
+            manager.write_request({"stale": True})
+            # Wait until cat has echoed the line into the queue
+            deadline = time.monotonic() + 5.0
+            while manager._line_queue.qsize() < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert manager.flush() == 1
+            assert manager.read_one(timeout=0.1) is None
+
+            manager.write_request({"fresh": True})
+            assert b"fresh" in manager.read_one(timeout=2.0)
+
+        finally:
+            manager.stop()
+
+    def test_flush_discards_at_most_the_drain_cap(self, monkeypatch):
+        """Test that flush stops at DRAIN_QUEUE_MAX_ITEMS and leaves the rest queued."""
+        monkeypatch.setattr(persistent_executor, "DRAIN_QUEUE_MAX_ITEMS", 2)
+        manager = PersistentProcessManager()
+        manager.start(get_cat_command())
+
+        try:
+            for i in range(3):
+                manager.write_request({"stale": i})
+            deadline = time.monotonic() + 5.0
+            while manager._line_queue.qsize() < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert manager.flush() == 2
+            assert manager.flush() == 1
+            assert manager.flush() == 0
+
+        finally:
+            manager.stop()
+
     def test_read_lines_with_timeout(self):
         """Test read_lines respects timeout parameter."""
         manager = PersistentProcessManager()
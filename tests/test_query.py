@@ -1,9 +1,10 @@
 """Tests for sync query function with mocked subprocess."""
 
-import json
-from unittest.mock import MagicMock, patch
+import subprocess
+from unittest.mock import patch
 
 import pytest
+from test_helpers import MockProcess, PopenStub, encode_json_lines, fake_exit
 
 from claude_sdk_lite import (
     ClaudeOptions,
@@ -15,95 +16,32 @@ from claude_sdk_lite import (
 from claude_sdk_lite.types import AssistantMessage, ResultMessage
 
 
-class MockProcess:
-    """Mock subprocess.Popen object."""
-
-    def __init__(self, stdout_lines=None, returncode=0, stderr=b""):
-        self.stdout_lines = stdout_lines or []
-        self.returncode = returncode
-        self.stderr_data = stderr
-        self._stdout_index = 0
-
-        # Create mock stdout with proper iterator
-        self.stdout = self._create_mock_stdout()
-
-        # Create mock stderr
-        self.stderr = MagicMock()
-        self.stderr.read = MagicMock(return_value=self.stderr_data)
-
-    def _create_mock_stdout(self):
-        """Create a mock stdout that can be iterated."""
-
-        class MockStdout:
-            def __init__(self, lines):
-                self.lines = lines
-                self.index = 0
-
-            def __iter__(self):
-                return self
-
-            def __next__(self):
-                if self.index >= len(self.lines):
-                    raise StopIteration
-                line = self.lines[self.index]
-                self.index += 1
-                return line.encode() if isinstance(line, str) else line
-
-            def read(self):
-                return b"".join(
-                    line.encode() if isinstance(line, str) else line for line in self.lines
-                )
-
-        return MockStdout(self.stdout_lines)
-
-    def poll(self):
-        """Check if process has terminated."""
-        return None if self._stdout_index < len(self.stdout_lines) else self.returncode
-
-    def wait(self, timeout=None):
-        """Wait for process to complete."""
-        self._stdout_index = len(self.stdout_lines)  # Mark as complete
-        return self.returncode
-
-    def terminate(self):
-        """Terminate the process."""
-        self._stdout_index = len(self.stdout_lines)
-
-    def kill(self):
-        """Kill the process."""
-        self._stdout_index = len(self.stdout_lines)
-
-    def __enter__(self):
-        """Context manager entry."""
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit."""
-        return False
-
-    def communicate(self, input=None, timeout=None):
-        """Communicate with process (for subprocess.run compatibility)."""
-        stdout_data = b"".join(
-            line.encode() if isinstance(line, str) else line for line in self.stdout_lines
-        )
-        return (stdout_data, self.stderr_data)
-
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_subprocess_popen():
     """Create a mock subprocess.Popen function."""
 
     def _create(responses, returncode=0):
         """Create a mock process with given responses."""
-        lines = [json.dumps(r) for r in responses]
-        return MockProcess(stdout_lines=lines, returncode=returncode)
+        return MockProcess(stdout_lines=encode_json_lines(responses), returncode=returncode)
 
     return _create
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
+def popen_stub(monkeypatch):
+    """Replace subprocess.Popen with a stub; tests set its ``process`` to return."""
+    stub = PopenStub()
+    monkeypatch.setattr(subprocess, "Popen", stub)
+    return stub
+
+
+@pytest.fixture(scope="module", autouse=True)
 def mock_find_cli():
-    """Mock CLI finding to avoid actual subprocess.run calls in _find_cli_path."""
+    """Mock CLI finding to avoid actual subprocess.run calls in _find_cli_path.
+
+    Installed once for the module; the patch lives inside the fixture's ``with`` block, so
+    each test process (including parallel workers) gets and undoes its own copy.
+    """
     with patch("claude_sdk_lite.utils.find_tool_in_system_sync", return_value="/usr/bin/claude"):
         yield
 
@@ -111,7 +49,7 @@ def mock_find_cli():
 class TestQueryFunction:
     """Test the query() function."""
 
-    def test_query_simple_success(self, mock_subprocess_popen):
+    def test_query_simple_success(self, mock_subprocess_popen, popen_stub):
         """Test successful query with simple response."""
         responses = [
             {
@@ -121,16 +59,16 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            messages = []
-            for msg in query(prompt="Hi"):
-                messages.append(msg)
+        popen_stub.process = mock_process
+        messages = []
+        for msg in query(prompt="Hi"):
+            messages.append(msg)
 
-            assert len(messages) == 1
-            assert isinstance(messages[0], AssistantMessage)
-            assert messages[0].content[0].text == "Hello!"
+        assert len(messages) == 1
+        assert isinstance(messages[0], AssistantMessage)
+        assert messages[0].content[0].text == "Hello!"
 
-    def test_query_with_thinking(self, mock_subprocess_popen):
+    def test_query_with_thinking(self, mock_subprocess_popen, popen_stub):
         """Test query with thinking blocks."""
         responses = [
             {
@@ -155,17 +93,17 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            messages = []
-            for msg in query(prompt="What is the meaning of life?"):
-                messages.append(msg)
+        popen_stub.process = mock_process
+        messages = []
+        for msg in query(prompt="What is the meaning of life?"):
+            messages.append(msg)
 
-            assert len(messages) == 2
-            assert isinstance(messages[0], AssistantMessage)
-            assert len(messages[0].content) == 2
-            assert isinstance(messages[1], ResultMessage)
+        assert len(messages) == 2
+        assert isinstance(messages[0], AssistantMessage)
+        assert len(messages[0].content) == 2
+        assert isinstance(messages[1], ResultMessage)
 
-    def test_query_with_tool_use(self, mock_subprocess_popen):
+    def test_query_with_tool_use(self, mock_subprocess_popen, popen_stub):
         """Test query that uses tools."""
         responses = [
             {
@@ -186,16 +124,16 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            messages = []
-            for msg in query(prompt="List files"):
-                messages.append(msg)
+        popen_stub.process = mock_process
+        messages = []
+        for msg in query(prompt="List files"):
+            messages.append(msg)
 
-            assert len(messages) == 1
-            assert len(messages[0].content) == 2
-            assert messages[0].content[1].name == "bash"
+        assert len(messages) == 1
+        assert len(messages[0].content) == 2
+        assert messages[0].content[1].name == "bash"
 
-    def test_query_with_custom_options(self, mock_subprocess_popen):
+    def test_query_with_custom_options(self, mock_subprocess_popen, popen_stub):
         """Test query with custom options."""
         responses = [
             {
@@ -208,21 +146,21 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process) as mock_popen:
-            options = ClaudeOptions(model="haiku", max_turns=1, system_prompt="Be concise")
+        popen_stub.process = mock_process
+        options = ClaudeOptions(model="haiku", max_turns=1, system_prompt="Be concise")
 
-            for msg in query(prompt="Quick question", options=options):
-                pass
+        for msg in query(prompt="Quick question", options=options):
+            pass
 
-            # Verify Popen was called with correct arguments
-            call_args = mock_popen.call_args
-            cmd = call_args[0][0]  # First positional arg (command list)
-            assert "--model" in cmd
-            assert "haiku" in cmd
-            assert "--max-turns" in cmd
-            assert "1" in cmd
-            assert "--system-prompt" in cmd
-            assert "Be concise" in cmd
+        # Verify Popen was called with correct arguments
+        call_args = popen_stub.call_args
+        cmd = call_args[0][0]  # First positional arg (command list)
+        assert "--model" in cmd
+        assert "haiku" in cmd
+        assert "--max-turns" in cmd
+        assert "1" in cmd
+        assert "--system-prompt" in cmd
+        assert "Be concise" in cmd
 
     def test_query_cli_not_found(self):
         """Test query when CLI is not found."""
@@ -231,16 +169,29 @@ class TestQueryFunction:
                 for msg in query(prompt="test"):
                     pass
 
-    def test_query_cli_execution_error(self):
+    def test_query_cli_execution_error(self, popen_stub):
         """Test query when CLI execution fails."""
-        mock_process = MockProcess(stdout_lines=[], returncode=1, stderr=b"Error: Invalid option\n")
+        mock_process = fake_exit(1, stderr=b"Error: Invalid option\n")
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            with pytest.raises(CLIExecutionError, match="CLI exited with code 1"):
-                for msg in query(prompt="test"):
-                    pass
+        popen_stub.process = mock_process
+        with pytest.raises(CLIExecutionError, match="CLI exited with code 1"):
+            for msg in query(prompt="test"):
+                pass
+
+    def test_query_reads_stderr_in_large_chunks(self, popen_stub):
+        """Test that stderr is drained to EOF or in reads of at least 64 KiB, never tiny chunks."""
+        stderr = b"e" * 200_000
+        mock_process = fake_exit(1, stderr=stderr)
+
+        popen_stub.process = mock_process
+        with pytest.raises(CLIExecutionError) as exc_info:
+            for msg in query(prompt="test"):
+                pass
+
+        assert exc_info.value.stderr == stderr.decode()
+        assert all(size < 0 or size >= 65536 for size in mock_process.stderr.read_sizes)
 
-    def test_query_stops_at_result_message(self, mock_subprocess_popen):
+    def test_query_stops_at_result_message(self, mock_subprocess_popen, popen_stub):
         """Test that query stops iteration at result message."""
         responses = [
             {
@@ -259,15 +210,15 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            messages = []
-            for msg in query(prompt="test"):
-                messages.append(msg)
+        popen_stub.process = mock_process
+        messages = []
+        for msg in query(prompt="test"):
+            messages.append(msg)
 
-            assert len(messages) == 2
-            assert isinstance(messages[1], ResultMessage)
+        assert len(messages) == 2
+        assert isinstance(messages[1], ResultMessage)
 
-    def test_query_uses_default_options(self, mock_subprocess_popen):
+    def test_query_uses_default_options(self, mock_subprocess_popen, popen_stub):
         """Test that query uses default options when none provided."""
         responses = [
             {
@@ -282,17 +233,17 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process) as mock_popen:
-            for msg in query(prompt="test"):
-                pass
+        popen_stub.process = mock_process
+        for msg in query(prompt="test"):
+            pass
 
-            call_args = mock_popen.call_args
-            cmd = call_args[0][0]
-            assert "--print" in cmd
-            assert "--output-format" in cmd
-            assert "stream-json" in cmd
+        call_args = popen_stub.call_args
+        cmd = call_args[0][0]
+        assert "--print" in cmd
+        assert "--output-format" in cmd
+        assert "stream-json" in cmd
 
-    def test_query_with_working_dir(self, mock_subprocess_popen):
+    def test_query_with_working_dir(self, mock_subprocess_popen, popen_stub):
         """Test query with custom working directory."""
         responses = [
             {
@@ -307,16 +258,16 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process) as mock_popen:
-            options = ClaudeOptions(working_dir="/custom/path")
-            for msg in query(prompt="test", options=options):
-                pass
+        popen_stub.process = mock_process
+        options = ClaudeOptions(working_dir="/custom/path")
+        for msg in query(prompt="test", options=options):
+            pass
 
-            call_kwargs = mock_popen.call_args[1]
-            assert "cwd" in call_kwargs
-            assert call_kwargs["cwd"] == "/custom/path"
+        call_kwargs = popen_stub.call_args[1]
+        assert "cwd" in call_kwargs
+        assert call_kwargs["cwd"] == "/custom/path"
 
-    def test_query_with_env_vars(self, mock_subprocess_popen):
+    def test_query_with_env_vars(self, mock_subprocess_popen, popen_stub):
         """Test query with custom environment variables."""
         responses = [
             {
@@ -331,20 +282,20 @@ class TestQueryFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process) as mock_popen:
-            options = ClaudeOptions(env={"CUSTOM_VAR": "custom_value"})
-            for msg in query(prompt="test", options=options):
-                pass
+        popen_stub.process = mock_process
+        options = ClaudeOptions(env={"CUSTOM_VAR": "custom_value"})
+        for msg in query(prompt="test", options=options):
+            pass
 
-            call_kwargs = mock_popen.call_args[1]
-            assert "env" in call_kwargs
-            assert call_kwargs["env"]["CUSTOM_VAR"] == "custom_value"
+        call_kwargs = popen_stub.call_args[1]
+        assert "env" in call_kwargs
+        assert call_kwargs["env"]["CUSTOM_VAR"] == "custom_value"
 
 
 class TestQueryTextFunction:
     """Test the query_text() convenience function."""
 
-    def test_query_text_simple(self, mock_subprocess_popen):
+    def test_query_text_simple(self, mock_subprocess_popen, popen_stub):
         """Test query_text with simple response."""
         responses = [
             {
@@ -363,11 +314,11 @@ class TestQueryTextFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            result = query_text(prompt="Say hello")
-            assert result == "Hello!"
+        popen_stub.process = mock_process
+        result = query_text(prompt="Say hello")
+        assert result == "Hello!"
 
-    def test_query_text_multiple_blocks(self, mock_subprocess_popen):
+    def test_query_text_multiple_blocks(self, mock_subprocess_popen, popen_stub):
         """Test query_text concatenates multiple text blocks."""
         responses = [
             {
@@ -392,11 +343,11 @@ class TestQueryTextFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            result = query_text(prompt="Test")
-            assert result == "First part. Second part."
+        popen_stub.process = mock_process
+        result = query_text(prompt="Test")
+        assert result == "First part. Second part."
 
-    def test_query_text_ignores_thinking(self, mock_subprocess_popen):
+    def test_query_text_ignores_thinking(self, mock_subprocess_popen, popen_stub):
         """Test query_text ignores thinking blocks."""
         responses = [
             {
@@ -421,11 +372,11 @@ class TestQueryTextFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            result = query_text(prompt="Test")
-            assert result == "Actual response"
+        popen_stub.process = mock_process
+        result = query_text(prompt="Test")
+        assert result == "Actual response"
 
-    def test_query_text_with_options(self, mock_subprocess_popen):
+    def test_query_text_with_options(self, mock_subprocess_popen, popen_stub):
         """Test query_text with custom options."""
         responses = [
             {
@@ -447,16 +398,16 @@ class TestQueryTextFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process) as mock_popen:
-            options = ClaudeOptions(model="haiku")
-            result = query_text(prompt="Test", options=options)
+        popen_stub.process = mock_process
+        options = ClaudeOptions(model="haiku")
+        result = query_text(prompt="Test", options=options)
 
-            call_args = mock_popen.call_args
-            cmd = call_args[0][0]
-            assert "haiku" in cmd
-            assert result == "Quick response"
+        call_args = popen_stub.call_args
+        cmd = call_args[0][0]
+        assert "haiku" in cmd
+        assert result == "Quick response"
 
-    def test_query_text_empty_response(self, mock_subprocess_popen):
+    def test_query_text_empty_response(self, mock_subprocess_popen, popen_stub):
         """Test query_text with no text content."""
         responses = [
             {
@@ -485,21 +436,21 @@ class TestQueryTextFunction:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            result = query_text(prompt="Test")
-            assert result == ""
+        popen_stub.process = mock_process
+        result = query_text(prompt="Test")
+        assert result == ""
 
-    def test_query_text_handles_errors(self):
+    def test_query_text_handles_errors(self, popen_stub):
         """Test query_text propagates errors."""
-        with patch("subprocess.Popen", side_effect=FileNotFoundError):
-            with pytest.raises(CLINotFoundError):
-                query_text(prompt="Test")
+        popen_stub.side_effect = FileNotFoundError
+        with pytest.raises(CLINotFoundError):
+            query_text(prompt="Test")
 
 
 class TestRealWorldScenarios:
     """Test real-world usage scenarios."""
 
-    def test_code_generation_workflow(self, mock_subprocess_popen):
+    def test_code_generation_workflow(self, mock_subprocess_popen, popen_stub):
         """Test a typical code generation workflow."""
         responses = [
             {
@@ -546,27 +497,25 @@ class TestRealWorldScenarios:
         ]
         mock_process = mock_subprocess_popen(responses)
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            messages = []
-            for msg in query(prompt="Create a hello world function"):
-                messages.append(msg)
+        popen_stub.process = mock_process
+        messages = []
+        for msg in query(prompt="Create a hello world function"):
+            messages.append(msg)
 
-            assert len(messages) == 3
-            assert isinstance(messages[0], AssistantMessage)
-            assert isinstance(messages[1], AssistantMessage)
-            assert isinstance(messages[2], ResultMessage)
-            assert messages[2].total_cost_usd == 0.002
+        assert len(messages) == 3
+        assert isinstance(messages[0], AssistantMessage)
+        assert isinstance(messages[1], AssistantMessage)
+        assert isinstance(messages[2], ResultMessage)
+        assert messages[2].total_cost_usd == 0.002
 
-    def test_error_recovery_scenario(self):
+    def test_error_recovery_scenario(self, popen_stub):
         """Test error scenario with CLI execution error."""
-        mock_process = MockProcess(
-            stdout_lines=[], returncode=1, stderr=b"Error: API rate limit exceeded\n"
-        )
+        mock_process = fake_exit(1, stderr=b"Error: API rate limit exceeded\n")
 
-        with patch("subprocess.Popen", return_value=mock_process):
-            with pytest.raises(CLIExecutionError) as exc_info:
-                for msg in query(prompt="test"):
-                    pass
+        popen_stub.process = mock_process
+        with pytest.raises(CLIExecutionError) as exc_info:
+            for msg in query(prompt="test"):
+                pass
 
-            assert exc_info.value.exit_code == 1
-            assert "API rate limit" in str(exc_info.value.stderr)
+        assert exc_info.value.exit_code == 1
+        assert "API rate limit" in str(exc_info.value.stderr)
@@ -0,0 +1,116 @@
+"""Tests for the columnar transcript view."""
+
+import json
+from collections import OrderedDict
+
+from claude_sdk_lite import Transcript, parse_transcript
+
+_SYSTEM = {"type": "system", "subtype": "init", "session_id": "s"}
+_ASSISTANT = {
+    "type": "assistant",
+    "message": {
+        "model": "sonnet",
+        "content": [
+            {"type": "text", "text": "Hello"},
+            {"type": "tool_use", "id": "t1", "name": "bash", "input": {"command": "ls"}},
+            {"type": "text", "text": " world"},
+        ],
+    },
+}
+_USER = {"type": "user", "message": {"content": "hi"}}
+_RESULT = {
+    "type": "result",
+    "subtype": "success",
+    "duration_ms": 1500,
+    "duration_api_ms": 1200,
+    "is_error": False,
+    "num_turns": 1,
+    "session_id": "s",
+    "total_cost_usd": 0.25,
+}
+
+
+class TestParseTranscript:
+    """Test building transcripts from CLI output lines."""
+
+    def test_columns_from_ndjson_bytes(self):
+        """Test that each message becomes one row across all columns."""
+        lines = [json.dumps(m).encode() for m in (_SYSTEM, _ASSISTANT, _USER, _RESULT)]
+
+        transcript = parse_transcript(lines)
+        assert len(transcript) == 4
+        assert transcript.types == ["system", "assistant", "user", "result"]
+        assert transcript.models == [None, "sonnet", None, None]
+        assert transcript.texts == [[], ["Hello", " world"], [], []]
+        assert transcript.durations_ms == [None, None, None, 1500]
+        assert transcript.costs_usd == [None, None, None, 0.25]
+
+    def test_accepts_decoded_dicts(self):
+        """Test that already-decoded message dicts are used as-is."""
+        transcript = parse_transcript([_ASSISTANT, _RESULT])
+        assert transcript.types == ["assistant", "result"]
+        assert transcript.assistant_text() == "Hello world"
+
+    def test_accepts_dict_subclasses(self):
+        """Test that dict subclasses are treated as decoded messages, not lines."""
+        transcript = parse_transcript([OrderedDict(_RESULT)])
+        assert transcript.types == ["result"]
+        assert transcript.durations_ms == [1500]
+
+    def test_aggregates(self):
+        """Test the text, duration and cost aggregates over result rows."""
+        lines = [json.dumps(m) for m in (_ASSISTANT, _RESULT, _ASSISTANT, _RESULT)]
+
+        transcript = parse_transcript(lines)
+        assert transcript.assistant_text(separator="\n") == "Hello\n world\nHello\n world"
+        assert transcript.total_duration_ms() == 3000
+        assert transcript.total_cost_usd() == 0.5
+
+    def test_malformed_lines_do_not_raise(self):
+        """Test that blank, invalid and untyped lines are skipped or marked."""
+        lines = [
+            "",
+            "   ",
+            "not a json",
+            "[1, 2]",
+            '{"subtype": "init"}',
+            '{"type": "assistant", "message": {"model": "sonnet"}}',
+        ]
+
+        transcript = parse_transcript(lines)
+        assert transcript.types == ["invalid_json", "invalid_json", "missing_type", "assistant"]
+        assert transcript.models == [None, None, None, "sonnet"]
+        assert transcript.texts == [[], [], [], []]
+
+    def test_wrongly_typed_fields_leave_cells_empty(self):
+        """Test that values of the wrong JSON type are not copied into the columns."""
+        lines = [
+            '{"type": 5}',
+            json.dumps(
+                {
+                    "type": "assistant",
+                    "message": {"model": 1, "content": [{"type": "text", "text": 2}]},
+                }
+            ),
+            '{"type": "result", "duration_ms": "5", "total_cost_usd": true}',
+            '{"type": "result", "duration_ms": 7, "total_cost_usd": 1}',
+        ]
+
+        transcript = parse_transcript(lines)
+        assert transcript.types == ["missing_type", "assistant", "result", "result"]
+        assert transcript.models == [None, None, None, None]
+        assert transcript.texts == [[], [], [], []]
+        assert transcript.durations_ms == [None, None, None, 7]
+        assert transcript.costs_usd == [None, None, None, 1.0]
+        assert transcript.total_duration_ms() == 7
+        assert Transcript.model_validate(transcript.model_dump()) == transcript
+
+    def test_empty_input(self):
+        """Test that no lines produce an empty transcript."""
+        transcript = parse_transcript([])
+        assert isinstance(transcript, Transcript)
+        assert len(transcript) == 0
+        assert transcript.assistant_text() == ""
+        assert transcript.total_duration_ms() == 0
+        assert transcript.total_cost_usd() == 0.0
+        assert isinstance(transcript.total_cost_usd(), float)
@@ -4,7 +4,9 @@ import pytest
 
 from claude_sdk_lite.types import (
     AssistantMessage,
+    ContentBlock,
     InterruptBlock,
+    Message,
     ResultMessage,
     StreamEvent,
     SystemMessage,
@@ -328,8 +330,6 @@ class TestInterruptBlock:
 
     def test_interrupt_block_in_content_blocks(self):
         """Test that InterruptBlock can be used in ContentBlock union."""
-        from claude_sdk_lite.types import ContentBlock
-
         block: ContentBlock = InterruptBlock()
         assert isinstance(block, InterruptBlock)
         assert block.type == "interrupt"
@@ -397,8 +397,6 @@ class TestUnknownMessage:
 
     def test_unknown_message_in_message_union(self):
         """Test that UnknownMessage can be used in Message union."""
-        from claude_sdk_lite.types import Message
-
         msg: Message = UnknownMessage(type="unknown", raw_data={"x": 1})
         assert isinstance(msg, UnknownMessage)
         assert msg.type == "unknown"
@@ -421,37 +419,27 @@ class TestContentBlockUnion:
 
     def test_content_block_with_text(self):
         """Test ContentBlock union with TextBlock."""
-        from claude_sdk_lite.types import ContentBlock
-
         block: ContentBlock = TextBlock(text="Hello")
         assert isinstance(block, TextBlock)
         assert block.text == "Hello"
 
     def test_content_block_with_thinking(self):
         """Test ContentBlock union with ThinkingBlock."""
-        from claude_sdk_lite.types import ContentBlock
-
         block: ContentBlock = ThinkingBlock(thinking="Thinking...", signature="sig")
         assert isinstance(block, ThinkingBlock)
 
     def test_content_block_with_tool_use(self):
         """Test ContentBlock union with ToolUseBlock."""
-        from claude_sdk_lite.types import ContentBlock
-
         block: ContentBlock = ToolUseBlock(id="1", name="bash", input={})
         assert isinstance(block, ToolUseBlock)
 
     def test_content_block_with_tool_result(self):
         """Test ContentBlock union with ToolResultBlock."""
-        from claude_sdk_lite.types import ContentBlock
-
         block: ContentBlock = ToolResultBlock(tool_use_id="1", content="result")
         assert isinstance(block, ToolResultBlock)
 
     def test_content_block_with_interrupt(self):
         """Test ContentBlock union with InterruptBlock."""
-        from claude_sdk_lite.types import ContentBlock
-
         block: ContentBlock = InterruptBlock()
         assert isinstance(block, InterruptBlock)
 
@@ -478,29 +466,21 @@ class TestMessageUnion:
 
     def test_message_with_user_message(self):
         """Test Message union with UserMessage."""
-        from claude_sdk_lite.types import Message
-
         msg: Message = UserMessage(content="Hello")
         assert isinstance(msg, UserMessage)
 
     def test_message_with_assistant_message(self):
         """Test Message union with AssistantMessage."""
-        from claude_sdk_lite.types import Message
-
         msg: Message = AssistantMessage(content=[], model="claude-sonnet-4-5")
         assert isinstance(msg, AssistantMessage)
 
     def test_message_with_system_message(self):
         """Test Message union with SystemMessage."""
-        from claude_sdk_lite.types import Message
-
         msg: Message = SystemMessage(subtype="status", data={})
         assert isinstance(msg, SystemMessage)
 
     def test_message_with_result_message(self):
         """Test Message union with ResultMessage."""
-        from claude_sdk_lite.types import Message
-
         msg: Message = ResultMessage(
             subtype="complete",
             duration_ms=1000,
@@ -513,15 +493,11 @@ class TestMessageUnion:
 
     def test_message_with_stream_event(self):
         """Test Message union with StreamEvent."""
-        from claude_sdk_lite.types import Message
-
         msg: Message = StreamEvent(uuid="uuid", session_id="sess", event={})
         assert isinstance(msg, StreamEvent)
 
     def test_message_with_unknown_message(self):
         """Test Message union with UnknownMessage."""
-        from claude_sdk_lite.types import Message
-
         msg: Message = UnknownMessage(type="unknown", raw_data={})
         assert isinstance(msg, UnknownMessage)
 
@@ -547,6 +523,40 @@ class TestTypeValidation:
         with pytest.raises(ValueError):
             ToolUseBlock(id="test", name="bash")  # Missing input
 
+    def test_tool_use_block_input_must_be_dict(self):
+        """Test that ToolUseBlock rejects a non-dict input."""
+        with pytest.raises(ValueError):
+            ToolUseBlock(id="test", name="bash", input=["ls"])
+
+    def test_stream_event_keeps_event_dict(self):
+        """Test that StreamEvent stores the event dict as given, without copying it."""
+        event = {"type": "content_block_delta", "delta": {"text": "Hi"}}
+        stream_event = StreamEvent(uuid="evt_1", session_id="sess_1", event=event)
+        assert stream_event.event is event
+
+    @pytest.mark.parametrize(
+        ("make", "field"),
+        [
+            (lambda raw: ToolUseBlock(id="t1", name="bash", input=raw), "input"),
+            (lambda raw: StreamEvent(uuid="e1", session_id="s1", event=raw), "event"),
+            (lambda raw: SystemMessage(subtype="init", data=raw), "data"),
+            (lambda raw: UnknownMessage(type="future", raw_data=raw), "raw_data"),
+        ],
+    )
+    def test_raw_dict_fields_alias_the_given_dict(self, make, field):
+        """Test that raw dict fields keep a reference to the caller's dict.
+
+        This is the documented contract: the dict is neither copied nor walked,
+        so later changes to it are visible through the model and keys are not
+        checked to be strings.
+        """
+        raw = {"key": "value", 2: "non-str key"}
+        model = make(raw)
+        assert getattr(model, field) is raw
+
+        raw["added"] = 1
+        assert getattr(model, field) == {"key": "value", 2: "non-str key", "added": 1}
+
     def test_result_message_required_fields(self):
         """Test that ResultMessage requires all fields."""
         with pytest.raises(ValueError):
@@ -659,3 +669,39 @@ class TestMessageEdgeCases:
         block = ToolResultBlock(tool_use_id="tool_1", content=content)
         assert len(block.content) == 1000
         assert block.content[999]["text"] == "Line 999"
+
+
+class TestPatternMatching:
+    """Test structural pattern matching support via __match_args__."""
+
+    @pytest.mark.parametrize(
+        "model",
+        [
+            TextBlock,
+            ThinkingBlock,
+            ToolUseBlock,
+            ToolResultBlock,
+            UserMessage,
+            AssistantMessage,
+            SystemMessage,
+            ResultMessage,
+            StreamEvent,
+            UnknownMessage,
+        ],
+    )
+    def test_match_args_follow_field_order(self, model):
+        """Test that positional patterns map to fields in declaration order."""
+        fields = [name for name in model.model_fields if name != "type" or model is UnknownMessage]
+        assert list(model.__match_args__) == fields
+
+    def test_positional_match(self):
+        """Test matching an assistant message with positional sub-patterns."""
+        msg = AssistantMessage(content=[TextBlock(text="Hi"), TextBlock(text="!")], model="sonnet")
+
+        match msg:
+            case AssistantMessage([TextBlock(text), *_], "sonnet"):
+                matched = text
+            case _:
+                matched = None
+
+        assert matched == "Hi"
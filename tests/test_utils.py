@@ -3,29 +3,12 @@
 from unittest.mock import patch
 
 import pytest
+from test_helpers import async_lines
 
 from claude_sdk_lite.executors import AsyncProcessExecutor, SyncProcessExecutor
 from claude_sdk_lite.utils import find_tool_in_system, find_tool_in_system_sync
 
 
-class AsyncIteratorMock:
-    """Mock async iterator for testing."""
-
-    def __init__(self, items):
-        self.items = items
-        self.index = 0
-
-    def __aiter__(self):
-        return self
-
-    async def __anext__(self):
-        if self.index >= len(self.items):
-            raise StopAsyncIteration
-        item = self.items[self.index]
-        self.index += 1
-        return item
-
-
 class TestFindToolSync:
     """Test synchronous find_tool_in_system_sync function."""
 
@@ -147,7 +130,7 @@ class TestFindToolAsync:
         """Test finding tool on Unix-like systems."""
         with patch("platform.system", return_value="Linux"):
             with patch.object(AsyncProcessExecutor, "async_execute") as mock_exec:
-                mock_exec.return_value = AsyncIteratorMock([b"/usr/bin/claude\n"])
+                mock_exec.return_value = async_lines([b"/usr/bin/claude\n"])
                 result = await find_tool_in_system("claude")
                 assert result == "/usr/bin/claude"
 
@@ -155,7 +138,7 @@ class TestFindToolAsync:
         """Test finding tool on Windows with .exe extension."""
         with patch("platform.system", return_value="Windows"):
             with patch.object(AsyncProcessExecutor, "async_execute") as mock_exec:
-                mock_exec.return_value = AsyncIteratorMock(
+                mock_exec.return_value = async_lines(
                     [
                         b"C:\\Program Files\\claude.exe\n",
                         b"C:\\Users\\user\\AppData\\Local\\claude.cmd\n",
@@ -168,7 +151,7 @@ class TestFindToolAsync:
         """Test finding tool on Windows when path has no extension (Unix-style script)."""
         with patch("platform.system", return_value="Windows"):
             with patch.object(AsyncProcessExecutor, "async_execute") as mock_exec:
-                mock_exec.return_value = AsyncIteratorMock([b"/usr/local/bin/claude\n"])
+                mock_exec.return_value = async_lines([b"/usr/local/bin/claude\n"])
                 result = await find_tool_in_system("claude")
                 assert result == "/usr/local/bin/claude"
 
@@ -176,7 +159,7 @@ class TestFindToolAsync:
         """Test finding tool on Windows with .bat extension."""
         with patch("platform.system", return_value="Windows"):
             with patch.object(AsyncProcessExecutor, "async_execute") as mock_exec:
-                mock_exec.return_value = AsyncIteratorMock([b"C:\\tools\\claude.bat\n"])
+                mock_exec.return_value = async_lines([b"C:\\tools\\claude.bat\n"])
                 result = await find_tool_in_system("claude")
                 assert result == "C:\\tools\\claude.bat"
 
@@ -184,7 +167,7 @@ class TestFindToolAsync:
         """Test when tool is not found."""
         with patch("platform.system", return_value="Linux"):
             with patch.object(AsyncProcessExecutor, "async_execute") as mock_exec:
-                mock_exec.return_value = AsyncIteratorMock([])
+                mock_exec.return_value = async_lines([])
                 result = await find_tool_in_system("claude")
                 assert result is None
 
@@ -211,7 +194,7 @@ class TestFindToolAsync:
         with patch("platform.system", return_value="Linux"):
             with patch.object(AsyncProcessExecutor, "async_execute") as mock_exec:
                 # Simulate output with trailing empty line
-                mock_exec.return_value = AsyncIteratorMock([b"/usr/bin/claude\n", b"\n"])
+                mock_exec.return_value = async_lines([b"/usr/bin/claude\n", b"\n"])
                 result = await find_tool_in_system("claude")
                 assert result == "/usr/bin/claude"
 
@@ -219,6 +202,6 @@ class TestFindToolAsync:
         """Test handling of multiple empty lines in output."""
         with patch("platform.system", return_value="Linux"):
             with patch.object(AsyncProcessExecutor, "async_execute") as mock_exec:
-                mock_exec.return_value = AsyncIteratorMock([b"/usr/bin/claude\n", b"\n", b"\n"])
+                mock_exec.return_value = async_lines([b"/usr/bin/claude\n", b"\n", b"\n"])
                 result = await find_tool_in_system("claude")
                 assert result == "/usr/bin/claude"